@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Aggregates - Sorgu anında tekrar tekrar hesaplanan özetleri (mağaza büyüme sıralaması,
+departman sayıları, veri özeti) veri yüklendiğinde bir kez hesaplayıp saklar.
+"""
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+GROWTH_FILE = 'sales.xlsx'
+SALES_2024_COLUMN = 'Ciro 2024 (TRY-KDV siz)'
+SALES_2025_COLUMN = 'Ciro 2025 (TRY-KDV siz)'
+GROWTH_COLUMN = 'Ciro % Büyüme(24den25e)'
+
+
+def _to_floats(values):
+    """
+    Değerleri float dizisine çevirir; çevrilemeyenler için geçerlilik maskesi False olur.
+    """
+    result = np.zeros(len(values), dtype='float64')
+    valid = np.ones(len(values), dtype=bool)
+    for i, value in enumerate(values):
+        try:
+            result[i] = float(value)
+        except (ValueError, TypeError):
+            valid[i] = False
+    return result, valid
+
+
+class AggregateStore:
+    """
+    Veri yüklendikten sonra rebuild() ile doldurulan, sütun bazlı (NumPy) özet deposu.
+    Veri yeniden yüklendiğinde invalidate() + rebuild() çağrılmalıdır.
+    """
+
+    def __init__(self):
+        self.invalidate()
+
+    def invalidate(self):
+        self.built = False
+        # Büyüme verisi: mağaza adları, büyüme oranları (%) ve büyükten küçüğe sıralama
+        self.growth_available = False
+        self.store_names = np.array([], dtype=object)
+        self.growth = np.array([], dtype='float64')
+        self.growth_order = np.array([], dtype=np.intp)
+        self.department_counts = {}
+        self.summary = ""
+
+    def rebuild(self, data_insights: dict, structured_data: dict, text_documents: dict):
+        """
+        Tüm özetleri yeniden hesaplar.
+        """
+        self.invalidate()
+        self._build_growth(data_insights)
+        for insights in data_insights.values():
+            if insights['type'] in ['excel', 'csv'] and 'department_counts' in insights:
+                self.department_counts.update(insights['department_counts'])
+        self.summary = self._build_summary(data_insights, structured_data, text_documents)
+        self.built = True
+        logger.info(f"📈 Özetler hazırlandı: {len(self.store_names)} mağaza büyümesi, "
+                    f"{len(self.department_counts)} departman")
+
+    def _build_growth(self, data_insights: dict):
+        insights = data_insights.get(GROWTH_FILE)
+        if not insights or 'store_rows' not in insights:
+            return
+        self.growth_available = True
+        store_rows = insights['store_rows']
+        self.store_names = np.array(list(store_rows), dtype=object)
+        rows = list(store_rows.values())
+        sales_2024, valid_2024 = _to_floats([row.get(SALES_2024_COLUMN, 0) for row in rows])
+        sales_2025, valid_2025 = _to_floats([row.get(SALES_2025_COLUMN, 0) for row in rows])
+        given_growth, valid_growth = _to_floats([row.get(GROWTH_COLUMN, 0) for row in rows])
+
+        # 2024 cirosu pozitifse büyüme cirolardan hesaplanır, değilse tablodaki oran kullanılır;
+        # değerlerden biri sayıya çevrilemiyorsa mağazanın büyümesi 0 kabul edilir
+        with np.errstate(divide='ignore', invalid='ignore'):
+            calculated = (sales_2025 - sales_2024) / sales_2024 * 100
+        growth = np.where(sales_2024 > 0, calculated, given_growth)
+        self.growth = np.where(valid_2024 & valid_2025 & valid_growth, growth, 0.0)
+        # Eşit oranlarda tablodaki sıra korunur (kararlı sıralama); NaN değerler en sona düşer
+        self.growth_order = np.argsort(-self.growth, kind='stable')
+
+    @staticmethod
+    def _build_summary(data_insights: dict, structured_data: dict, text_documents: dict) -> str:
+        summary_parts = []
+        file_types = {}
+        for insights in data_insights.values():
+            file_type = insights['type']
+            file_types[file_type] = file_types.get(file_type, 0) + 1
+        summary_parts.append(f"Dosya türleri: {dict(file_types)}")
+        if structured_data:
+            total_rows = sum(df.shape[0] for df in structured_data.values())
+            total_cols = sum(df.shape[1] for df in structured_data.values())
+            summary_parts.append(f"Toplam veri: {total_rows} satır, {total_cols} sütun")
+            numeric_summaries = []
+            for filename, insights in data_insights.items():
+                if insights['type'] in ['excel', 'csv'] and 'summary' in insights:
+                    for col, stats in insights['summary'].items():
+                        numeric_summaries.append(f"{filename}-{col}: {stats}")
+            if numeric_summaries:
+                summary_parts.append(f"Sayısal veriler: {numeric_summaries[:3]}")
+        if text_documents:
+            total_words = sum(data_insights[f]['word_count']
+                              for f in text_documents.keys()
+                              if f in data_insights)
+            summary_parts.append(f"Toplam metin: {total_words} kelime")
+        return " | ".join(summary_parts)
+
+    @property
+    def store_count(self) -> int:
+        return len(self.store_names)
+
+    def top_growth(self, n=None) -> list:
+        """
+        En çok büyüyen n mağazayı (n verilmezse hepsini) (mağaza, oran) olarak döndürür.
+        """
+        order = self.growth_order if n is None else self.growth_order[:n]
+        return list(zip(self.store_names[order].tolist(), self.growth[order].tolist()))
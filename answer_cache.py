@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Answer Cache - LLM cevapları için iki katmanlı önbellek.
+
+1. Tam eşleşme: normalize edilmiş sorgu + LLM'e verilen bağlamın özeti + veri sürümü.
+2. Anlamsal: aynı veri sürümünde, aynı bağlamla cevaplanan, aynı varlıkları (mağaza adları,
+   sayılar) ve karşılaştırma/olumsuzluk kelimelerini içeren ve sorgu vektörü eşik üstü benzer
+   olan önceki bir soru varsa onun cevabı kullanılır.
+
+Bellekteki katmanlar LRU/TTL ile sınırlıdır. İsteğe bağlı bir SQLite dosyası verilirse
+cevaplar oraya da yazılır; böylece aynı makinedeki gunicorn işçileri cevapları paylaşır.
+"""
+import logging
+import re
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+_PUNCTUATION = re.compile(r"[^\w\s%]+")
+_SPACES = re.compile(r"\s+")
+_NUMBERS = re.compile(r"\d+")
+# Anlamı tersine çeviren kelimeler: vektörleri çok benzer olsa da "en yüksek" ile "en düşük"
+# veya "satış" ile "satış değil" aynı cevabı almamalı. Kısa kelimeler tam, diğerleri kök olarak
+# (ekli halleriyle) aranır.
+_QUALIFIER_WORDS = {'en', 'çok', 'az', 'değil', 'hariç', 'olmayan', 'dışında', 'max', 'min'}
+_QUALIFIER_STEMS = {
+    'yüksek': 'yüksek', 'düşük': 'düşük', 'düşüğ': 'düşük', 'büyük': 'büyük', 'büyüğ': 'büyük',
+    'küçük': 'küçük', 'küçüğ': 'küçük', 'artan': 'artan', 'artış': 'artan', 'azalan': 'azalan',
+    'azalış': 'azalan', 'fazla': 'fazla',
+}
+# Disk tablosu her bu kadar yazmada bir budanır
+DB_PRUNE_EVERY = 64
+
+
+def normalize_query(query: str) -> str:
+    """
+    Sorguyu karşılaştırma için sadeleştirir: Türkçe küçük harf, noktalama ve fazla boşluk atılır.
+    """
+    query = query.replace('I', 'ı').replace('İ', 'i').lower()
+    query = _PUNCTUATION.sub(' ', query)
+    return _SPACES.sub(' ', query).strip()
+
+
+def fingerprint(text: str) -> str:
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]
+
+
+def _qualifiers(query: str) -> list:
+    found = set()
+    for word in normalize_query(query).split():
+        if word in _QUALIFIER_WORDS:
+            found.add(word)
+        for stem, label in _QUALIFIER_STEMS.items():
+            if word.startswith(stem):
+                found.add(label)
+    return sorted(found)
+
+
+def query_guard(query: str, context: str, entities=()) -> str:
+    """
+    Anlamsal eşleşmede farklı olmaması gereken kısımlar: LLM'e verilen bağlamın özeti, verilen
+    varlıklar (ör. mağaza adları), sorgudaki sayılar (ör. yıllar) ve karşılaştırma/olumsuzluk
+    kelimeleri. "AKASYA 2025 ciro" ile "ZORLU 2025 ciro" veya "en yüksek ciro" ile "en düşük ciro"
+    vektör olarak çok benzer olsa da aynı cevabı almaz.
+    """
+    parts = ([fingerprint(context)] + sorted(set(entities)) + sorted(set(_NUMBERS.findall(query)))
+             + _qualifiers(query))
+    return "|".join(parts)
+
+
+class AnswerCache:
+    """
+    Tam ve anlamsal eşleşmeli, thread-safe cevap önbelleği.
+    """
+
+    def __init__(self, maxsize=512, ttl=3600, semantic_threshold=0.95, db_path=None):
+        """
+        maxsize: bellekteki kayıt sayısı sınırı (0: önbellek kapalı)
+        ttl: kayıt ömrü (saniye, None: sınırsız)
+        semantic_threshold: anlamsal eşleşme için en düşük kosinüs benzerliği (1 ve üstü: kapalı)
+        db_path: paylaşılan SQLite dosyası (None: sadece bellek)
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.semantic_threshold = semantic_threshold
+        self.db_path = db_path
+        self.data_version = None
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self._db_writes = 0
+
+        self._exact = LRUCache(maxsize=maxsize, ttl=ttl)
+        # anahtar -> (birim vektör, guard, cevap, son geçerlilik zamanı, veri sürümü)
+        self._semantic = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        if db_path:
+            self._init_db()
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0
+
+    # --- SQLite ---------------------------------------------------------
+
+    def _connection(self):
+        # sqlite3 bağlantıları thread'ler arasında paylaşılmaz; her thread kendi bağlantısını açar
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_db(self):
+        with self._connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS answers (
+                    key TEXT PRIMARY KEY,
+                    data_version TEXT NOT NULL,
+                    guard TEXT NOT NULL,
+                    embedding BLOB,
+                    answer TEXT NOT NULL,
+                    created REAL NOT NULL
+                )""")
+            conn.execute("CREATE INDEX IF NOT EXISTS answers_lookup ON answers (data_version, guard)")
+
+    def _db_min_created(self) -> float:
+        return time.time() - self.ttl if self.ttl else 0.0
+
+    def _db_get_exact(self, key):
+        row = self._connection().execute(
+            "SELECT answer FROM answers WHERE key = ? AND created >= ?", (key, self._db_min_created())
+        ).fetchone()
+        return row[0] if row else None
+
+    def _db_get_semantic(self, vector, guard, version):
+        rows = self._connection().execute(
+            "SELECT key, embedding, answer FROM answers "
+            "WHERE data_version = ? AND guard = ? AND created >= ? AND embedding IS NOT NULL "
+            "ORDER BY created DESC LIMIT ?",
+            (version, guard, self._db_min_created(), self.maxsize)
+        ).fetchall()
+        if not rows:
+            return None
+        matrix = np.stack([np.frombuffer(blob, dtype='float32') for _, blob, _ in rows])
+        scores = matrix @ vector
+        best = int(np.argmax(scores))
+        if scores[best] >= self.semantic_threshold:
+            return rows[best][2]
+        return None
+
+    def _db_put(self, key, guard, vector, answer, version):
+        blob = vector.tobytes() if vector is not None else None
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO answers (key, data_version, guard, embedding, answer, created) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, version, guard, blob, answer, time.time())
+            )
+            self._db_writes += 1
+            if self._db_writes % DB_PRUNE_EVERY == 0:
+                # Süresi dolanlar ve en yeni maxsize * 4 kaydın dışında kalanlar silinir
+                conn.execute("DELETE FROM answers WHERE created < ? OR key NOT IN "
+                             "(SELECT key FROM answers ORDER BY created DESC LIMIT ?)",
+                             (self._db_min_created(), self.maxsize * 4))
+
+    # --- Önbellek -------------------------------------------------------
+
+    @staticmethod
+    def _key(query: str, context: str, version) -> str:
+        return fingerprint(f"{version}\x00{normalize_query(query)}\x00{fingerprint(context)}")
+
+    @staticmethod
+    def _unit(embedding):
+        if embedding is None:
+            return None
+        vector = np.asarray(embedding, dtype='float32').reshape(-1)
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else None
+
+    def _semantic_lookup(self, vector, guard, version):
+        now = time.monotonic()
+        best_key, best_score = None, self.semantic_threshold
+        with self._lock:
+            for key, (other, other_guard, _, expires_at, other_version) in list(self._semantic.items()):
+                if expires_at is not None and expires_at <= now:
+                    del self._semantic[key]
+                    continue
+                if other_guard != guard or other_version != version:
+                    continue
+                score = float(other @ vector)
+                if score >= best_score:
+                    best_key, best_score = key, score
+            if best_key is not None:
+                self._semantic.move_to_end(best_key)
+                return self._semantic[best_key][2]
+        return None
+
+    def get(self, query: str, context: str, embedding=None, entities=(), data_version=None):
+        """
+        Önce tam, sonra anlamsal eşleşme arar. Bulunamazsa None döner.
+        context: LLM'e verilecek bağlam metni
+        embedding: sorgu vektörü (anlamsal katman için)
+        entities: anlamsal eşleşmede aynı olması gereken varlıklar (ör. mağaza adları)
+        data_version: sorguyu cevaplayan sistemin veri sürümü; güncel sürüm değilse (canlı
+        yeniden yüklemede eski sistemde süren sorgular) önbellek kullanılmaz
+        """
+        if not self.enabled:
+            return None
+        version = self.data_version if data_version is None else data_version
+        if version != self.data_version:
+            with self._lock:
+                self.misses += 1
+            return None
+        key = self._key(query, context, version)
+        answer = self._exact.get(key)
+        if answer is None and self.db_path:
+            answer = self._db_get_exact(key)
+            if answer is not None:
+                self._exact.put(key, answer)
+        if answer is not None:
+            with self._lock:
+                self.exact_hits += 1
+            return answer
+
+        vector = self._unit(embedding)
+        if vector is not None and self.semantic_threshold < 1:
+            guard = query_guard(query, context, entities)
+            answer = self._semantic_lookup(vector, guard, version)
+            if answer is None and self.db_path:
+                answer = self._db_get_semantic(vector, guard, version)
+            if answer is not None:
+                with self._lock:
+                    self.semantic_hits += 1
+                return answer
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, query: str, context: str, answer: str, embedding=None, entities=(), data_version=None):
+        """
+        Üretilen cevabı her iki katmana (ve varsa diske) yazar.
+        data_version: cevabı üreten sistemin veri sürümü; güncel sürüm değilse cevap yazılmaz
+        (eski veriden üretilmiş bir cevap yeni sürümün anahtarıyla saklanmasın diye)
+        """
+        if not self.enabled or not answer:
+            return
+        version = self.data_version if data_version is None else data_version
+        if version != self.data_version:
+            return
+        key = self._key(query, context, version)
+        guard = query_guard(query, context, entities)
+        vector = self._unit(embedding)
+        self._exact.put(key, answer)
+        if vector is not None:
+            expires_at = time.monotonic() + self.ttl if self.ttl else None
+            with self._lock:
+                self._semantic[key] = (vector, guard, answer, expires_at, version)
+                self._semantic.move_to_end(key)
+                while len(self._semantic) > self.maxsize:
+                    self._semantic.popitem(last=False)
+        if self.db_path:
+            try:
+                self._db_put(key, guard, vector, answer, version)
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ Cevap önbelleği diske yazılamadı: {e}")
+
+    def set_data_version(self, version: str):
+        """
+        Bilgi tabanı yeniden oluşturulduğunda çağrılır; sürüm değiştiyse bellekteki cevaplar silinir.
+        Diskteki diğer sürümlerin kayıtları silinmez: aynı dosyayı kullanan ve henüz yeniden
+        yüklenmemiş işçiler onları kullanmaya devam eder; aramalar sürüme göre süzüldüğü için
+        yeni sürüme karışmazlar ve TTL/boyut budamasıyla zamanla temizlenirler. Burada yalnızca
+        süresi dolmuş kayıtlar silinir.
+        """
+        if version == self.data_version:
+            return
+        self.data_version = version
+        self.clear()
+        if self.db_path:
+            try:
+                with self._connection() as conn:
+                    conn.execute("DELETE FROM answers WHERE created < ?", (self._db_min_created(),))
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ Cevap önbelleği temizlenemedi: {e}")
+
+    def clear(self):
+        self._exact.clear()
+        with self._lock:
+            self._semantic.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.exact_hits + self.semantic_hits + self.misses
+            return {
+                'size': len(self._exact),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'semantic_threshold': self.semantic_threshold,
+                'disk': self.db_path,
+                'data_version': self.data_version,
+                'exact_hits': self.exact_hits,
+                'semantic_hits': self.semantic_hits,
+                'misses': self.misses,
+                'hit_rate': round((self.exact_hits + self.semantic_hits) / total, 4) if total else 0.0
+            }
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Embedding arka uçları için hız ve doğruluk karşılaştırması.
+
+Referans, eski davranıştır: PyTorch modeli, sıralanmamış metinleri 256'lık dilimler halinde
+varsayılan ayarlarla (yığın başına 32 metin) kodlar. Her arka uç (torch, onnx, onnx_int8)
+uzunluğa göre gruplanmış yığınlarla çalıştırılır; saniyede kodlanan metin sayısı ve
+referans vektörlerle kosinüs benzerliği (ortalama / en düşük) raporlanır.
+
+Metinler, gerçek bilgi tabanına benzemesi için kısa tablo satırları ile uzun doküman
+parçalarının karışımıdır; --texts ile satır başına bir metin içeren bir dosya verilebilir.
+
+Kullanım:
+    python benchmarks/bench_embedding.py --count 2000 --backends torch onnx onnx_int8 --threads 8
+"""
+import os
+import sys
+import time
+import json
+import random
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from embedding_backend import EMBED_BACKENDS, EmbeddingModel, load_embedding_model
+
+WORDS = ("mağaza satış ciro büyüme departman çalışan maaş rapor müşteri sipariş ürün stok fatura "
+         "teslimat kargo iade şikayet destek cihaz ekran bağlantı hata çözüm ayar güncelleme").split()
+
+
+def make_texts(count: int, seed: int) -> list:
+    rng = random.Random(seed)
+    texts = []
+    for i in range(count):
+        if rng.random() < 0.6:
+            # Tablo satırı: kısa, "Sütun: değer" çiftleri
+            texts.append(", ".join(f"{rng.choice(WORDS).title()}: {rng.randint(1, 10 ** 6)}" for _ in range(rng.randint(3, 8))))
+        else:
+            # Doküman parçası: 40-180 kelime
+            texts.append(" ".join(rng.choice(WORDS) for _ in range(rng.randint(40, 180))))
+    return texts
+
+
+def baseline_encode(model, texts: list, slice_size=256) -> np.ndarray:
+    """
+    Eski yeniden oluşturma döngüsü: sırayla 256'lık dilimler, varsayılan encode ayarları.
+    """
+    parts = [model.encode(texts[i:i + slice_size], show_progress_bar=False)
+             for i in range(0, len(texts), slice_size)]
+    return np.asarray(np.concatenate(parts), dtype='float32')
+
+
+def timed(fn, texts, repeat):
+    fn(texts[:32])  # ısınma
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(texts)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def cosine(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    a = a / np.maximum(np.linalg.norm(a, axis=1, keepdims=True), 1e-12)
+    b = b / np.maximum(np.linalg.norm(b, axis=1, keepdims=True), 1e-12)
+    return (a * b).sum(axis=1)
+
+
+def run(args):
+    if args.texts:
+        with open(args.texts, encoding='utf-8') as f:
+            texts = [line.strip() for line in f if line.strip()][:args.count]
+    else:
+        texts = make_texts(args.count, args.seed)
+    print(f"📝 {len(texts)} metin, ortalama {np.mean([len(t) for t in texts]):.0f} karakter")
+
+    reference_model = load_embedding_model(args.model, 'torch', threads=args.threads)
+    reference, seconds = timed(lambda t: baseline_encode(reference_model.model, t), texts, args.repeat)
+    results = [{'backend': 'torch (eski: sırasız, 32\'lik yığın)', 'texts_per_s': round(len(texts) / seconds, 1),
+                'seconds': round(seconds, 3), 'cosine_mean': 1.0, 'cosine_min': 1.0}]
+
+    for backend in args.backends:
+        model = reference_model if backend == 'torch' else load_embedding_model(
+            args.model, backend, threads=args.threads, onnx_dir=args.onnx_dir, quantization=args.quantization)
+        if model.backend != backend:
+            print(f"⚠️ '{backend}' yüklenemedi, atlanıyor.")
+            continue
+        bucketed = EmbeddingModel(model.model, backend, batch_size=args.batch_size, batch_tokens=args.batch_tokens)
+        vectors, seconds = timed(bucketed.encode, texts, args.repeat)
+        agreement = cosine(vectors, reference)
+        results.append({'backend': f"{backend} (uzunluk gruplu)", 'texts_per_s': round(len(texts) / seconds, 1),
+                        'seconds': round(seconds, 3), 'cosine_mean': round(float(agreement.mean()), 5),
+                        'cosine_min': round(float(agreement.min()), 5)})
+
+    for row in results:
+        print(f"   {row['backend']:38s} {row['texts_per_s']:9.1f} metin/s  "
+              f"kosinüs ort={row['cosine_mean']:.5f} min={row['cosine_min']:.5f}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Embedding arka uçları hız/doğruluk karşılaştırması")
+    parser.add_argument('--model', default='paraphrase-multilingual-MiniLM-L12-v2')
+    parser.add_argument('--backends', nargs='+', default=list(EMBED_BACKENDS), choices=EMBED_BACKENDS)
+    parser.add_argument('--count', type=int, default=2000)
+    parser.add_argument('--texts', help="Satır başına bir metin içeren dosya")
+    parser.add_argument('--batch-size', type=int, default=64)
+    parser.add_argument('--batch-tokens', type=int, default=4096)
+    parser.add_argument('--threads', type=int, default=None)
+    parser.add_argument('--onnx-dir', default='onnx_model')
+    parser.add_argument('--quantization', default='avx2')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', help="Sonuçların yazılacağı JSON dosyası")
+    args = parser.parse_args()
+
+    results = run(args)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 Sonuçlar '{args.json}' dosyasına yazıldı.")
+
+
+if __name__ == '__main__':
+    main()
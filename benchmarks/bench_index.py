@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+FAISS indeks türleri için recall@k, arama gecikmesi ve bellek karşılaştırması.
+
+Sentetik (kümelenmiş) 384 boyutlu vektörlerle her indeks türünü kurar, düz (flat)
+indeksin kesin sonuçlarına göre recall@k ve tek sorguluk p50/p99 gecikmeyi ölçer.
+Sıkıştırılmış türler (fp16, sq8, pq, ivf_sq8, ivf_pq) için vektör başına bayt, toplam
+(serileştirilmiş) indeks boyutu ve float32'ye göre recall kaybı da raporlanır.
+
+Kullanım:
+    python benchmarks/bench_index.py --sizes 10000 100000 1000000 --k 32
+    python benchmarks/bench_index.py --types flat fp16 sq8 pq --json memory.json
+"""
+import os
+import sys
+import time
+import json
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from index_factory import INDEX_TYPES, create_index, train_index, set_search_params, describe_index, memory_report
+
+
+def make_vectors(n: int, d: int, n_clusters: int, rng) -> np.ndarray:
+    """
+    Gerçek cümle vektörlerine benzemesi için kümelenmiş sentetik vektörler üretir.
+    """
+    centers = rng.standard_normal((n_clusters, d)).astype('float32')
+    labels = rng.integers(0, n_clusters, size=n)
+    vectors = centers[labels] + 0.35 * rng.standard_normal((n, d)).astype('float32')
+    return np.ascontiguousarray(vectors, dtype='float32')
+
+
+def recall_at_k(found: np.ndarray, truth: np.ndarray) -> float:
+    hits = sum(len(set(f[f >= 0]) & set(t)) for f, t in zip(found, truth))
+    return hits / truth.size
+
+
+def measure_latency(index, queries: np.ndarray, k: int):
+    """
+    Sorguları tek tek (canlı trafikteki gibi) çalıştırır; sonuçları ve gecikmeleri (ms) döndürür.
+    """
+    latencies = []
+    found = []
+    for q in queries:
+        start = time.perf_counter()
+        _, ids = index.search(q.reshape(1, -1), k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        found.append(ids[0])
+    return np.array(found), np.array(latencies)
+
+
+def run(sizes, d, k, n_queries, index_types, nprobe, ef_search, seed):
+    rng = np.random.default_rng(seed)
+    results = []
+    for n in sizes:
+        print(f"\n📦 {n:,} vektör ({d} boyut)")
+        base = make_vectors(n, d, n_clusters=max(16, n // 500), rng=rng)
+        queries = base[rng.integers(0, n, size=n_queries)] + 0.05 * rng.standard_normal((n_queries, d)).astype('float32')
+        ids = np.arange(n, dtype='int64')
+
+        truth = None
+        for index_type in index_types:
+            start = time.perf_counter()
+            index, actual_type = create_index(index_type, d, n)
+            train_index(index, base)
+            index.add_with_ids(base, ids)
+            build_s = time.perf_counter() - start
+            set_search_params(index, nprobe=nprobe, ef_search=ef_search)
+
+            found, latencies = measure_latency(index, queries, k)
+            if truth is None:
+                # İlk tür her zaman 'flat'; kesin sonuçlar referans alınır
+                truth = found
+            memory = memory_report(index)
+            recall = recall_at_k(found, truth)
+            row = {
+                'vectors': n,
+                'index_type': index_type,
+                'actual_type': actual_type,
+                'faiss_class': describe_index(index),
+                'build_s': round(build_s, 3),
+                'recall_at_k': round(recall, 4),
+                'recall_loss': round(1 - recall, 4),
+                'bytes_per_vector': memory['bytes_per_vector'],
+                'index_mb': round(memory['index_bytes'] / 2 ** 20, 2),
+                'compression_vs_float32': memory['compression_vs_float32'],
+                'p50_ms': round(float(np.percentile(latencies, 50)), 3),
+                'p99_ms': round(float(np.percentile(latencies, 99)), 3),
+            }
+            results.append(row)
+            print(f"   {index_type:9s} build={row['build_s']:8.2f}s  recall@{k}={row['recall_at_k']:.4f}  "
+                  f"p50={row['p50_ms']:.3f}ms  p99={row['p99_ms']:.3f}ms  "
+                  f"{row['bytes_per_vector']:5d} B/vektör  {row['index_mb']:9.2f} MB")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FAISS indeks türleri recall/gecikme/bellek karşılaştırması")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--dim', type=int, default=384)
+    parser.add_argument('--k', type=int, default=32)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--types', nargs='+', default=list(INDEX_TYPES), choices=INDEX_TYPES)
+    parser.add_argument('--nprobe', type=int, default=16)
+    parser.add_argument('--ef-search', type=int, default=64)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', help="Sonuçların yazılacağı JSON dosyası")
+    args = parser.parse_args()
+
+    index_types = ['flat'] + [t for t in args.types if t != 'flat']
+    results = run(args.sizes, args.dim, args.k, args.queries, index_types, args.nprobe, args.ef_search, args.seed)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Sonuçlar '{args.json}' dosyasına yazıldı.")
+
+
+if __name__ == '__main__':
+    main()
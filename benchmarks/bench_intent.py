@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Niyet tahmini (SmartNLPProcessor.predict_intent) maliyetinin öğrenilmiş pattern sayısıyla değişimi.
+
+Her boyut için sentetik sorguların ilk üç kelimesinden öğrenilmiş pattern'ler üretilir
+(learn_from_feedback'in sakladığı biçim), learned_patterns.pkl olarak geçici bir klasöre
+yazılıp load_learned_patterns ile yüklenir. Derlenmiş eşleştiricinin sorgu başına p50/p99
+gecikmesi, tüm pattern'leri tek tek tarayan eski skorlama ile karşılaştırılır; iki yolun
+aynı niyeti ve güveni verdiği de doğrulanır.
+
+Kullanım:
+    python benchmarks/bench_intent.py --sizes 0 100 1000 5000
+    python benchmarks/bench_intent.py --queries 2000 --json intent.json
+"""
+import os
+import sys
+import time
+import json
+import pickle
+import random
+import argparse
+import tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nlp_processor import SmartNLPProcessor, MAX_LEARNED_PATTERNS
+
+VOCABULARY = [
+    'kaç', 'çalışan', 'personel', 'it', 'satış', 'muhasebe', 'ik', 'göster', 'listele', 'maaş', 'ortalama',
+    'departman', 'birim', 'hangi', 'nerede', 'mağaza', 'şube', 'analiz', 'hepsi', 'tüm', 'ne', 'kadar', 'var',
+    'en', 'yüksek', 'düşük', 'geçen', 'ay', 'yıl', 'ciro', 'büyüme', 'rapor', 'bodrum', 'ankara', 'izmir',
+    'prosedür', 'izin', 'nasıl', 'kim', 'yönetici', 'toplam', 'hedef', 'sales', 'employee', 'list', 'count',
+]
+INTENTS = ['count_employees', 'store_query', 'salary_analysis', 'policy_question', 'sales_trend']
+
+
+def make_query(rng) -> str:
+    return ' '.join(rng.choice(VOCABULARY) for _ in range(rng.randint(2, 7)))
+
+
+def make_learned(n: int, rng) -> dict:
+    """
+    n farklı pattern'i niyetlere dağıtır (niyet başına MAX_LEARNED_PATTERNS'ı aşmayacak kadar niyet kullanılır).
+    """
+    n_intents = max(len(INTENTS), -(-n // MAX_LEARNED_PATTERNS))
+    intents = INTENTS + [f"learned_intent_{i}" for i in range(n_intents - len(INTENTS))]
+    learned = {intent: [] for intent in intents}
+    seen = set()
+    while len(seen) < n:
+        pattern = tuple(make_query(rng).split()[:3])
+        if pattern in seen:
+            continue
+        seen.add(pattern)
+        learned[intents[len(seen) % len(intents)]].append(list(pattern))
+    return {intent: patterns for intent, patterns in learned.items() if patterns}
+
+
+def legacy_predict(nlp, text):
+    """
+    Derleme öncesi skorlama: her sorguda tüm pattern'ler listelerle taranır.
+    """
+    entities = nlp.extract_entities(text, {})
+    scores = {}
+    for intent, patterns in {**nlp.intent_patterns, **nlp.learned_patterns}.items():
+        max_score = 0
+        for pattern in patterns:
+            present_words = [word for word in pattern if word in entities['actions'] or word in entities['objects']
+                             or word in entities['departments'] or word in entities['stores']]
+            score = len(present_words) / len(pattern) if present_words else 0
+            if score > max_score:
+                max_score = score
+        scores[intent] = max_score
+    best_intent = max(scores.items(), key=lambda x: x[1])
+    return {'intent': best_intent[0] if best_intent[1] > 0.3 else 'unknown', 'confidence': best_intent[1]}
+
+
+def time_each(fn, queries) -> np.ndarray:
+    latencies = []
+    for q in queries:
+        start = time.perf_counter()
+        fn(q)
+        latencies.append((time.perf_counter() - start) * 1e6)
+    return np.array(latencies)
+
+
+def run(sizes, n_queries, seed, skip_legacy):
+    rng = random.Random(seed)
+    queries = [make_query(rng) for _ in range(n_queries)]
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        cwd = os.getcwd()
+        os.chdir(work_dir)
+        try:
+            for n in sizes:
+                with open('learned_patterns.pkl', 'wb') as f:
+                    pickle.dump(make_learned(n, rng), f)
+                nlp = SmartNLPProcessor()
+                nlp.add_store_names(['Bodrum-nsp', 'Ankara-Kızılay', 'İzmir-Alsancak'])
+
+                start = time.perf_counter()
+                nlp.predict_intent('ilk sorgu', {})  # Pattern'ler ilk tahminde derlenir
+                compile_ms = (time.perf_counter() - start) * 1000
+                compiled = time_each(lambda q: nlp.predict_intent(q, {}), queries)
+                row = {'learned_patterns': sum(len(p) for p in nlp.learned_patterns.values()),
+                       'compile_ms': round(compile_ms, 2),
+                       'compiled_p50_us': round(float(np.percentile(compiled, 50)), 1),
+                       'compiled_p99_us': round(float(np.percentile(compiled, 99)), 1)}
+                if not skip_legacy:
+                    legacy = time_each(lambda q: legacy_predict(nlp, q), queries)
+                    mismatches = 0
+                    for q in queries:
+                        new, old = nlp.predict_intent(q, {}), legacy_predict(nlp, q)
+                        mismatches += (new['intent'], new['confidence']) != (old['intent'], old['confidence'])
+                    row.update({'legacy_p50_us': round(float(np.percentile(legacy, 50)), 1),
+                                'legacy_p99_us': round(float(np.percentile(legacy, 99)), 1),
+                                'mismatches': mismatches})
+                results.append(row)
+                line = (f"🧠 {row['learned_patterns']:>6,} pattern | derleme {row['compile_ms']:8.2f} ms | "
+                        f"derlenmiş p50 {row['compiled_p50_us']:7.1f} µs p99 {row['compiled_p99_us']:7.1f} µs")
+                if not skip_legacy:
+                    line += (f" | eski p50 {row['legacy_p50_us']:8.1f} µs p99 {row['legacy_p99_us']:8.1f} µs"
+                             f" | fark {row['mismatches']}")
+                print(line)
+        finally:
+            os.chdir(cwd)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Niyet tahmini gecikmesi - öğrenilmiş pattern sayısına göre")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[0, 100, 1000, 5000])
+    parser.add_argument('--queries', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--skip-legacy', action='store_true', help="Eski skorlamayı ölçme")
+    parser.add_argument('--json', help="Sonuçların yazılacağı JSON dosyası")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.queries, args.seed, args.skip_legacy)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Sonuçlar '{args.json}' dosyasına yazıldı.")
+
+
+if __name__ == '__main__':
+    main()
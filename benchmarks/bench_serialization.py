@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+DataFrame -> metin parçası serileştirme karşılaştırması (iterrows vs serialize_table).
+
+Sentetik bir satış tablosu üretir, eski iterrows tabanlı yolu (varsayılan olarak ilk
+50.000 satırda, süre tüm tabloya oranlanır) ve serialize_table'ı çalıştırır, ürettikleri
+metinlerin birebir aynı olduğunu doğrular.
+
+Kullanım:
+    python benchmarks/bench_serialization.py --rows 1000000 --legacy-rows 50000
+"""
+import os
+import sys
+import time
+import json
+import argparse
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from table_serializer import serialize_table, find_store_column
+
+
+def make_sales_sheet(rows: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    malls = np.array(['AGORA', 'AKASYA', 'AKBATI', 'İSTİNYEPARK', 'ZORLU', 'KANYON', 'FORUM', 'OPTIMUM'])
+    store_ids = rng.integers(0, max(rows // 10, 1), size=rows)
+    sales_2024 = np.round(rng.uniform(10_000, 500_000, size=rows), 2)
+    sales_2025 = np.round(sales_2024 * rng.uniform(0.7, 1.5, size=rows), 2)
+    data = pd.DataFrame({
+        'Mağaza Adı': [f"{malls[i % len(malls)]} {i} - NSP" for i in store_ids],
+        'Ciro 2024 (TRY-KDV siz)': sales_2024,
+        'Ciro 2025 (TRY-KDV siz)': sales_2025,
+        'Ciro % Büyüme(24den25e)': np.round((sales_2025 - sales_2024) / sales_2024 * 100, 2),
+        'Adet': rng.integers(0, 1000, size=rows),
+    })
+    data.loc[data.sample(frac=0.001, random_state=seed).index, 'Ciro 2024 (TRY-KDV siz)'] = np.nan
+    return data
+
+
+def legacy_serialize(content: pd.DataFrame) -> dict:
+    """
+    Eski KnowledgeProcessor / _process_excel_data davranışı (üç ayrı iterrows geçişi).
+    """
+    row_texts = []
+    for _, row in content.iterrows():
+        row_texts.append(", ".join([f"{col}: {val}" for col, val in row.items()]))
+
+    store_column = find_store_column(content)
+    store_texts = []
+    store_rows = {}
+    if store_column:
+        for _, row in content.iterrows():
+            store_name = str(row[store_column]).strip()
+            if store_name and store_name.lower() != 'nan':
+                row_data = {col: row[col] for col in content.columns if col != store_column}
+                store_texts.append(f"Mağaza: {store_name}, Veriler: {row_data}")
+        for _, row in content.iterrows():
+            store_name = row[store_column]
+            if store_name and store_name.lower() != 'nan':
+                store_rows[store_name] = {col: row[col] for col in content.columns if col != store_column}
+    return {'row_texts': row_texts, 'store_texts': store_texts, 'store_rows': store_rows}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DataFrame serileştirme karşılaştırması")
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--legacy-rows', type=int, default=50_000,
+                        help="Eski yolun çalıştırılacağı satır sayısı (süre tüm tabloya oranlanır)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', help="Sonuçların yazılacağı JSON dosyası")
+    args = parser.parse_args()
+
+    print(f"📦 {args.rows:,} satırlık sentetik tablo oluşturuluyor...")
+    data = make_sales_sheet(args.rows, args.seed)
+    store_column = find_store_column(data)
+    data[store_column] = data[store_column].astype(str).str.strip()
+
+    start = time.perf_counter()
+    serialized = serialize_table(data)
+    new_s = time.perf_counter() - start
+    print(f"⚡ serialize_table: {new_s:.2f}s ({args.rows / new_s:,.0f} satır/s)")
+
+    legacy_rows = min(args.legacy_rows, args.rows)
+    sample = data.head(legacy_rows)
+    start = time.perf_counter()
+    legacy = legacy_serialize(sample)
+    legacy_s = time.perf_counter() - start
+    legacy_full_s = legacy_s * args.rows / legacy_rows
+    print(f"🐢 iterrows ({legacy_rows:,} satır): {legacy_s:.2f}s -> tüm tablo için ~{legacy_full_s:.1f}s")
+
+    expected = serialize_table(sample)
+    # store_rows NaN içerebilir (NaN != NaN); bu yüzden repr üzerinden karşılaştırılır
+    identical = (expected['row_texts'] == legacy['row_texts'] and
+                 expected['store_texts'] == legacy['store_texts'] and
+                 repr(expected['store_rows']) == repr(legacy['store_rows']))
+    print(f"{'✅' if identical else '❌'} Çıktılar birebir aynı: {identical}")
+    print(f"🚀 Hızlanma: ~{legacy_full_s / new_s:.1f}x")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({
+                'rows': args.rows,
+                'serialize_table_s': round(new_s, 3),
+                'legacy_sample_rows': legacy_rows,
+                'legacy_estimated_s': round(legacy_full_s, 3),
+                'identical': identical,
+                'row_texts': len(serialized['row_texts']),
+                'store_texts': len(serialized['store_texts']),
+            }, f, indent=2)
+    if not identical:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
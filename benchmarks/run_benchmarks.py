@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""
+Uçtan uca performans ölçümü: sentetik bir company_data klasörü (xlsx, csv, pdf, docx)
+üretir, main.py'yi yerel bir stub LLM'e bağlı olarak bu klasörde başlatır ve ölçer:
+
+    startup            main.py'nin içe aktarılması = tam başlatma (aşama süreleriyle)
+    load               dosyaların okunması (UniversalDataLoader.load_data)
+    process_tables     _process_excel_data / _process_csv_data (analiz + satır serileştirme)
+    process_text       _process_pdf_data / _process_word_data
+    chunking           metin parçalarının üretilmesi
+    model_load         embedding modelinin yüklenmesi
+    embedding          tüm parçaların vektörleştirilmesi
+    index_build        FAISS indeksinin kurulması (eğitim + ekleme)
+    search             KnowledgeProcessor.search gecikmesi
+    predict_intent     SmartNLPProcessor.predict_intent gecikmesi
+    api_query          /api/query (Flask test istemcisi + yerel stub LLM) gecikmesi
+
+load..index_build aşamaları başlatmadan sonra boş bir UniversalAISystem üzerinde tek tek
+ölçülür (torch vb. içe aktarımları bu noktada ısınmış olur).
+
+Sonuçlar JSON olarak yazılır; --baseline ile önceki bir sonuç dosyası verilirse süresi
+--tolerance oranından fazla artan ölçümler gerileme olarak raporlanır ve çıkış kodu 1 olur.
+
+Kullanım:
+    python benchmarks/run_benchmarks.py --rows 20000 --pdf-pages 50 --json bench.json
+    python benchmarks/run_benchmarks.py --json new.json --baseline bench.json --tolerance 0.2
+"""
+import os
+import sys
+import time
+import json
+import random
+import argparse
+import platform
+import tempfile
+import subprocess
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+MALLS = ['AGORA', 'AKASYA', 'AKBATI', 'İSTİNYEPARK', 'ZORLU', 'KANYON', 'FORUM', 'OPTIMUM', 'VADİ', 'CEVAHİR']
+DEPARTMENTS = ['Satış', 'Muhasebe', 'İnsan Kaynakları', 'IT', 'Lojistik', 'Pazarlama', 'Yönetim']
+TOPICS = ("iade süreci kargo teslimat müşteri şikayeti cihaz bağlantı hatası ekran güncelleme garanti "
+          "fatura ödeme stok sayımı vardiya planı izin talebi eğitim güvenlik kuralları").split()
+
+
+# --- Sentetik veri -------------------------------------------------------------
+
+def store_names(count: int) -> list:
+    return [f"{MALLS[i % len(MALLS)]} {i // len(MALLS) + 1} - NSP" for i in range(count)]
+
+
+def make_sales(rows: int, rng) -> pd.DataFrame:
+    sales_2024 = np.round(rng.uniform(10_000, 500_000, size=rows), 2)
+    sales_2025 = np.round(sales_2024 * rng.uniform(0.7, 1.5, size=rows), 2)
+    return pd.DataFrame({
+        'Mağaza Adı': store_names(rows),
+        'Ciro 2024 (TRY-KDV siz)': sales_2024,
+        'Ciro 2025 (TRY-KDV siz)': sales_2025,
+        'Ciro % Büyüme(24den25e)': np.round((sales_2025 - sales_2024) / sales_2024 * 100, 2),
+        'Adet': rng.integers(0, 1000, size=rows),
+    })
+
+
+def make_employees(rows: int, rng) -> pd.DataFrame:
+    return pd.DataFrame({
+        'ID': np.arange(1, rows + 1),
+        'Ad Soyad': [f"Çalışan {i}" for i in range(1, rows + 1)],
+        'Departman': rng.choice(DEPARTMENTS, size=rows),
+        'Pozisyon': rng.choice(['Uzman', 'Müdür', 'Asistan', 'Analist'], size=rows),
+        'Maaş': rng.integers(25_000, 150_000, size=rows),
+        'İşe Giriş Tarihi': pd.to_datetime('2015-01-01') + pd.to_timedelta(rng.integers(0, 3650, size=rows), unit='D'),
+    })
+
+
+def make_paragraph(rng: random.Random, words=60) -> str:
+    return " ".join(rng.choice(TOPICS) for _ in range(words)).capitalize() + "."
+
+
+def _pdf_escape(text: str) -> str:
+    # Standart PDF yazı tiplerinde Türkçe harfler yok; metin ASCII'ye indirgenir
+    text = text.translate(str.maketrans('ıİşŞğĞüÜöÖçÇ', 'iIsSgGuUoOcC'))
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def write_pdf(path: str, pages: list):
+    """
+    Harici kütüphane olmadan, her sayfası satırlardan oluşan basit bir PDF yazar
+    (PyPDF2 ile metni çıkarılabilir).
+    """
+    objects = []
+    page_ids = []
+    font_id = 3
+    objects.append(None)  # 1: katalog
+    objects.append(None)  # 2: sayfa ağacı
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    for lines in pages:
+        stream = "BT /F1 10 Tf 12 TL 40 800 Td " + " ".join(f"({_pdf_escape(line)}) Tj T*" for line in lines) + " ET"
+        data = stream.encode('latin-1', 'replace')
+        objects.append(b"<< /Length %d >>\nstream\n" % len(data) + data + b"\nendstream")
+        content_id = len(objects)
+        objects.append(("<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                        f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {content_id} 0 R >>").encode())
+        page_ids.append(len(objects))
+    objects[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] /Count {len(page_ids)} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    with open(path, 'wb') as f:
+        f.write(out)
+
+
+def write_docx(path: str, paragraphs: list):
+    import docx
+    document = docx.Document()
+    for paragraph in paragraphs:
+        document.add_paragraph(paragraph)
+    document.save(path)
+
+
+def generate_corpus(directory: str, args) -> dict:
+    """
+    company_data benzeri sentetik dosyaları üretir; üretilen dosyaların özetini döndürür.
+    """
+    os.makedirs(directory, exist_ok=True)
+    rng = np.random.default_rng(args.seed)
+    text_rng = random.Random(args.seed)
+    files = {}
+
+    sales = make_sales(args.stores, rng)
+    sales.to_excel(os.path.join(directory, 'sales.xlsx'), index=False)
+    files['sales.xlsx'] = len(sales)
+    for i in range(args.excel_files):
+        name = f'calisanlar_{i + 1}.xlsx'
+        make_employees(args.rows, rng).to_excel(os.path.join(directory, name), index=False)
+        files[name] = args.rows
+    for i in range(args.csv_files):
+        name = f'satis_gecmisi_{i + 1}.csv'
+        history = make_sales(args.rows, rng)
+        history['Tarih'] = pd.to_datetime('2024-01-01') + pd.to_timedelta(rng.integers(0, 730, size=args.rows), unit='D')
+        history.to_csv(os.path.join(directory, name), index=False)
+        files[name] = args.rows
+    for i in range(args.pdf_files):
+        name = f'prosedur_{i + 1}.pdf'
+        pages = [[make_paragraph(text_rng, 12) for _ in range(40)] for _ in range(args.pdf_pages)]
+        write_pdf(os.path.join(directory, name), pages)
+        files[name] = args.pdf_pages
+    for i in range(args.docx_files):
+        name = f'fixing-issues_{i + 1}.docx'
+        write_docx(os.path.join(directory, name), [make_paragraph(text_rng) for _ in range(args.docx_paragraphs)])
+        files[name] = args.docx_paragraphs
+    return files
+
+
+def make_queries(count: int, stores: int, seed: int) -> list:
+    rng = random.Random(seed)
+    names = store_names(stores)
+    templates = [
+        lambda: f"{rng.choice(names)} mağazasının 2025 cirosu nedir",
+        lambda: f"{rng.choice(DEPARTMENTS)} departmanında kaç çalışan var",
+        lambda: "en çok büyüyen mağaza hangisi",
+        lambda: f"{rng.choice(TOPICS)} {rng.choice(TOPICS)} hakkında ne yapmalıyım",
+        lambda: f"{rng.choice(DEPARTMENTS)} departmanının ortalama maaşı",
+        lambda: f"{rng.choice(TOPICS)} sorununu nasıl çözerim",
+    ]
+    return [templates[i % len(templates)]() for i in range(count)]
+
+
+# --- Ölçüm ---------------------------------------------------------------------
+
+def latency_stats(samples: list) -> dict:
+    values = np.asarray(samples) * 1000
+    return {
+        'count': len(values),
+        'mean_ms': round(float(values.mean()), 3),
+        'p50_ms': round(float(np.percentile(values, 50)), 3),
+        'p95_ms': round(float(np.percentile(values, 95)), 3),
+        'p99_ms': round(float(np.percentile(values, 99)), 3),
+    }
+
+
+def time_each(fn, items) -> list:
+    samples = []
+    for item in items:
+        start = time.perf_counter()
+        fn(item)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+class StageTimer:
+    def __init__(self):
+        self.stages = {}
+
+    def run(self, name, fn, **extra):
+        print(f"⏱️ {name}...")
+        start = time.perf_counter()
+        result = fn()
+        seconds = time.perf_counter() - start
+        self.stages[name] = {'seconds': round(seconds, 4), **extra}
+        print(f"   {seconds:.3f}s")
+        return result
+
+
+def start_system(work_dir: str, args, timer: StageTimer):
+    """
+    main.py'yi stub LLM'e bağlı olarak içe aktarır; sistem içe aktarma sırasında (eager)
+    work_dir/company_data'dan kurulur. Dönen değer: (main modülü, stub sunucu)
+    """
+    from stub_server import start_stub_server
+    server, base_url = start_stub_server(latency_ms=args.llm_latency_ms)
+    os.environ.update({
+        'LLM_BACKEND': 'gemini', 'LLM_BASE_URL': base_url, 'STARTUP_MODE': 'eager',
+        'STARTUP_SELF_TEST': '0', 'ANSWER_CACHE_SIZE': '0',
+    })
+    os.chdir(work_dir)
+    main = timer.run('startup', lambda: __import__('main'))
+    system = main.universal_system
+    timer.stages['startup']['phases'] = dict(system.startup_timings)
+    if not system.ready:
+        raise RuntimeError(f"Sistem başlatılamadı: {system.startup_error}")
+    return main, server
+
+
+def run_stages(main, data_dir: str, timer: StageTimer) -> dict:
+    """
+    Başlatmanın aşamalarını, boş bir UniversalAISystem üzerinde tek tek ölçer.
+    """
+    from index_factory import create_index, train_index
+
+    system = main.UniversalAISystem(data_dir, auto_initialize=False)
+    kp = system.knowledge_proc
+    paths = sorted(os.path.join(data_dir, name) for name in os.listdir(data_dir))
+    loaded = timer.run('load', lambda: {os.path.basename(p): system.data_loader.load_data(p, stream_text=True)
+                                        for p in paths})
+    tables = {name: data for name, data in loaded.items() if isinstance(data, pd.DataFrame)}
+    texts = {name: data for name, data in loaded.items() if not isinstance(data, pd.DataFrame)}
+
+    def process_tables():
+        for name, data in tables.items():
+            if name.endswith('.csv'):
+                system._process_csv_data(name, data)
+            else:
+                system._process_excel_data(name, data)
+
+    def process_text():
+        for name, data in texts.items():
+            if name.endswith('.pdf'):
+                system._process_pdf_data(name, data)
+            else:
+                system._process_word_data(name, data)
+
+    timer.run('process_tables', process_tables, rows=int(sum(len(df) for df in tables.values())))
+    timer.run('process_text', process_text, documents=len(texts))
+    for data in tables.values():
+        kp._collect_store_variations(data)
+
+    chunks = timer.run('chunking', lambda: [chunk for name, data in loaded.items()
+                                            for chunk in kp._iter_file_chunks(name, data, system.table_chunks.get(name))])
+    timer.stages['chunking']['chunks'] = len(chunks)
+    timer.run('model_load', kp.load_model)
+    vectors = timer.run('embedding', lambda: np.asarray(kp.model.encode(chunks), dtype='float32'))
+    timer.stages['embedding']['chunks_per_s'] = round(len(chunks) / max(timer.stages['embedding']['seconds'], 1e-9), 1)
+
+    def build_index():
+        index, actual_type = create_index(kp.index_type, vectors.shape[1], len(vectors), **kp.index_params)
+        train_index(index, vectors)
+        index.add_with_ids(vectors, np.arange(len(vectors), dtype='int64'))
+        return actual_type
+
+    actual_type = timer.run('index_build', build_index)
+    timer.stages['index_build']['index_type'] = actual_type
+    return {'files': len(loaded), 'chunks': len(chunks), 'dimension': int(vectors.shape[1])}
+
+
+def run_queries(main, server, args) -> dict:
+    """
+    Çalışan sistemde search, predict_intent ve /api/query gecikmelerini ölçer.
+    """
+    system = main.universal_system
+    queries = make_queries(args.queries, args.stores, args.seed)
+    latency = {}
+    print("⏱️ search / predict_intent / api_query...")
+    latency['search'] = latency_stats(time_each(lambda q: system.knowledge_proc.search(q, k=32), queries))
+    latency['predict_intent'] = latency_stats(
+        time_each(lambda q: system.nlp_proc.predict_intent(q, system.data_insights), queries))
+
+    client = main.app.test_client()
+    statuses = []
+
+    def api_query(q):
+        statuses.append(client.post('/api/query', json={'query': q}).status_code)
+
+    latency['api_query'] = latency_stats(time_each(api_query, queries))
+    latency['api_query']['errors'] = sum(1 for status in statuses if status != 200)
+    latency['api_query']['llm_requests'] = server.request_count
+    for name, stats in latency.items():
+        print(f"   {name:15s} p50={stats['p50_ms']:.2f}ms  p95={stats['p95_ms']:.2f}ms  p99={stats['p99_ms']:.2f}ms")
+    return latency
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'bilinmiyor'
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Süre ölçümlerini (stage saniyeleri, gecikme p50/p95) önceki sonuçla karşılaştırır.
+    """
+    pairs = []
+    for name, stage in results['stages'].items():
+        if name in baseline.get('stages', {}):
+            pairs.append((f"stages.{name}.seconds", stage['seconds'], baseline['stages'][name]['seconds']))
+    for name, stats in results.get('latency', {}).items():
+        for key in ('p50_ms', 'p95_ms'):
+            if key in baseline.get('latency', {}).get(name, {}):
+                pairs.append((f"latency.{name}.{key}", stats[key], baseline['latency'][name][key]))
+    regressions = []
+    for metric, value, previous in pairs:
+        if previous > 0 and value > previous * (1 + tolerance):
+            regressions.append({'metric': metric, 'value': value, 'baseline': previous,
+                                'change': round(value / previous - 1, 3)})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sentetik veriyle aşama aşama ve uçtan uca performans ölçümü")
+    parser.add_argument('--stores', type=int, default=300, help="sales.xlsx mağaza sayısı")
+    parser.add_argument('--rows', type=int, default=5000, help="Çalışan ve satış geçmişi tablolarının satır sayısı")
+    parser.add_argument('--excel-files', type=int, default=1)
+    parser.add_argument('--csv-files', type=int, default=1)
+    parser.add_argument('--pdf-files', type=int, default=1)
+    parser.add_argument('--pdf-pages', type=int, default=20)
+    parser.add_argument('--docx-files', type=int, default=1)
+    parser.add_argument('--docx-paragraphs', type=int, default=200)
+    parser.add_argument('--queries', type=int, default=50)
+    parser.add_argument('--llm-latency-ms', type=float, default=0.0, help="Stub LLM'in yapay gecikmesi")
+    parser.add_argument('--work-dir', help="Verinin ve indeks dosyalarının yazılacağı klasör (varsayılan: geçici)")
+    parser.add_argument('--skip-queries', action='store_true', help="Sorgu gecikmesi ölçümlerini atla")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', help="Sonuçların yazılacağı JSON dosyası")
+    parser.add_argument('--baseline', help="Karşılaştırılacak önceki JSON sonucu")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="Gerileme sayılan en küçük artış oranı")
+    args = parser.parse_args()
+
+    json_path = os.path.abspath(args.json) if args.json else None
+    baseline_path = os.path.abspath(args.baseline) if args.baseline else None
+    work_dir = os.path.abspath(args.work_dir or tempfile.mkdtemp(prefix='corp_ai_bench_'))
+    data_dir = os.path.join(work_dir, 'company_data')
+    print(f"📂 Sentetik veri: {data_dir}")
+    files = generate_corpus(data_dir, args)
+
+    timer = StageTimer()
+    main_module, server = start_system(work_dir, args, timer)
+    corpus = run_stages(main_module, data_dir, timer)
+    corpus['generated_files'] = files
+    latency = {} if args.skip_queries else run_queries(main_module, server, args)
+    server.shutdown()
+
+    results = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'git_revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'args': {key: value for key, value in vars(args).items() if key not in ('json', 'baseline')},
+        },
+        'corpus': corpus,
+        'stages': timer.stages,
+        'latency': latency,
+    }
+    if json_path:
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 Sonuçlar '{json_path}' dosyasına yazıldı.")
+
+    if baseline_path:
+        with open(baseline_path, encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print(f"\n❌ {len(regressions)} gerileme (> %{args.tolerance * 100:.0f}):")
+            for item in regressions:
+                print(f"   {item['metric']}: {item['baseline']} -> {item['value']} (+%{item['change'] * 100:.0f})")
+            sys.exit(1)
+        print("\n✅ Önceki sonuca göre gerileme yok.")
+
+
+if __name__ == '__main__':
+    main()
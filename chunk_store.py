@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Chunk Store - Metin parçalarını (chunk) ofset indeksli, bellek eşlemeli (mmap) tek bir
+dosyada saklar. Dosya salt okunur açıldığı için aynı makinedeki tüm gunicorn işçileri
+işletim sisteminin sayfa önbelleğindeki tek kopyayı paylaşır; arama sırasında sadece
+döndürülen parçaların metni çözülür.
+
+compress=True ile yazılan dosyalarda her parça ayrı ayrı zlib ile sıkıştırılır (MAGIC
+farklıdır); ID ile erişim yine tek parçayı çözer.
+
+Dosya düzeni:
+    [MAGIC][metin verisi (UTF-8 veya parça başına zlib, art arda)]
+    [ids: int64[n] (artan)][offsets: int64[n+1]][sources: int32[n]][kaynak adları (JSON)]
+    [footer ofseti: uint64][n: uint64][kaynak JSON uzunluğu: uint64][MAGIC]
+"""
+import os
+import json
+import mmap
+import zlib
+import struct
+import numpy as np
+
+MAGIC = b'CHNKST01'
+MAGIC_ZLIB = b'CHNKSTZ1'
+TRAILER = struct.Struct('<QQQ8s')
+
+
+class ChunkStoreWriter:
+    """
+    Parçaları artan ID sırasıyla diske akış halinde yazar. close() çağrılana kadar dosya
+    geçici bir adla tutulur, sonra atomik olarak yerine taşınır.
+    """
+
+    def __init__(self, path: str, compress=False, level=6):
+        self.path = path
+        self.compress = compress
+        self.level = level
+        self._magic = MAGIC_ZLIB if compress else MAGIC
+        self._tmp_path = f"{path}.{os.getpid()}.tmp"
+        self._file = open(self._tmp_path, 'wb')
+        self._file.write(self._magic)
+        self._ids = []
+        self._offsets = [0]
+        self._sources = []
+        self._source_index = {}
+        self._source_names = []
+        self._last_id = -1
+
+    def add(self, chunk_id: int, source: str, text):
+        """
+        Bir parça ekler. text str veya hazır UTF-8 byte dizisi olabilir.
+        """
+        data = text if isinstance(text, bytes) else text.encode('utf-8')
+        if self.compress:
+            data = zlib.compress(data, self.level)
+        self.add_stored(chunk_id, source, data)
+
+    def add_stored(self, chunk_id: int, source: str, data: bytes):
+        """
+        Parçayı depodaki biçimiyle (aynı sıkıştırma ayarlı bir depodan okunduğu gibi) ekler.
+        """
+        if chunk_id <= self._last_id:
+            raise ValueError(f"Parça ID'leri artan sırada eklenmelidir: {chunk_id} <= {self._last_id}")
+        self._file.write(data)
+        if source not in self._source_index:
+            self._source_index[source] = len(self._source_names)
+            self._source_names.append(source)
+        self._ids.append(chunk_id)
+        self._offsets.append(self._offsets[-1] + len(data))
+        self._sources.append(self._source_index[source])
+        self._last_id = chunk_id
+
+    def __len__(self):
+        return len(self._ids)
+
+    def close(self):
+        footer_offset = len(self._magic) + self._offsets[-1]
+        source_json = json.dumps(self._source_names, ensure_ascii=False).encode('utf-8')
+        self._file.write(np.asarray(self._ids, dtype='<i8').tobytes())
+        self._file.write(np.asarray(self._offsets, dtype='<i8').tobytes())
+        self._file.write(np.asarray(self._sources, dtype='<i4').tobytes())
+        self._file.write(source_json)
+        self._file.write(TRAILER.pack(footer_offset, len(self._ids), len(source_json), self._magic))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self):
+        self._file.close()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+
+class ChunkStore:
+    """
+    ChunkStoreWriter ile yazılmış dosyayı salt okunur mmap ile açar.
+    ID ile erişim ikili arama (searchsorted) üzerinden yapılır.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        size = len(self._mmap)
+        header = self._mmap[:len(MAGIC)]
+        if size < len(MAGIC) + TRAILER.size or header not in (MAGIC, MAGIC_ZLIB):
+            raise ValueError(f"Geçersiz parça dosyası: {path}")
+        self.compressed = header == MAGIC_ZLIB
+        footer_offset, n, source_len, magic = TRAILER.unpack(self._mmap[size - TRAILER.size:])
+        if magic != header:
+            raise ValueError(f"Parça dosyası eksik yazılmış: {path}")
+
+        pos = footer_offset
+        self.ids = np.frombuffer(self._mmap, dtype='<i8', count=n, offset=pos)
+        pos += 8 * n
+        self._offsets = np.frombuffer(self._mmap, dtype='<i8', count=n + 1, offset=pos)
+        pos += 8 * (n + 1)
+        self._sources = np.frombuffer(self._mmap, dtype='<i4', count=n, offset=pos)
+        pos += 4 * n
+        self.source_names = json.loads(self._mmap[pos:pos + source_len].decode('utf-8'))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _position(self, chunk_id):
+        pos = int(np.searchsorted(self.ids, chunk_id))
+        if pos < len(self.ids) and self.ids[pos] == chunk_id:
+            return pos
+        return None
+
+    def __contains__(self, chunk_id):
+        return self._position(chunk_id) is not None
+
+    def _raw(self, pos) -> bytes:
+        start = len(MAGIC) + int(self._offsets[pos])
+        end = len(MAGIC) + int(self._offsets[pos + 1])
+        return self._mmap[start:end]
+
+    def decode(self, data: bytes) -> str:
+        """
+        Depodaki biçimdeki (iter_raw'dan gelen) parçayı metne çevirir.
+        """
+        if self.compressed:
+            data = zlib.decompress(data)
+        return data.decode('utf-8')
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._mmap)
+
+    def get(self, chunk_id, default=None):
+        pos = self._position(chunk_id)
+        if pos is None:
+            return default
+        return self.decode(self._raw(pos))
+
+    def __getitem__(self, chunk_id):
+        pos = self._position(chunk_id)
+        if pos is None:
+            raise KeyError(chunk_id)
+        return self.decode(self._raw(pos))
+
+    def get_source(self, chunk_id):
+        """
+        Parçanın geldiği kaynak dosyanın adını döndürür.
+        """
+        pos = self._position(chunk_id)
+        if pos is None:
+            return None
+        return self.source_names[self._sources[pos]]
+
+    def iter_raw(self, positions=None):
+        """
+        Parçaları (id, kaynak, depodaki byte dizisi) olarak ID sırasıyla üretir; metin çözülmez.
+        positions: sadece bu sıra numaralarındaki parçalar (verilmezse hepsi)
+        """
+        for pos in (range(len(self.ids)) if positions is None else positions):
+            yield int(self.ids[pos]), self.source_names[self._sources[pos]], self._raw(pos)
+
+    def items(self):
+        for pos in range(len(self.ids)):
+            yield int(self.ids[pos]), self.decode(self._raw(pos))
+
+    def values(self):
+        for pos in range(len(self.ids)):
+            yield self.decode(self._raw(pos))
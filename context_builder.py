@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Context Builder - Aramadan gelen parçalardan LLM istemine girecek bağlamı oluşturur.
+
+1. Aynı metni taşıyan parçalar (ör. aynı tablo satırının satır ve mağaza metinleri
+   aynı içeriğe sahipse) ve vektörü neredeyse aynı olan parçalar elenir.
+2. Kalanlar arasından maksimum marjinal alaka (MMR) ile hem sorguya yakın hem de
+   birbirinden farklı parçalar seçilir.
+3. Seçim, yaklaşık token sayısı (karakter / 4) üzerinden verilen bütçeye sığdırılır;
+   aynı dokümanın art arda gelen ve örtüşen parçaları örtüşme çıkarılarak birleştirilir.
+"""
+import re
+import threading
+
+import numpy as np
+
+_SOURCE_PREFIX = re.compile(r'^Kaynak: (?P<source>[^\n]*)\nİçerik: ', re.DOTALL)
+_SPACES = re.compile(r'\s+')
+
+
+def _split_source(text: str):
+    match = _SOURCE_PREFIX.match(text)
+    if match:
+        return match.group('source'), text[match.end():]
+    return None, text
+
+
+def _overlap(left: str, right: str, max_overlap: int = 400, min_overlap: int = 20) -> int:
+    """
+    left'in sonu ile right'ın başının ortak olduğu en uzun kısmın uzunluğu.
+    """
+    for size in range(min(len(left), len(right), max_overlap), min_overlap - 1, -1):
+        if left.endswith(right[:size]):
+            return size
+    return 0
+
+
+class ContextBuilder:
+    """
+    Tekilleştirme + MMR + token bütçesi ile bağlam seçer ve tasarruf istatistiklerini tutar.
+    """
+
+    def __init__(self, token_budget=800, mmr_lambda=0.7, dedupe_threshold=0.97, max_chunks=5,
+                 chars_per_token=4):
+        """
+        token_budget: bağlam için ayrılan yaklaşık token sayısı
+        mmr_lambda: 1'e yakın değerler alakayı, 0'a yakın değerler çeşitliliği öne çıkarır
+        dedupe_threshold: bu kosinüs benzerliğinin üstündeki parçalar aynı kabul edilir
+        max_chunks: seçilecek en fazla parça sayısı
+        """
+        self.token_budget = token_budget
+        self.mmr_lambda = mmr_lambda
+        self.dedupe_threshold = dedupe_threshold
+        self.max_chunks = max_chunks
+        self.chars_per_token = chars_per_token
+        self._lock = threading.Lock()
+        self._totals = {'queries': 0, 'candidates': 0, 'duplicates': 0, 'selected': 0, 'merged': 0,
+                        'baseline_chars': 0, 'context_chars': 0}
+
+    def count_tokens(self, text: str) -> int:
+        return -(-len(text) // self.chars_per_token)
+
+    @staticmethod
+    def _normalized(text: str) -> str:
+        return _SPACES.sub(' ', _split_source(text)[1]).strip().lower()
+
+    def _mmr_order(self, query_vector, vectors):
+        """
+        Adayları MMR sırasına dizer (vektörler birim uzunlukta).
+        """
+        relevance = vectors @ query_vector
+        similarity = vectors @ vectors.T
+        remaining = list(range(len(vectors)))
+        order = []
+        max_similarity = np.full(len(vectors), -np.inf)
+        while remaining:
+            if order:
+                scores = [self.mmr_lambda * relevance[i] - (1 - self.mmr_lambda) * max_similarity[i]
+                          for i in remaining]
+            else:
+                scores = [relevance[i] for i in remaining]
+            best = remaining.pop(int(np.argmax(scores)))
+            order.append(best)
+            max_similarity = np.maximum(max_similarity, similarity[best])
+        return order
+
+    def _merge_adjacent(self, selected):
+        """
+        Aynı kaynaktan art arda ID'li ve örtüşen parçaları tek parçada birleştirir.
+        selected: (id, metin) listesi. Dönen değer: (metinler, birleştirme sayısı)
+        """
+        merged_texts = []
+        merges = 0
+        previous = None  # (son id, kaynak, metin)
+        for chunk_id, text in sorted(selected):
+            source, body = _split_source(text)
+            if previous and source is not None and previous[1] == source and chunk_id == previous[0] + 1:
+                size = _overlap(previous[2], body)
+                if size:
+                    combined = previous[2] + body[size:]
+                    merged_texts[-1] = f"Kaynak: {source}\nİçerik: {combined}"
+                    previous = (chunk_id, source, combined)
+                    merges += 1
+                    continue
+            merged_texts.append(text)
+            previous = (chunk_id, source, body)
+        return merged_texts, merges
+
+    def build(self, query_embedding, hits, embed_fn, pinned=(), baseline_chars=None):
+        """
+        Bağlamı oluşturur.
+        query_embedding: sorgu vektörü (None ise, ör. model henüz yüklenmediyse, MMR yerine arama sırası kullanılır)
+        hits: aramadan gelen (parça id, metin) listesi (alaka sırasıyla)
+        embed_fn: embed_fn(ids, texts) -> parça vektörleri (indeksten geri oluşturulur)
+        pinned: bütçeden önce yer ayrılan, mutlaka girecek metinler (ör. mağaza satırı)
+        baseline_chars: karşılaştırma için eski yöntemle oluşacak bağlamın uzunluğu
+        Dönen değer: (metin listesi, istatistik sözlüğü)
+        """
+        pinned = [text for text in pinned if text]
+        budget = self.token_budget - sum(self.count_tokens(text) for text in pinned)
+
+        # 1) Metni aynı olanlar (kaynak öneki hariç, boşluk/büyük-küçük harf farkı gözetmeden)
+        seen = {self._normalized(text) for text in pinned}
+        candidates = []
+        for chunk_id, text in hits:
+            key = self._normalized(text)
+            if key in seen:
+                continue
+            seen.add(key)
+            candidates.append((chunk_id, text))
+        duplicates = len(hits) - len(candidates)
+
+        selected = []
+        if candidates and budget > 0:
+            vectors = None
+            order = range(len(candidates))
+            if query_embedding is not None:
+                vectors = np.asarray(embed_fn([c[0] for c in candidates], [c[1] for c in candidates]), dtype='float32')
+                vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+                query_vector = np.asarray(query_embedding, dtype='float32').reshape(-1)
+                query_vector = query_vector / max(float(np.linalg.norm(query_vector)), 1e-12)
+                order = self._mmr_order(query_vector, vectors)
+
+            # 2) MMR sırasıyla, 3) bütçeye sığanlar; neredeyse aynı vektörlü parçalar atlanır
+            used = 0
+            chosen = []
+            for i in order:
+                if len(selected) >= self.max_chunks:
+                    break
+                if vectors is not None and chosen and float(np.max(vectors[chosen] @ vectors[i])) >= self.dedupe_threshold:
+                    duplicates += 1
+                    continue
+                tokens = self.count_tokens(candidates[i][1])
+                if used + tokens > budget:
+                    continue
+                used += tokens
+                chosen.append(i)
+                selected.append(candidates[i])
+
+        texts, merges = self._merge_adjacent(selected)
+        context = pinned + texts
+        context_chars = sum(len(text) for text in context)
+        if baseline_chars is None:
+            baseline_chars = sum(len(text) for _, text in hits)
+        stats = {
+            'candidates': len(hits),
+            'duplicates': duplicates,
+            'selected': len(selected),
+            'merged': merges,
+            'pinned': len(pinned),
+            'tokens': sum(self.count_tokens(text) for text in context),
+            'budget': self.token_budget,
+            'baseline_chars': baseline_chars,
+            'context_chars': context_chars
+        }
+        with self._lock:
+            totals = self._totals
+            totals['queries'] += 1
+            for key in ('candidates', 'duplicates', 'selected', 'merged', 'baseline_chars', 'context_chars'):
+                totals[key] += stats[key]
+        return context, stats
+
+    def stats(self) -> dict:
+        """
+        Tüm sorgular için toplam/ortalama değerler ve eski yönteme göre karakter tasarrufu.
+        """
+        with self._lock:
+            totals = dict(self._totals)
+        queries = totals['queries']
+        baseline = totals['baseline_chars']
+        return {
+            'token_budget': self.token_budget,
+            'mmr_lambda': self.mmr_lambda,
+            'queries': queries,
+            'avg_selected': round(totals['selected'] / queries, 2) if queries else 0.0,
+            'avg_duplicates': round(totals['duplicates'] / queries, 2) if queries else 0.0,
+            'avg_context_chars': round(totals['context_chars'] / queries, 1) if queries else 0.0,
+            'avg_baseline_chars': round(baseline / queries, 1) if queries else 0.0,
+            'char_reduction': round(1 - totals['context_chars'] / baseline, 4) if baseline else 0.0
+        }
@@ -3,11 +3,118 @@
 Universal Data Loader - Farklı formatlardaki (Excel, CSV, PDF, DOCX) dosyaları okur.
 """
 import os
+import re
+import logging
+import hashlib
 import pandas as pd
 import PyPDF2
 import docx
 from typing import Any, Dict, List, Union
 
+logger = logging.getLogger(__name__)
+
+def iter_pdf_pages(file_path: str):
+    """
+    Bir PDF dosyasının metnini sayfa sayfa üretir (her sayfanın sonuna satır sonu eklenir).
+    """
+    with open(file_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        for page in pdf_reader.pages:
+            yield page.extract_text() + "\n"
+
+
+def iter_docx_paragraphs(file_path: str):
+    """
+    Bir Word (.docx) dosyasının metnini paragraf paragraf üretir.
+    """
+    doc = docx.Document(file_path)
+    for para in doc.paragraphs:
+        yield para.text + "\n"
+
+
+TEXT_READERS = {
+    '.pdf': ('PDF', iter_pdf_pages),
+    '.docx': ('DOCX', iter_docx_paragraphs),
+}
+
+
+class TextStats:
+    """
+    Metin parçalarından, metnin tamamını tutmadan doküman istatistiklerini toplar.
+    """
+
+    def __init__(self):
+        self.char_count = 0
+        self.word_count = 0
+        self.newline_count = 0
+        self.has_numbers = False
+        self.has_dates = False
+        self.preview = ""
+
+    def update(self, piece: str):
+        self.char_count += len(piece)
+        self.word_count += len(piece.split())
+        self.newline_count += piece.count('\n')
+        self.has_numbers = self.has_numbers or bool(re.search(r'\d+', piece))
+        self.has_dates = self.has_dates or bool(re.search(r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}', piece))
+        if len(self.preview) < 200:
+            self.preview += piece[:200 - len(self.preview)]
+
+
+class TextSource:
+    """
+    Metni belleğe tamamen almadan, her gezinmede dosyadan sayfa/paragraf parçaları
+    halinde okunan doküman. Sadece dosya yolunu taşıdığı için süreçler arasında taşınabilir.
+    İlk tam gezinmede (ör. parçalara ayırırken) metin istatistikleri de toplanır ve stats'ta
+    saklanır; analiz için dosya ikinci kez okunmaz.
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.file_extension = os.path.splitext(file_path)[1].lower()
+        if self.file_extension not in TEXT_READERS:
+            raise ValueError(f"Akış ile okunamayan dosya formatı: {self.file_extension}")
+        self.stats = None
+
+    def __iter__(self):
+        label, reader = TEXT_READERS[self.file_extension]
+        stats = TextStats() if self.stats is None else None
+        try:
+            for piece in reader(self.file_path):
+                if stats is not None:
+                    stats.update(piece)
+                yield piece
+        except Exception as e:
+            logger.error(f"❌ {label} dosyası okunurken hata oluştu: {self.file_path} - Hata: {e}")
+        if stats is not None:
+            self.stats = stats
+
+    def scan(self) -> TextStats:
+        """
+        İstatistikleri döndürür; henüz bir tam gezinme yapılmadıysa dosyayı bir kez okur.
+        """
+        if self.stats is None:
+            for _ in self:
+                pass
+        return self.stats
+
+    def content_hash(self) -> str:
+        """
+        Dosya içeriğinin (byte) SHA-256 özetini parça parça okuyarak hesaplar.
+        """
+        hasher = hashlib.sha256()
+        with open(self.file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                hasher.update(block)
+        return hasher.hexdigest()
+
+    def read(self) -> str:
+        return "".join(self)
+
+    def __repr__(self):
+        return f"TextSource({self.file_path!r})"
+
+
 class UniversalDataLoader:
     """
     Farklı dosya formatlarından veri okumak için birleşik bir arayüz sağlar.
@@ -18,7 +125,7 @@ class UniversalDataLoader:
         """
         DataLoader sınıfını başlatır.
         """
-        print("🚀 Universal Data Loader başlatıldı.")
+        logger.info("🚀 Universal Data Loader başlatıldı.")
 
     def load_excel(self, file_path: str) -> pd.DataFrame:
         """
@@ -26,10 +133,10 @@ class UniversalDataLoader:
         """
         try:
             df = pd.read_excel(file_path)
-            print(f"✅ Excel dosyası başarıyla okundu: {file_path}")
+            logger.info(f"✅ Excel dosyası başarıyla okundu: {file_path}")
             return df
         except Exception as e:
-            print(f"❌ Excel dosyası okunurken hata oluştu: {file_path} - Hata: {e}")
+            logger.error(f"❌ Excel dosyası okunurken hata oluştu: {file_path} - Hata: {e}")
             return pd.DataFrame() # Hata durumunda boş DataFrame döndür
 
     def load_csv(self, file_path: str) -> pd.DataFrame:
@@ -38,49 +145,51 @@ class UniversalDataLoader:
         """
         try:
             df = pd.read_csv(file_path)
-            print(f"✅ CSV dosyası başarıyla okundu: {file_path}")
+            logger.info(f"✅ CSV dosyası başarıyla okundu: {file_path}")
             return df
         except Exception as e:
-            print(f"❌ CSV dosyası okunurken hata oluştu: {file_path} - Hata: {e}")
+            logger.error(f"❌ CSV dosyası okunurken hata oluştu: {file_path} - Hata: {e}")
             return pd.DataFrame()
 
     def load_pdf(self, file_path: str) -> str:
         """
         Bir PDF dosyasının metin içeriğini okur.
         """
-        text_content = ""
         try:
-            with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                for page in pdf_reader.pages:
-                    text_content += page.extract_text() + "\n"
-            print(f"✅ PDF dosyası başarıyla okundu: {file_path}")
+            text_content = "".join(iter_pdf_pages(file_path))
+            logger.info(f"✅ PDF dosyası başarıyla okundu: {file_path}")
             return text_content
         except Exception as e:
-            print(f"❌ PDF dosyası okunurken hata oluştu: {file_path} - Hata: {e}")
+            logger.error(f"❌ PDF dosyası okunurken hata oluştu: {file_path} - Hata: {e}")
             return "" # Hata durumunda boş metin döndür
 
     def load_docx(self, file_path: str) -> str:
         """
         Bir Word (.docx) dosyasının metin içeriğini okur.
         """
-        text_content = ""
         try:
-            doc = docx.Document(file_path)
-            for para in doc.paragraphs:
-                text_content += para.text + "\n"
-            print(f"✅ DOCX dosyası başarıyla okundu: {file_path}")
+            text_content = "".join(iter_docx_paragraphs(file_path))
+            logger.info(f"✅ DOCX dosyası başarıyla okundu: {file_path}")
             return text_content
         except Exception as e:
-            print(f"❌ DOCX dosyası okunurken hata oluştu: {file_path} - Hata: {e}")
+            logger.error(f"❌ DOCX dosyası okunurken hata oluştu: {file_path} - Hata: {e}")
             return ""
 
-    def load_data(self, file_path: str) -> Union[pd.DataFrame, str, None]:
+    def open_text_source(self, file_path: str) -> TextSource:
+        """
+        PDF/DOCX dosyası için metni parça parça okuyan bir TextSource döndürür.
+        """
+        source = TextSource(file_path)
+        logger.info(f"✅ {TEXT_READERS[source.file_extension][0]} dosyası akış ile okunmak üzere açıldı: {file_path}")
+        return source
+
+    def load_data(self, file_path: str, stream_text=False) -> Union[pd.DataFrame, str, TextSource, None]:
         """
         Dosya uzantısını kontrol eder ve uygun yükleyici fonksiyonunu çağırır.
+        stream_text=True ise PDF/DOCX metni belleğe alınmaz, bunun yerine TextSource döner.
         """
         if not os.path.exists(file_path):
-            print(f"❌ Dosya bulunamadı: {file_path}")
+            logger.error(f"❌ Dosya bulunamadı: {file_path}")
             return None
 
         _, file_extension = os.path.splitext(file_path)
@@ -90,12 +199,14 @@ class UniversalDataLoader:
             return self.load_excel(file_path)
         elif file_extension == '.csv':
             return self.load_csv(file_path)
+        elif stream_text and file_extension in TEXT_READERS:
+            return self.open_text_source(file_path)
         elif file_extension == '.pdf':
             return self.load_pdf(file_path)
         elif file_extension == '.docx':
             return self.load_docx(file_path)
         else:
-            print(f"⚠️ Desteklenmeyen dosya formatı: {file_extension}. Sadece .xlsx, .csv, .pdf, .docx desteklenmektedir.")
+            logger.warning(f"⚠️ Desteklenmeyen dosya formatı: {file_extension}. Sadece .xlsx, .csv, .pdf, .docx desteklenmektedir.")
             return None
 
 # --- Bu script'i doğrudan çalıştırmak için test bölümü ---
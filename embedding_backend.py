@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Embedding Backend - Cümle vektörleştirici modelini seçilen arka uçla (PyTorch, ONNX Runtime
+veya int8 dinamik nicemlenmiş ONNX) yükler ve metinleri uzunluğa göre gruplanmış
+(padding'i az) yığınlar halinde kodlar.
+
+sentence-transformers bir encode() çağrısı içindeki metinleri zaten uzunluğa göre sıralar,
+ancak her yığını sabit sayıda metinle doldurur: kısa tablo satırları da uzun doküman
+parçaları da 32'şer kodlanır. Burada yığınlar token bütçesiyle kurulur; kısa metinler
+daha büyük, uzun metinler daha küçük yığınlarda kodlanır ve yığın başına doldurulan
+(padding) token sayısı sabit kalır.
+
+ONNX arka uçları için onnxruntime ve optimum gerekir (pip install "sentence-transformers[onnx]");
+kurulu değilse PyTorch'a geri düşülür.
+"""
+import os
+import logging
+import importlib.util
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+EMBED_BACKENDS = ('torch', 'onnx', 'onnx_int8')
+
+
+def resolve_backend(backend: str) -> str:
+    """
+    İstenen arka ucu, kurulu paketlere göre gerçekte kullanılacak olanla değiştirir.
+    """
+    if backend not in EMBED_BACKENDS:
+        raise ValueError(f"Desteklenmeyen embedding arka ucu: {backend}. Seçenekler: {', '.join(EMBED_BACKENDS)}")
+    if backend != 'torch' and (importlib.util.find_spec('onnxruntime') is None
+                               or importlib.util.find_spec('optimum') is None):
+        logger.warning(f"⚠️ '{backend}' için onnxruntime/optimum kurulu değil; PyTorch kullanılacak. "
+                       f"(pip install \"sentence-transformers[onnx]\")")
+        return 'torch'
+    return backend
+
+
+def _onnx_model_kwargs(threads):
+    import onnxruntime
+    model_kwargs = {'provider': 'CPUExecutionProvider'}
+    if threads:
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+        model_kwargs['session_options'] = options
+    return model_kwargs
+
+
+def _load_onnx_int8(model_name: str, onnx_dir: str, quantization: str, threads):
+    """
+    int8 nicemlenmiş ONNX modelini onnx_dir'den açar; yoksa bir kez dışa aktarıp nicemler.
+    """
+    from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+    file_name = f"onnx/model_qint8_{quantization}.onnx"
+    if not os.path.exists(os.path.join(onnx_dir, file_name)):
+        logger.info(f"⚙️ '{model_name}' ONNX'e aktarılıp int8 ({quantization}) nicemleniyor -> '{onnx_dir}'")
+        exported = SentenceTransformer(model_name, backend='onnx', device='cpu')
+        exported.save(onnx_dir)
+        export_dynamic_quantized_onnx_model(exported, quantization, onnx_dir)
+    model_kwargs = _onnx_model_kwargs(threads)
+    model_kwargs['file_name'] = file_name
+    return SentenceTransformer(onnx_dir, backend='onnx', device='cpu', model_kwargs=model_kwargs)
+
+
+def load_embedding_model(model_name: str, backend='torch', batch_size=64, batch_tokens=4096, threads=None,
+                         onnx_dir='onnx_model', quantization='avx2'):
+    """
+    Modeli seçilen arka uçla yükler ve EmbeddingModel olarak döndürür.
+    backend: 'torch', 'onnx' veya 'onnx_int8'
+    batch_size / batch_tokens: yığın başına en fazla metin ve doldurulmuş token sayısı
+    threads: işlemci içi (intra-op) thread sayısı (None: kütüphane varsayılanı)
+    onnx_dir / quantization: int8 modelin saklandığı klasör ve nicemleme profili
+        ('avx2', 'avx512', 'avx512_vnni', 'arm64')
+    """
+    # torch ve sentence-transformers içe aktarımı ağırdır; sadece model gerektiğinde yapılır
+    from sentence_transformers import SentenceTransformer
+    backend = resolve_backend(backend)
+    if backend == 'torch':
+        if threads:
+            import torch
+            torch.set_num_threads(threads)
+        model = SentenceTransformer(model_name, device='cpu')
+    elif backend == 'onnx':
+        model = SentenceTransformer(model_name, backend='onnx', device='cpu', model_kwargs=_onnx_model_kwargs(threads))
+    else:
+        model = _load_onnx_int8(model_name, onnx_dir, quantization, threads)
+    return EmbeddingModel(model, backend, batch_size=batch_size, batch_tokens=batch_tokens)
+
+
+class EmbeddingModel:
+    """
+    SentenceTransformer sarmalayıcısı: encode() metinleri token uzunluğuna göre sıralar,
+    token bütçeli yığınlar halinde kodlar ve vektörleri girdi sırasıyla döndürür.
+    """
+
+    def __init__(self, model, backend='torch', batch_size=64, batch_tokens=4096):
+        self.model = model
+        self.backend = backend
+        self.batch_size = batch_size
+        self.batch_tokens = batch_tokens
+        self.max_length = getattr(model, 'max_seq_length', None) or 512
+
+    def get_sentence_embedding_dimension(self) -> int:
+        # sentence-transformers 6 metodu get_embedding_dimension olarak yeniden adlandırdı
+        getter = getattr(self.model, 'get_embedding_dimension', None) or self.model.get_sentence_embedding_dimension
+        return getter()
+
+    def _token_lengths(self, texts: list) -> np.ndarray:
+        tokenizer = getattr(self.model, 'tokenizer', None)
+        if tokenizer is not None:
+            try:
+                encoded = tokenizer(texts, truncation=True, max_length=self.max_length, return_length=True)
+                return np.asarray(encoded['length'], dtype='int64')
+            except (TypeError, KeyError, ValueError):
+                pass
+        # Tokenizer yoksa yaklaşık değer: 4 karakter ~ 1 token
+        return np.minimum(np.asarray([len(text) // 4 + 2 for text in texts], dtype='int64'), self.max_length)
+
+    def buckets(self, texts: list, batch_size=None) -> list:
+        """
+        Metinleri kısa -> uzun sıralar ve (en uzun uzunluk x metin sayısı) batch_tokens'ı
+        veya metin sayısı batch_size'ı geçmeyecek şekilde yığınlara böler.
+        Dönen değer: sıra numarası dizilerinden oluşan liste
+        """
+        batch_size = batch_size or self.batch_size
+        lengths = self._token_lengths(texts)
+        order = np.argsort(lengths, kind='stable')
+        batches = []
+        start = 0
+        for end in range(1, len(order) + 1):
+            size = end - start
+            # Sıralı olduğu için yığının en uzun metni son eklenendir
+            if size > batch_size or size * lengths[order[end - 1]] > self.batch_tokens:
+                if size > 1:
+                    batches.append(order[start:end - 1])
+                    start = end - 1
+        if start < len(order):
+            batches.append(order[start:])
+        return batches
+
+    def encode(self, texts, batch_size=None, **kwargs) -> np.ndarray:
+        """
+        Metinlerin vektörlerini (len(texts), d) float32 matrisi olarak döndürür.
+        batch_size verilirse yığın başına metin sınırı olarak kullanılır.
+        """
+        texts = list(texts)
+        dimension = self.get_sentence_embedding_dimension()
+        if not texts:
+            return np.zeros((0, dimension), dtype='float32')
+        embeddings = np.empty((len(texts), dimension), dtype='float32')
+        for batch in self.buckets(texts, batch_size):
+            embeddings[batch] = self.model.encode([texts[i] for i in batch], batch_size=len(batch),
+                                                  convert_to_numpy=True, show_progress_bar=False)
+        return embeddings
+
+    def describe(self) -> dict:
+        return {'backend': self.backend, 'batch_size': self.batch_size, 'batch_tokens': self.batch_tokens,
+                'max_length': self.max_length}
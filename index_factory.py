@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Index Factory - FAISS indeks türlerini (flat, IVF-Flat, IVF-PQ, HNSW) ve sıkıştırılmış
+depolamalı türleri (float16, int8 skaler nicemleme, PQ) oluşturur, eğitir ve sorgu
+anındaki arama parametrelerini (nprobe, efSearch) ayarlar.
+
+Vektör başına bellek (384 boyut): flat 1536 B, fp16 768 B, sq8 / ivf_sq8 384 B,
+pq / ivf_pq pq_m B (varsayılan 48). Sıkıştırılmış türlerin diskteki boyutu da aynı oranda küçülür.
+"""
+import os
+import logging
+import math
+import numpy as np
+import faiss
+
+logger = logging.getLogger(__name__)
+
+INDEX_TYPES = ('flat', 'ivf_flat', 'ivf_pq', 'hnsw', 'fp16', 'sq8', 'pq', 'ivf_sq8')
+
+# IVF kümeleri ve PQ kod kitapları için küme başına önerilen en az eğitim noktası
+MIN_POINTS_PER_CENTROID = 39
+
+
+def default_nlist(num_vectors: int) -> int:
+    """
+    Vektör sayısına göre makul bir IVF küme sayısı (nlist) seçer.
+    """
+    nlist = int(4 * math.sqrt(max(num_vectors, 1)))
+    return max(1, min(nlist, num_vectors // MIN_POINTS_PER_CENTROID))
+
+
+def min_training_points(index_type: str, num_vectors: int, nlist=None, pq_nbits=8) -> int:
+    """
+    İndeks türünün num_vectors vektörle eğitilebilmesi için gereken en az vektör sayısı
+    (eğitim gerektirmeyen türlerde 0).
+    """
+    if index_type not in ('ivf_flat', 'ivf_pq', 'ivf_sq8', 'pq'):
+        return 0
+    if index_type == 'pq':
+        return 2 ** pq_nbits
+    min_points = MIN_POINTS_PER_CENTROID * (nlist or default_nlist(num_vectors))
+    if index_type == 'ivf_pq':
+        min_points = max(min_points, 2 ** pq_nbits)
+    return min_points
+
+
+def create_index(index_type: str, d: int, num_vectors: int, nlist=None, pq_m=48, pq_nbits=8, hnsw_m=32):
+    """
+    İstenen türde, ID eşlemeli (IndexIDMap2) boş bir indeks oluşturur.
+    Eğitim için yeterli vektör yoksa düz (flat) indekse geri düşer.
+    Dönen değer: (indeks, gerçekte kullanılan indeks türü)
+    """
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Desteklenmeyen indeks türü: {index_type}. Seçenekler: {', '.join(INDEX_TYPES)}")
+
+    nlist = nlist or default_nlist(num_vectors)
+    min_points = min_training_points(index_type, num_vectors, nlist, pq_nbits)
+    if num_vectors < min_points:
+        logger.warning(f"⚠️ '{index_type}' için {num_vectors} vektör yetersiz (en az {min_points}). Flat indeks kullanılacak.")
+        index_type = 'flat'
+    if index_type in ('ivf_pq', 'pq') and d % pq_m != 0:
+        raise ValueError(f"PQ alt vektör sayısı (pq_m={pq_m}) boyutu ({d}) tam bölmelidir.")
+
+    if index_type == 'flat':
+        base = faiss.IndexFlatL2(d)
+    elif index_type == 'ivf_flat':
+        base = faiss.IndexIVFFlat(faiss.IndexFlatL2(d), d, nlist, faiss.METRIC_L2)
+    elif index_type == 'ivf_pq':
+        base = faiss.IndexIVFPQ(faiss.IndexFlatL2(d), d, nlist, pq_m, pq_nbits)
+    elif index_type == 'ivf_sq8':
+        base = faiss.IndexIVFScalarQuantizer(faiss.IndexFlatL2(d), d, nlist, faiss.ScalarQuantizer.QT_8bit,
+                                             faiss.METRIC_L2)
+    elif index_type == 'fp16':
+        base = faiss.IndexScalarQuantizer(d, faiss.ScalarQuantizer.QT_fp16, faiss.METRIC_L2)
+    elif index_type == 'sq8':
+        base = faiss.IndexScalarQuantizer(d, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_L2)
+    elif index_type == 'pq':
+        base = faiss.IndexPQ(d, pq_m, pq_nbits, faiss.METRIC_L2)
+    else:
+        base = faiss.IndexHNSWFlat(d, hnsw_m)
+
+    index = faiss.IndexIDMap2(base)
+    enable_reconstruct(index)
+    return index, index_type
+
+
+def enable_reconstruct(index):
+    """
+    IVF indekslerinde doğrudan eşlemeyi (direct map) açar; böylece vektörler reconstruct ile
+    geri okunabilir (diğer türler bunu zaten destekler). Eşleme indeksle birlikte kaydedilir;
+    eşlemesiz kaydedilmiş eski indeksler açılırken de çağrılır.
+    """
+    ivf = faiss.try_extract_index_ivf(_base_index(index))
+    if ivf is not None and ivf.direct_map.no():
+        ivf.make_direct_map()
+
+
+def train_index(index, embeddings: np.ndarray):
+    """
+    Eğitim gerektiren indeksleri (IVF, PQ) verilen vektörlerle eğitir.
+    """
+    if not index.is_trained:
+        logger.info(f"🎯 İndeks {len(embeddings)} vektörle eğitiliyor...")
+        index.train(np.ascontiguousarray(embeddings, dtype='float32'))
+
+
+def _base_index(index):
+    if isinstance(index, faiss.IndexIDMap):
+        return faiss.downcast_index(index.index)
+    return faiss.downcast_index(index)
+
+
+def describe_index(index) -> str:
+    """
+    İndeksin alt türünü okunabilir bir isim olarak döndürür.
+    """
+    return type(_base_index(index)).__name__
+
+
+def bytes_per_vector(index) -> int:
+    """
+    Bir vektörün indekste kapladığı bayt (IVF türlerinde listelerdeki 8 baytlık ID dahil;
+    IndexIDMap2'nin ID eşlemesi hariç).
+    """
+    base = _base_index(index)
+    ivf = faiss.try_extract_index_ivf(base)
+    if ivf is not None:
+        return int(ivf.code_size) + 8
+    if hasattr(base, 'code_size'):
+        return int(base.code_size)
+    if hasattr(base, 'storage'):
+        # HNSW: vektörler ayrı bir flat indekste, komşu listeleri ayrıca tutulur
+        return int(faiss.downcast_index(base.storage).code_size) + 2 * base.hnsw.nb_neighbors(0) * 4
+    return index.d * 4
+
+
+def memory_report(index, path=None) -> dict:
+    """
+    İndeksin boyut raporu: vektör başına bayt, toplam boyut ve float32 flat depolamaya oranı.
+    path verilirse diskteki dosyanın boyutu, verilmezse serileştirilmiş boyut kullanılır.
+    """
+    total = os.path.getsize(path) if path and os.path.exists(path) else int(faiss.serialize_index(index).size)
+    per_vector = bytes_per_vector(index)
+    return {
+        'index_class': describe_index(index),
+        'vectors': int(index.ntotal),
+        'dimension': int(index.d),
+        'bytes_per_vector': per_vector,
+        'index_bytes': total,
+        'compression_vs_float32': round(index.d * 4 / per_vector, 2) if per_vector else None
+    }
+
+
+def set_search_params(index, nprobe=None, ef_search=None):
+    """
+    Sorgu anındaki arama parametrelerini ayarlar.
+    nprobe: IVF indekslerinde taranacak küme sayısı
+    ef_search: HNSW aramasındaki aday listesi genişliği
+    """
+    base = _base_index(index)
+    ivf = faiss.try_extract_index_ivf(base)
+    if ivf is not None and nprobe:
+        ivf.nprobe = min(int(nprobe), ivf.nlist)
+    if hasattr(base, 'hnsw') and ef_search:
+        base.hnsw.efSearch = int(ef_search)
+
+
+def remove_id_range(index, start_id: int, end_id: int):
+    """
+    [start_id, end_id) aralığındaki ID'leri indeksten siler.
+    Silmeyi desteklemeyen indekslerde (HNSW) kalan vektörlerle indeksi yeniden kurar.
+    """
+    try:
+        return index.remove_ids(faiss.IDSelectorRange(start_id, end_id))
+    except RuntimeError:
+        pass
+
+    ids = faiss.vector_to_array(index.id_map).astype('int64')
+    keep = (ids < start_id) | (ids >= end_id)
+    vectors = _base_index(index).reconstruct_n(0, index.ntotal)
+    index.reset()
+    if keep.any():
+        index.add_with_ids(vectors[keep], ids[keep])
+    return int((~keep).sum())
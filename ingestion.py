@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Ingestion - Dosyaları yükleyip ön analizini (insights) çıkaran, süreç havuzunda
+çalıştırılabilen fonksiyonlar.
+"""
+import os
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+
+import numpy as np
+import pandas as pd
+
+from data_loader import UniversalDataLoader, TextSource, TextStats
+from table_serializer import serialize_table, find_store_column
+
+logger = logging.getLogger(__name__)
+
+TABLE_TYPES = {'.xlsx': 'excel', '.xls': 'excel', '.csv': 'csv'}
+TEXT_TYPES = {'.pdf': 'pdf', '.docx': 'word'}
+
+
+def analyze_table(data: pd.DataFrame, file_type='excel'):
+    """
+    Bir tablonun özetini çıkarır ve satırlarını serileştirir.
+    Dönen değer: (insights, serialize_table sonucu)
+    """
+    insights = {
+        'type': file_type,
+        'shape': data.shape,
+        'columns': list(data.columns),
+        'numeric_columns': list(data.select_dtypes(include=[np.number]).columns),
+        'date_columns': [],
+        'text_columns': list(data.select_dtypes(include=['object']).columns),
+        'sample_data': data.head(3).to_dict('records') if len(data) > 0 else [],
+        'summary': {},
+        'store_rows': {},
+        'department_counts': {},
+        'store_column': None,
+        'dept_column': None
+    }
+
+    for col in data.columns:
+        if any(keyword in col.lower() for keyword in ['tarih', 'date', 'gun', 'day', 'time']):
+            insights['date_columns'].append(col)
+
+    for col in insights['numeric_columns']:
+        insights['summary'][col] = {
+            'min': float(data[col].min()) if not data[col].empty else 0,
+            'max': float(data[col].max()) if not data[col].empty else 0,
+            'mean': float(data[col].mean()) if not data[col].empty else 0,
+            'sum': float(data[col].sum()) if not data[col].empty else 0
+        }
+
+    store_column = find_store_column(data)
+    if store_column:
+        data[store_column] = data[store_column].astype(str).str.strip()  # Ensure store names are strings and clean
+        insights['store_column'] = store_column
+
+    # Satır metinleri ve mağaza satırları tek geçişte üretilir; metinler hafıza oluşturulurken yeniden kullanılır
+    serialized = serialize_table(data)
+    insights['store_rows'] = serialized['store_rows']
+
+    for col in data.columns:
+        if 'departman' in col.lower():
+            insights['dept_column'] = col
+            insights['department_counts'] = data[col].value_counts().to_dict()
+            break
+
+    return insights, serialized
+
+
+def analyze_text(data, file_type='pdf') -> dict:
+    """
+    Bir metin dokümanının özetini çıkarır.
+    data: metnin kendisi veya satır sonuyla biten parçaları üreten bir kaynak (TextSource);
+    parçalar tek tek işlendiği için doküman belleğe tamamen alınmaz. TextSource daha önce
+    (ör. parçalara ayrılırken) baştan sona okunduysa toplanan istatistikler kullanılır.
+    """
+    if isinstance(data, TextSource):
+        stats = data.scan()
+    else:
+        stats = TextStats()
+        for piece in ([data] if isinstance(data, str) else data):
+            stats.update(piece)
+    return {
+        'type': file_type,
+        'char_count': stats.char_count,
+        'word_count': stats.word_count,
+        'line_count': stats.newline_count + 1,
+        'has_numbers': stats.has_numbers,
+        'has_dates': stats.has_dates,
+        'preview': stats.preview + "..." if stats.char_count > 200 else stats.preview
+    }
+
+
+_process_loader = None
+
+
+def load_and_analyze(file_path: str, loader=None) -> dict:
+    """
+    Tek bir dosyayı yükler ve ön analizini yapar. Süreç havuzunda çalıştırılabilir;
+    hatalar dışarı taşınmaz, sonuç sözlüğüne yazılır.
+    loader: kullanılacak UniversalDataLoader (verilmezse süreç başına bir tane oluşturulur)
+    Dönen sözlük: filename, ext, data, insights, serialized, error, analysis_error
+    """
+    filename = os.path.basename(file_path)
+    ext = os.path.splitext(filename)[1].lower()
+    result = {'filename': filename, 'ext': ext, 'data': None, 'insights': None,
+              'serialized': None, 'error': None, 'analysis_error': None}
+    global _process_loader
+    if loader is None:
+        if _process_loader is None:
+            _process_loader = UniversalDataLoader()
+        loader = _process_loader
+    try:
+        result['data'] = loader.load_data(file_path, stream_text=True)
+    except Exception as e:
+        result['error'] = str(e)
+        return result
+
+    data = result['data']
+    if data is None:
+        return result
+    try:
+        if ext in TABLE_TYPES:
+            result['insights'], result['serialized'] = analyze_table(data, TABLE_TYPES[ext])
+        elif ext in TEXT_TYPES and not isinstance(data, TextSource):
+            # Akışla okunan dokümanlar, hafıza oluşturulurken parçalara ayrıldıkları geçişte analiz edilir
+            result['insights'] = analyze_text(data, TEXT_TYPES[ext])
+    except Exception as e:
+        result['analysis_error'] = str(e)
+    return result
+
+
+def _failed(path: str, error) -> dict:
+    filename = os.path.basename(path)
+    return {'filename': filename, 'ext': os.path.splitext(filename)[1].lower(), 'data': None, 'insights': None,
+            'serialized': None, 'error': str(error), 'analysis_error': None}
+
+
+def _run_pool(file_paths: list, workers: int, context) -> dict:
+    """
+    Dosyaları bir süreç havuzunda işler; dosya yolu -> sonuç. Bir işçi süreç çökerse
+    (segfault, OOM) havuz bozulur ve o an bitmemiş dosyalar sonuçta yer almaz.
+    """
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        futures = [(path, executor.submit(load_and_analyze, path)) for path in file_paths]
+        for path, future in futures:
+            try:
+                results[path] = future.result()
+            except BrokenProcessPool:
+                continue
+            except Exception as e:
+                results[path] = _failed(path, e)
+    return results
+
+
+def load_files_parallel(file_paths: list, workers: int) -> list:
+    """
+    Dosyaları bir süreç havuzunda yükler ve analiz eder. Sonuçlar girdi sırasıyla döner;
+    bir dosyadaki hata diğer dosyaları etkilemez. Bir işçi süreç çökerse bitmemiş dosyalar
+    her biri ayrı bir süreçte yeniden denenir; sadece çökmeye yol açan dosya hatalı sayılır.
+    """
+    # 'spawn' ile alt süreçler torch/faiss durumunu kopyalamaz, sadece bu modülü içe aktarır
+    context = multiprocessing.get_context('spawn')
+    results = _run_pool(file_paths, workers, context)
+    unfinished = [path for path in file_paths if path not in results]
+    if unfinished:
+        # Çökmeye hangi dosyanın yol açtığı bilinmediği için kalanlar tek tek denenir
+        logger.warning(f"⚠️ Bir yükleme süreci beklenmedik şekilde sonlandı; {len(unfinished)} dosya yeniden deneniyor")
+        for path in unfinished:
+            results.update(_run_pool([path], 1, context))
+            if path not in results:
+                results[path] = _failed(path, "Dosyayı işleyen süreç beklenmedik şekilde sonlandı")
+    return [results[path] for path in file_paths]
@@ -4,24 +4,129 @@ Knowledge Processor - Metin ve tablo verilerini işler, anlamsal vektörler olu
 ve aranabilir bir FAISS indeksi (AI hafızası) inşa eder.
 """
 import os
+import logging
+import json
+import hashlib
+import itertools
+import threading
+import contextlib
 import numpy as np
 import pandas as pd
 import faiss
-from sentence_transformers import SentenceTransformer
-import pickle
-from thefuzz import fuzz
+
+from cache import LRUCache
+from index_factory import (create_index, train_index, set_search_params, remove_id_range, describe_index, memory_report,
+                           enable_reconstruct, min_training_points)
+from store_matcher import StoreNameMatcher
+from table_serializer import serialize_table, find_store_column
+from data_loader import TextSource
+from chunk_store import ChunkStore, ChunkStoreWriter
+from lexical_index import LexicalIndex, reciprocal_rank_fusion
+from embedding_backend import resolve_backend, load_embedding_model
+from parallel_embedding import ParallelEncoder
+from metrics import QUERY_EMBEDDING_SECONDS, FAISS_SEARCH_SECONDS, LEXICAL_SEARCH_SECONDS
+
+logger = logging.getLogger(__name__)
+
+INDEX_PATH = 'faiss_index.bin'
+CHUNKS_PATH = 'chunks.bin'
+MANIFEST_PATH = 'faiss_manifest.json'
+LEXICAL_PATH = 'lexical_index.npz'
+MANIFEST_VERSION = 3
+# Vektörleri ve IVF listelerini kopyalamadan, dosyadan bellek eşleme (mmap) ile okur
+INDEX_MMAP_FLAGS = faiss.IO_FLAG_MMAP | getattr(faiss, 'IO_FLAG_MMAP_IFC', 0)
 
 class KnowledgeProcessor:
-    def __init__(self, model_name='paraphrase-multilingual-MiniLM-L12-v2'):
+    def __init__(self, model_name='paraphrase-multilingual-MiniLM-L12-v2', index_type='flat',
+                 nlist=None, pq_m=48, hnsw_m=32, nprobe=16, ef_search=64,
+                 query_cache_size=1024, query_cache_ttl=None, embed_batch_size=2048, hybrid=True, rrf_k=60,
+                 compress_chunks=False, embed_backend='torch', encode_batch_size=64, encode_batch_tokens=4096,
+                 embed_threads=None, onnx_dir='onnx_model', quantization='avx2', embed_workers=1):
         """
-        Bilgi işlemciyi başlatır ve embedding modelini yükler.
+        Bilgi işlemciyi başlatır. Embedding modeli (ve torch) ilk ihtiyaç anında ya da
+        load_model() çağrıldığında yüklenir.
+        index_type: 'flat', 'ivf_flat', 'ivf_pq', 'hnsw' veya sıkıştırılmış 'fp16', 'sq8', 'pq', 'ivf_sq8'
+        nprobe / ef_search: IVF ve HNSW indekslerinin sorgu anındaki arama genişliği
+        query_cache_size / query_cache_ttl: sorgu vektörü önbelleğinin kapasitesi ve ömrü (saniye)
+        embed_batch_size: yeniden oluştururken bir seferde okunup uzunluğa göre sıralanarak
+            kodlanan metin parçası sayısı (bellek sınırı)
+        hybrid: vektör aramasını BM25 sözcüksel aramayla birleştir (reciprocal rank fusion)
+        rrf_k: füzyon sabiti; büyüdükçe alt sıralardaki sonuçların ağırlığı artar
+        compress_chunks: metin parçalarını diskte parça başına zlib ile sıkıştır (depo bir
+            sonraki güncellemede yeni ayarla yazılır)
+        embed_backend: 'torch', 'onnx' veya 'onnx_int8' (bkz. embedding_backend.py)
+        encode_batch_size / encode_batch_tokens: model yığını başına en fazla metin / token
+        embed_threads: vektörleştiricinin işlemci içi thread sayısı
+        onnx_dir / quantization: int8 ONNX modelin klasörü ve nicemleme profili
+        embed_workers: tam yeniden oluşturmada vektörleştirme yapan süreç sayısı (1: süreç içinde)
         """
-        print("🤖 Knowledge Processor başlatılıyor...")
-        self.model = SentenceTransformer(model_name)
-        print(f"✅ Embedding modeli '{model_name}' yüklendi.")
+        logger.info("🤖 Knowledge Processor başlatılıyor...")
+        self.model_name = model_name
+        self.embed_backend = resolve_backend(embed_backend)
+        self.embed_options = {'batch_size': encode_batch_size, 'batch_tokens': encode_batch_tokens,
+                              'threads': embed_threads, 'onnx_dir': onnx_dir, 'quantization': quantization}
+        self.embed_workers = embed_workers
+        self._model = None
+        self._model_lock = threading.Lock()
+        self.index_type = index_type
+        self.index_params = {'nlist': nlist, 'pq_m': pq_m, 'hnsw_m': hnsw_m}
+        self.nprobe = nprobe
+        self.ef_search = ef_search
+        self.embed_batch_size = embed_batch_size
+        self.hybrid = hybrid
+        self.compress_chunks = compress_chunks
+        self.rrf_k = rrf_k
         self.index = None
-        self.chunks = []
+        self.chunks = None
+        self.lexical = None
+        self.manifest = self._new_manifest()
         self.store_variations = {}
+        self._store_matcher = None
+        self.query_cache = LRUCache(maxsize=query_cache_size, ttl=query_cache_ttl)
+
+    @property
+    def model(self):
+        """
+        Embedding modeli; ilk erişimde (thread-safe olarak) yüklenir.
+        """
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    self._model = self._load_model()
+        return self._model
+
+    @property
+    def model_loaded(self) -> bool:
+        return self._model is not None
+
+    def adopt_model(self, other: 'KnowledgeProcessor'):
+        """
+        Başka bir işlemcinin yüklü modelini paylaşır (canlı yeniden yüklemede model tekrar yüklenmez).
+        """
+        if other.model_loaded and other.embedding_id == self.embedding_id:
+            self._model = other._model
+
+    def load_model(self):
+        """
+        Modeli şimdi yükler (ısınma aşamasında çağrılır).
+        """
+        return self.model
+
+    def _load_model(self):
+        logger.info(f"⏳ Embedding modeli '{self.model_name}' yükleniyor (arka uç: {self.embed_backend})...")
+        model = load_embedding_model(self.model_name, self.embed_backend, **self.embed_options)
+        logger.info(f"✅ Embedding modeli '{self.model_name}' yüklendi.")
+        return model
+
+    @property
+    def embedding_id(self) -> str:
+        """
+        Vektörleri üreten model; değişirse kayıtlı hafıza yeniden oluşturulur. PyTorch ve
+        float32 ONNX aynı vektörleri ürettiği için aynı kabul edilir, int8 model farklıdır.
+        """
+        if self.embed_backend == 'onnx_int8':
+            return f"{self.model_name}:qint8_{self.embed_options['quantization']}"
+        return self.model_name
 
     def _chunk_text(self, text: str, chunk_size=1000, overlap=150) -> list[str]:
         """
@@ -29,107 +134,557 @@ class KnowledgeProcessor:
         """
         if not isinstance(text, str):
             return []
-            
-        chunks = []
+        return list(self._iter_chunks([text], chunk_size, overlap))
+
+    def _iter_chunks(self, pieces, chunk_size=1000, overlap=150):
+        """
+        Sayfa/paragraf parçalarından gelen metni, tamamını belleğe almadan parçalara ayırır.
+        Çıktı, parçaların birleştirilmiş halini _chunk_text ile bölmekle birebir aynıdır;
+        sayfa sınırlarındaki örtüşme de korunur.
+        """
+        step = chunk_size - overlap
+        buffer = ""
+        for piece in pieces:
+            buffer += piece
+            start = 0
+            while len(buffer) - start >= chunk_size:
+                yield buffer[start:start + chunk_size]
+                start += step
+            buffer = buffer[start:]
         start = 0
-        while start < len(text):
-            end = start + chunk_size
-            chunks.append(text[start:end])
-            start += chunk_size - overlap
-        return chunks
+        while start < len(buffer):
+            yield buffer[start:start + chunk_size]
+            start += step
 
-    def process_knowledge_base(self, knowledge_base: dict, force_rebuild=False):
+    def _content_hash(self, content) -> str:
         """
-        Tüm bilgi tabanını (metinler, tablolar) işler, bir vektör indeksi oluşturur ve kaydeder.
+        Bir kaynak dosyanın içeriğinden (metin veya DataFrame) kararlı bir özet (hash) üretir.
+        """
+        if isinstance(content, TextSource):
+            return content.content_hash()
+        hasher = hashlib.sha256()
+        if isinstance(content, pd.DataFrame):
+            hasher.update(repr(list(content.columns)).encode('utf-8'))
+            hasher.update(pd.util.hash_pandas_object(content, index=True).values.tobytes())
+        else:
+            hasher.update(str(content).encode('utf-8'))
+        return hasher.hexdigest()
+
+    def _collect_store_variations(self, content: pd.DataFrame):
+        """
+        Tablodaki mağaza adlarını ve sadeleştirilmiş varyasyonlarını kaydeder.
+        """
+        store_column = find_store_column(content)
+        if not store_column:
+            return
+        self._store_matcher = None
+        for value in content[store_column]:
+            store_name = str(value).strip()
+            if store_name and store_name.lower() != 'nan':
+                self.store_variations[store_name] = store_name
+                # Add simplified store name variations
+                base_name = store_name.split('-')[0].strip()
+                if base_name != store_name:
+                    self.store_variations[base_name] = store_name
+
+    def _iter_file_chunks(self, filename: str, content, serialized=None):
         """
-        index_path = 'faiss_index.bin'
-        chunks_path = 'chunks.pkl'
+        Tek bir kaynak dosyanın içeriğini metin parçalarına (chunk) dönüştürür.
+        serialized: tablo daha önce serialize_table ile işlendiyse sonucu (tekrar gezilmez)
+        """
+        prefix = f"Kaynak: {filename}\nİçerik: "
+        if isinstance(content, str):
+            for chunk in self._chunk_text(content):
+                yield prefix + chunk
+
+        elif isinstance(content, TextSource):
+            for chunk in self._iter_chunks(content):
+                yield prefix + chunk
 
-        # Check if files exist and are not corrupted, unless forced to rebuild
-        if not force_rebuild and os.path.exists(index_path) and os.path.exists(chunks_path):
-            print("💾 Kayıtlı AI hafızası (indeks ve metin parçaları) bulunuyor, yükleniyor...")
+        elif isinstance(content, pd.DataFrame):
+            if serialized is None:
+                serialized = serialize_table(content)
+            for row_text in serialized['row_texts']:
+                yield prefix + row_text
+            for row_text in serialized['store_texts']:
+                yield prefix + row_text
+
+    def _new_manifest(self) -> dict:
+        # index_type: istenen tür; built_index_type: eğitim için yeterli vektör yoksa düşülen gerçek tür
+        return {'version': MANIFEST_VERSION, 'index_type': self.index_type, 'built_index_type': self.index_type,
+                'embedding': self.embedding_id, 'next_id': 0, 'files': {}}
+
+    def _load_saved_memory(self) -> bool:
+        """
+        Kayıtlı manifest dosyasını ve metin parçası deposunu (mmap) açar; indeksin kendisi,
+        güncelleme gerekip gerekmediği belli olduktan sonra _open_index ile yüklenir.
+        Manifest yoksa (eski format) veya dosyalar bozuksa False döner.
+        """
+        if not (os.path.exists(INDEX_PATH) and os.path.exists(CHUNKS_PATH) and os.path.exists(MANIFEST_PATH)):
+            return False
+        logger.info("💾 Kayıtlı AI hafızası (indeks, metin parçaları ve manifest) bulunuyor, yükleniyor...")
+        try:
+            with open(MANIFEST_PATH, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get('version') != MANIFEST_VERSION:
+                logger.warning("⚠️ Manifest sürümü uyumsuz. Yeni hafıza oluşturulacak.")
+                return False
+            if manifest.get('index_type') != self.index_type:
+                logger.warning(f"⚠️ Kayıtlı indeks türü '{manifest.get('index_type')}', istenen '{self.index_type}'. Yeni hafıza oluşturulacak.")
+                return False
+            # Bu alan eklenmeden önce kaydedilen hafızalar PyTorch modeliyle oluşturulmuştu
+            if manifest.get('embedding', self.model_name) != self.embedding_id:
+                logger.warning(f"⚠️ Kayıtlı vektörler '{manifest.get('embedding', self.model_name)}' ile, istenen "
+                               f"'{self.embedding_id}'. Yeni hafıza oluşturulacak.")
+                return False
+            chunks = ChunkStore(CHUNKS_PATH)
+        except (json.JSONDecodeError, ValueError, OSError) as e:
+            logger.error(f"❌ Kayıtlı dosya bozuk veya boş: {e}. Yeni hafıza oluşturulacak.")
+            return False
+        self.chunks = chunks
+        self.manifest = manifest
+        return True
+
+    def _open_index(self, writable=False) -> bool:
+        """
+        Kayıtlı FAISS indeksini açar. Güncelleme yapılmayacaksa indeks mmap ile açılır;
+        böylece aynı makinedeki işçiler vektörleri sayfa önbelleğinden paylaşır.
+        """
+        try:
+            if writable:
+                index = faiss.read_index(INDEX_PATH)
+            else:
+                try:
+                    index = faiss.read_index(INDEX_PATH, INDEX_MMAP_FLAGS)
+                except RuntimeError:
+                    index = faiss.read_index(INDEX_PATH)
+        except RuntimeError as e:
+            logger.error(f"❌ Kayıtlı indeks okunamadı: {e}. Yeni hafıza oluşturulacak.")
+            return False
+        if index.ntotal != len(self.chunks):
+            logger.warning("⚠️ Kayıtlı indeks ile metin parçaları uyuşmuyor. Yeni hafıza oluşturulacak.")
+            return False
+        # MMR için parça vektörleri indeksten okunur (chunk_embeddings)
+        enable_reconstruct(index)
+        if 'built_index_type' not in self.manifest:
+            # Bu alan eklenmeden önce kaydedilen manifestlerde, flat'e düşülen indeks sınıfından anlaşılır
+            fell_back = self.index_type != 'flat' and describe_index(index) == 'IndexFlatL2'
+            self.manifest['built_index_type'] = 'flat' if fell_back else self.index_type
+        self.index = index
+        logger.info("✅ AI hafızası başarıyla yüklendi.")
+        return True
+
+    def _reset_memory(self):
+        logger.info("🧠 Yeni bir AI hafızası oluşturuluyor...")
+        self.index = None
+        self.chunks = None
+        self.lexical = None
+        self.manifest = self._new_manifest()
+
+    def _prepare_lexical_index(self):
+        """
+        BM25 indeksini diskten açar; yoksa veya bilgi tabanı sürümü değiştiyse parça
+        deposundan yeniden oluşturup kaydeder (vektör gerektirmez, hızlıdır).
+        """
+        if not self.hybrid or not self.chunks:
+            self.lexical = None
+            return
+        version = self.data_version
+        lexical = LexicalIndex.load(LEXICAL_PATH, version)
+        if lexical is None or len(lexical) != len(self.chunks):
+            logger.info("🔤 Sözcüksel (BM25) indeks oluşturuluyor...")
+            lexical = LexicalIndex.build(self.chunks.items(), version)
             try:
-                self.index = faiss.read_index(index_path)
-                with open(chunks_path, 'rb') as f:
-                    self.chunks = pickle.load(f)
-                print("✅ AI hafızası başarıyla yüklendi.")
+                lexical.save(LEXICAL_PATH)
+            except OSError as e:
+                logger.warning(f"⚠️ Sözcüksel indeks kaydedilemedi: {e}")
+        self.lexical = lexical
+        info = lexical.describe()
+        logger.info(f"🔤 Sözcüksel indeks hazır: {info['documents']} parça, {info['terms']} terim")
+
+    def _save_memory(self, writer: ChunkStoreWriter):
+        """
+        İndeksi, metin parçası deposunu ve manifest dosyasını atomik olarak diske yazar.
+        """
+        logger.info(f"💾 AI hafızası '{INDEX_PATH}', '{CHUNKS_PATH}' ve '{MANIFEST_PATH}' dosyalarına kaydediliyor.")
+        suffix = f".{os.getpid()}.tmp"
+        try:
+            faiss.write_index(self.index, INDEX_PATH + suffix)
+            with open(MANIFEST_PATH + suffix, 'w', encoding='utf-8') as f:
+                json.dump(self.manifest, f, ensure_ascii=False, indent=2)
+            # Manifest en son yazılır; yarım kalan bir kayıt bir sonraki açılışta tam yeniden oluşturmaya düşer.
+            os.replace(INDEX_PATH + suffix, INDEX_PATH)
+            writer.close()
+            os.replace(MANIFEST_PATH + suffix, MANIFEST_PATH)
+            logger.info("✅ AI hafızası başarıyla kaydedildi.")
+        except Exception as e:
+            writer.abort()
+            logger.error(f"❌ Hafıza kaydedilirken hata: {e}")
+            return False
+        return True
+
+    def _remove_file_chunks(self, filename: str):
+        """
+        Bir dosyaya ait vektörleri indeksten siler ve ID aralığını döndürür.
+        """
+        entry = self.manifest['files'].pop(filename)
+        start_id, end_id = entry['start_id'], entry['end_id']
+        if end_id > start_id:
+            remove_id_range(self.index, start_id, end_id)
+        return start_id, end_id
+
+    def _copy_kept_chunks(self, writer: ChunkStoreWriter, removed_ranges: list):
+        """
+        Eski depodaki, silinmeyen parçaları yeni depoya kopyalar; sıkıştırma ayarı değişmediyse
+        metinler çözülmeden kopyalanır.
+        """
+        if self.chunks is None:
+            return
+        ids = self.chunks.ids
+        keep = np.ones(len(ids), dtype=bool)
+        for start_id, end_id in removed_ranges:
+            keep &= (ids < start_id) | (ids >= end_id)
+        same_format = self.chunks.compressed == writer.compress
+        for chunk_id, source, raw in self.chunks.iter_raw(np.flatnonzero(keep)):
+            if same_format:
+                writer.add_stored(chunk_id, source, raw)
+            else:
+                writer.add(chunk_id, source, self.chunks.decode(raw))
+
+    def _embed_file_chunks(self, filename: str, content, content_hash: str, writer: ChunkStoreWriter, serialized=None,
+                           encoder=None):
+        """
+        Bir dosyayı parçalara ayırır, vektörlerini gruplar halinde oluşturur ve yeni bir ID aralığı ayırır.
+        Parça metinleri doğrudan depoya yazılır, bellekte biriktirilmez.
+        encoder: ParallelEncoder verilirse gruplar süreç havuzuna gönderilir ve vektörler yerine
+            Future'lar döner (_collect_embeddings ile toplanır)
+        Dönen değer: (ID dizisi, vektör grupları) veya dosyadan parça çıkmadıysa None
+        """
+        start_id = self.manifest['next_id']
+        next_id = start_id
+        embedded = []
+        logger.info(f"⏳ '{filename}' için vektörler oluşturuluyor...")
+        chunk_iter = self._iter_file_chunks(filename, content, serialized)
+        while True:
+            batch = list(itertools.islice(chunk_iter, self.embed_batch_size))
+            if not batch:
+                break
+            if encoder is not None:
+                embedded.append(encoder.submit(batch))
+            else:
+                embedded.append(np.asarray(self.model.encode(batch), dtype='float32'))
+            for chunk in batch:
+                writer.add(next_id, filename, chunk)
+                next_id += 1
+
+        self.manifest['files'][filename] = {'hash': content_hash, 'start_id': start_id, 'end_id': next_id}
+        self.manifest['next_id'] = next_id
+        if not embedded:
+            return None
+        action = "vektörleştirme kuyruğuna alındı" if encoder is not None else "vektörleştirildi"
+        logger.info(f"   📄 '{filename}': {next_id - start_id} metin parçası {action}.")
+        return np.arange(start_id, next_id, dtype='int64'), embedded
+
+    @staticmethod
+    def _collect_embeddings(pending: list) -> list:
+        """
+        (ID dizisi, vektör grupları) listesindeki Future'ları bekler ve grupları birleştirir.
+        """
+        return [(ids, np.concatenate([part.result() if hasattr(part, 'result') else part for part in parts]))
+                for ids, parts in pending]
+
+    def _rebuild_encoder(self, full_rebuild: bool):
+        """
+        Tam yeniden oluşturmada embed_workers > 1 ise süreç havuzu; aksi halde None
+        (küçük artımlı güncellemeler için süreç başlatma maliyetine değmez).
+        """
+        if not full_rebuild or self.embed_workers <= 1:
+            return contextlib.nullcontext(None)
+        return ParallelEncoder(self.model_name, self.embed_backend, self.embed_options, workers=self.embed_workers,
+                               threads_per_worker=self.embed_options['threads'])
+
+    def _add_to_index(self, pending: list):
+        """
+        Yeni vektörleri indekse ekler. İndeks henüz yoksa, türüne göre oluşturulur ve
+        eğitim gerektiriyorsa eldeki vektörlerle eğitilir.
+        """
+        if not pending:
+            return
+        embeddings = np.concatenate([emb for _, emb in pending])
+        if self.index is None:
+            logger.info(f"⚡ FAISS vektör indeksi oluşturuluyor (tür: {self.index_type})...")
+            self.index, self.manifest['built_index_type'] = create_index(
+                self.index_type, embeddings.shape[1], len(embeddings), **self.index_params)
+        train_index(self.index, embeddings)
+        for ids, emb in pending:
+            self.index.add_with_ids(emb, ids)
+        self._upgrade_fallback_index()
+
+    def _upgrade_fallback_index(self):
+        """
+        İlk oluşturmada vektörler yetersiz olduğu için flat'e düşülen indeksi, artımlı eklemelerle
+        yeterli vektör biriktiğinde istenen türde yeniden kurar. Vektörler flat indeksten birebir
+        okunur; metinler yeniden kodlanmaz.
+        """
+        built_type = self.manifest.get('built_index_type', self.index_type)
+        if built_type == self.index_type or self.index is None:
+            return
+        num_vectors = int(self.index.ntotal)
+        if num_vectors < max(1, min_training_points(self.index_type, num_vectors, self.index_params['nlist'])):
+            return
+        logger.info(f"⚡ {num_vectors} vektör birikti; '{built_type}' indeks '{self.index_type}' olarak yeniden kuruluyor...")
+        ids = faiss.vector_to_array(self.index.id_map).astype('int64')
+        vectors = faiss.downcast_index(self.index.index).reconstruct_n(0, num_vectors)
+        index, built_type = create_index(self.index_type, self.index.d, num_vectors, **self.index_params)
+        train_index(index, vectors)
+        index.add_with_ids(vectors, ids)
+        self.index = index
+        self.manifest['built_index_type'] = built_type
+
+    def process_knowledge_base(self, knowledge_base: dict, force_rebuild=False, serialized_tables=None):
+        """
+        Tüm bilgi tabanını (metinler, tablolar) işler, bir vektör indeksi oluşturur ve kaydeder.
+        Kayıtlı bir manifest varsa sadece eklenen, değişen veya silinen dosyalar yeniden işlenir.
+        serialized_tables: dosya adı -> serialize_table sonucu (yükleme sırasında zaten hesaplandıysa)
+        """
+        serialized_tables = serialized_tables or {}
+        for content in knowledge_base.values():
+            if isinstance(content, pd.DataFrame):
+                self._collect_store_variations(content)
+
+        loaded = not force_rebuild and self._load_saved_memory()
+        if not loaded:
+            self._reset_memory()
+
+        hashes = {filename: self._content_hash(content) for filename, content in knowledge_base.items()}
+        known_files = self.manifest['files']
+        removed = [f for f in known_files if f not in knowledge_base]
+        changed = [f for f in knowledge_base if f in known_files and known_files[f]['hash'] != hashes[f]]
+        added = [f for f in knowledge_base if f not in known_files]
+
+        has_changes = bool(removed or changed or added)
+        if loaded and not self._open_index(writable=has_changes):
+            self._reset_memory()
+            removed, changed, added = [], [], list(knowledge_base)
+            has_changes = bool(added)
+
+        if not has_changes:
+            logger.info("✅ AI hafızası güncel, yeniden işlenecek dosya yok.")
+            if not self.chunks:
+                logger.warning("⚠️ İşlenecek veri bulunamadı. Hafıza oluşturulamadı.")
+                self.index = None
                 return
-            except (EOFError, pickle.UnpicklingError) as e:
-                print(f"❌ Kayıtlı dosya bozuk veya boş: {e}. Yeni hafıza oluşturulacak.")
-                force_rebuild = True
-
-        print("🧠 Yeni bir AI hafızası oluşturuluyor...")
-        all_chunks = []
-        
-        for filename, content in knowledge_base.items():
-            if isinstance(content, str):
-                text_chunks = self._chunk_text(content)
-                all_chunks.extend([f"Kaynak: {filename}\nİçerik: {chunk}" for chunk in text_chunks])
-
-            elif isinstance(content, pd.DataFrame):
-                for _, row in content.iterrows():
-                    row_text = ", ".join([f"{col}: {val}" for col, val in row.items()])
-                    all_chunks.append(f"Kaynak: {filename}\nİçerik: {row_text}")
-                
-                store_column = None
-                for col in content.columns:
-                    if 'mağaza' in col.lower() or 'store' in col.lower():
-                        store_column = col
-                        break
-                
-                if store_column:
-                    for index, row in content.iterrows():
-                        store_name = str(row[store_column]).strip()
-                        if store_name and store_name.lower() != 'nan':
-                            row_data = {col: row[col] for col in content.columns if col != store_column}
-                            row_text = f"Mağaza: {store_name}, Veriler: {row_data}"
-                            all_chunks.append(f"Kaynak: {filename}\nİçerik: {row_text}")
-                            self.store_variations[store_name] = store_name
-                            # Add simplified store name variations
-                            base_name = store_name.split('-')[0].strip()
-                            if base_name != store_name:
-                                self.store_variations[base_name] = store_name
-        
-        if not all_chunks:
-            print("⚠️ İşlenecek veri bulunamadı. Hafıza oluşturulamadı.")
+            set_search_params(self.index, nprobe=self.nprobe, ef_search=self.ef_search)
+            self._prepare_lexical_index()
+            return
+
+        logger.info(f"🔄 Hafıza güncelleniyor: {len(added)} yeni, {len(changed)} değişen, {len(removed)} silinen dosya.")
+        writer = ChunkStoreWriter(CHUNKS_PATH, compress=self.compress_chunks)
+        full_rebuild = self.index is None
+        removed_ranges = [self._remove_file_chunks(filename) for filename in removed + changed]
+        self._copy_kept_chunks(writer, removed_ranges)
+        pending = []
+        with self._rebuild_encoder(full_rebuild) as encoder:
+            for filename in knowledge_base:
+                if filename in changed or filename in added:
+                    embedded = self._embed_file_chunks(filename, knowledge_base[filename], hashes[filename], writer,
+                                                       serialized_tables.get(filename), encoder)
+                    if embedded is not None:
+                        pending.append(embedded)
+            pending = self._collect_embeddings(pending)
+        self._add_to_index(pending)
+
+        if not len(writer):
+            writer.abort()
+            logger.warning("⚠️ İşlenecek veri bulunamadı. Hafıza oluşturulamadı.")
+            self.index = None
+            self.chunks = None
             return
 
-        print(f"📄 Toplam {len(all_chunks)} adet metin parçası (chunk) oluşturuldu.")
-        print("⏳ Vektörler (embeddings) oluşturuluyor...")
-        
-        embeddings = self.model.encode(all_chunks, show_progress_bar=True)
-        
-        print("⚡ FAISS vektör indeksi oluşturuluyor...")
-        d = embeddings.shape[1]
-        self.index = faiss.IndexFlatL2(d)
-        self.index.add(np.array(embeddings, dtype='float32'))
-        self.chunks = all_chunks
-
-        print(f"💾 AI hafızası '{index_path}' ve '{chunks_path}' dosyalarına kaydediliyor.")
+        logger.info(f"📄 Hafızada toplam {len(writer)} adet metin parçası (chunk) bulunuyor.")
+        logger.info(f"🗂️ İndeks türü: {describe_index(self.index)}")
+        if self._save_memory(writer):
+            # Yazılan dosyalar paylaşımlı (mmap) olarak yeniden açılır
+            self.chunks = ChunkStore(CHUNKS_PATH)
+            self._open_index(writable=False)
+        set_search_params(self.index, nprobe=self.nprobe, ef_search=self.ef_search)
+        self._prepare_lexical_index()
+
+    def configure_search(self, nprobe=None, ef_search=None):
+        """
+        Sorgu anındaki arama genişliğini (IVF için nprobe, HNSW için efSearch) değiştirir.
+        """
+        if nprobe:
+            self.nprobe = nprobe
+        if ef_search:
+            self.ef_search = ef_search
+        if self.index is not None:
+            set_search_params(self.index, nprobe=self.nprobe, ef_search=self.ef_search)
+
+    def memory_report(self) -> dict:
+        """
+        İndeksin (vektör başına bayt, toplam boyut), metin parçası deposunun ve sözcüksel
+        indeksin boyutları.
+        """
+        if self.index is None:
+            return {}
+        report = memory_report(self.index, INDEX_PATH)
+        report['chunks_bytes'] = self.chunks.nbytes if self.chunks is not None else 0
+        report['chunks_compressed'] = bool(self.chunks is not None and self.chunks.compressed)
+        report['lexical_bytes'] = os.path.getsize(LEXICAL_PATH) if self.lexical is not None and os.path.exists(LEXICAL_PATH) else 0
+        return report
+
+    @property
+    def data_version(self) -> str:
+        """
+        Hafızadaki dosyaların içerik özetlerinden türetilen sürüm; bilgi tabanı değiştiğinde değişir.
+        """
+        files = sorted((name, entry['hash']) for name, entry in self.manifest['files'].items())
+        payload = json.dumps([self.index_type, self.embedding_id, files], ensure_ascii=False).encode('utf-8')
+        return hashlib.sha1(payload).hexdigest()[:16]
+
+    def mentioned_stores(self, query: str) -> list:
+        """
+        Sorguda adı (veya kısa adı) birebir geçen mağazaların tam adlarını döndürür.
+        Bulanık eşleşmenin aksine "NSP" gibi ortak parçalar tüm mağazaları eşleştirmez.
+        """
+        query_lower = query.replace('I', 'ı').replace('İ', 'i').lower()
+        return sorted({
+            full_name for variation, full_name in self.store_variations.items()
+            if variation and variation.replace('I', 'ı').replace('İ', 'i').lower() in query_lower
+        })
+
+    def expand_query(self, query: str) -> str:
+        """
+        Sorguda geçen mağaza adlarını (bulanık eşleşme ile) tam adlarıyla sorguya ekler.
+        """
+        if self._store_matcher is None:
+            self._store_matcher = StoreNameMatcher((name, name) for name in self.store_variations.values())
+        for store_name in self._store_matcher.match_any(query.lower().split()):
+            query += f" {store_name}"
+        return query
+
+    def embed_query(self, query: str) -> np.ndarray:
+        """
+        Sorgunun vektörünü döndürür. Aynı sorgu tekrar geldiğinde model yerine önbellek kullanılır.
+        """
+        embedding = self.query_cache.get(query)
+        if embedding is None:
+            with QUERY_EMBEDDING_SECONDS.time():
+                embedding = np.array(self.model.encode([query]), dtype='float32')
+            embedding.flags.writeable = False
+            self.query_cache.put(query, embedding)
+        return embedding
+
+    def embed_queries(self, queries: list) -> np.ndarray:
+        """
+        Birden fazla sorgunun vektörlerini (len(queries), d) matrisi olarak döndürür.
+        Önbellekte olmayan sorgular tek bir model.encode çağrısında birlikte kodlanır.
+        """
+        embeddings = [self.query_cache.get(query) for query in queries]
+        missing = list(dict.fromkeys(q for q, emb in zip(queries, embeddings) if emb is None))
+        if missing:
+            with QUERY_EMBEDDING_SECONDS.time():
+                encoded = np.array(self.model.encode(missing), dtype='float32')
+            fresh = {}
+            for query, row in zip(missing, encoded):
+                embedding = row.reshape(1, -1)
+                embedding.flags.writeable = False
+                self.query_cache.put(query, embedding)
+                fresh[query] = embedding
+            embeddings = [emb if emb is not None else fresh[q] for q, emb in zip(queries, embeddings)]
+        return np.vstack(embeddings)
+
+    def _hits(self, ids) -> list:
+        hits = []
+        for i in ids:
+            if i == -1:
+                continue
+            chunk = self.chunks.get(int(i))
+            if chunk is not None:
+                hits.append((int(i), chunk))
+        return hits
+
+    @property
+    def search_mode(self) -> str:
+        """
+        'hybrid' (vektör + BM25), 'dense' (sadece vektör) veya model henüz yüklenmemişken
+        'lexical' (sadece BM25).
+        """
+        if self.lexical is None:
+            return 'dense'
+        return 'hybrid' if self.model_loaded else 'lexical'
+
+    def _lexical_ids(self, query: str, k: int) -> list:
+        if self.lexical is None:
+            return []
+        with LEXICAL_SEARCH_SECONDS.time():
+            return [chunk_id for chunk_id, _ in self.lexical.search(query, k)]
+
+    def _fuse(self, query: str, dense_row, k: int) -> list:
+        """
+        Vektör ve BM25 sıralamalarını reciprocal rank fusion ile birleştirir. Sözcüksel
+        aramaya genişletilmemiş sorgu verilir; birebir geçen adlar ve kodlar böylece öne çıkar.
+        """
+        dense_ids = [int(i) for i in dense_row if i != -1]
+        if self.lexical is None:
+            return dense_ids
+        return reciprocal_rank_fusion([dense_ids, self._lexical_ids(query, k)], k=self.rrf_k, limit=k)
+
+    def chunk_embeddings(self, ids, texts=None) -> np.ndarray:
+        """
+        Parçaların vektörlerini indeksten geri oluşturur (IVF türlerinde doğrudan eşleme
+        enable_reconstruct ile açılır). Geri oluşturulamazsa metinler yeniden kodlanır.
+        """
         try:
-            faiss.write_index(self.index, index_path)
-            with open(chunks_path, 'wb') as f:
-                pickle.dump(self.chunks, f)
-            print("✅ Yeni AI hafızası başarıyla oluşturuldu ve kaydedildi.")
-        except Exception as e:
-            print(f"❌ Hafıza kaydedilirken hata: {e}")
+            return np.vstack([self.index.reconstruct(int(i)) for i in ids]).astype('float32')
+        except RuntimeError:
+            return np.array(self.model.encode(list(texts)), dtype='float32')
+
+    def search_batch(self, queries: list, k=5, with_ids=False) -> list:
+        """
+        search()'ün toplu sürümü: tüm sorgular birlikte kodlanır ve tek bir çok satırlı
+        FAISS aramasıyla aranır. Sonuçlar sorgu sırasıyla döner.
+        """
+        if self.index is None:
+            return [[] if with_ids else ["AI hafızası henüz oluşturulmadı."] for _ in queries]
+        if not queries:
+            return []
+        id_lists = None
+        if self.search_mode == 'lexical':
+            id_lists = [self._lexical_ids(query, k) for query in queries]
+            if not all(id_lists):
+                # Sözcüksel sonuç bulunamayan sorgular için modelin yüklenmesi beklenir
+                id_lists = None
+        if id_lists is None:
+            query_embeddings = self.embed_queries([self.expand_query(query) for query in queries])
+            with FAISS_SEARCH_SECONDS.time():
+                distances, indices = self.index.search(query_embeddings, k)
+            id_lists = [self._fuse(query, row, k) for query, row in zip(queries, indices)]
+        results = []
+        for ids in id_lists:
+            hits = self._hits(ids)
+            results.append(hits if with_ids else [chunk for _, chunk in hits])
+        return results
 
-    def search(self, query: str, k=5) -> list[str]:
+    def search(self, query: str, k=5, with_ids=False) -> list:
         """
-        Verilen bir sorgu için anlamsal olarak en alakalı metin parçalarını bulur.
+        Verilen bir sorgu için anlamsal olarak (ve hybrid ise sözcüksel olarak) en alakalı
+        metin parçalarını bulur. Model henüz yükleniyorsa önce sadece BM25 denenir.
+        with_ids: True ise (parça id, metin) çiftleri döner
         """
         if self.index is None:
-            return ["AI hafızası henüz oluşturulmadı."]
-            
-        query_words = query.lower().split()
-        for store_name in self.store_variations.values():
-            for word in query_words:
-                if fuzz.partial_ratio(word, store_name.lower()) > 80:
-                    query += f" {store_name}"
-                    break
-        
-        query_embedding = self.model.encode([query])
-        distances, indices = self.index.search(np.array(query_embedding, dtype='float32'), k)
-        
-        results = [self.chunks[i] for i in indices[0]]
-        return results
\ No newline at end of file
+            return [] if with_ids else ["AI hafızası henüz oluşturulmadı."]
+
+        ids = None
+        if self.search_mode == 'lexical':
+            # Sözcüksel sonuç yoksa modelin yüklenmesi beklenir
+            ids = self._lexical_ids(query, k) or None
+        if ids is None:
+            query_embedding = self.embed_query(self.expand_query(query))
+            with FAISS_SEARCH_SECONDS.time():
+                distances, indices = self.index.search(query_embedding, k)
+            ids = self._fuse(query, indices[0], k)
+
+        hits = self._hits(ids)
+        return hits if with_ids else [chunk for _, chunk in hits]
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Lexical Index - Metin parçaları üzerinde Türkçe'ye uygun BM25 ters indeksi.
+
+Yoğun (vektör) arama "İSTİNYEPARK - NSP" gibi mağaza adlarını, sütun adlarını veya hata
+kodlarını her zaman üst sıralara taşımaz; BM25 bu birebir eşleşmeleri yakalar. İki sıralama
+reciprocal_rank_fusion ile birleştirilir. Model henüz yüklenmemişken arama sadece bu indeksle
+(vektör hesaplamadan) yapılabilir.
+
+Tokenleştirme: Türkçe küçük harfe çevirme (I -> ı, İ -> i), ardından aksan katlama
+(ı/ş/ğ/ü/ö/ç -> i/s/g/u/o/c) ki "istinyepark" ile "İSTİNYEPARK" ve "magaza" ile "mağaza"
+eşleşsin. Sadece harften oluşan kelimeler ilk PREFIX_LEN karakterine kısaltılır (Türkçe için
+yaygın, basit bir kök bulma yöntemi: "mağazası", "mağazaların" -> "magaza").
+
+İndeks CSR biçiminde NumPy dizileri olarak tutulur ve tek bir .npz dosyasına yazılır.
+"""
+import os
+import logging
+import re
+import json
+from collections import Counter
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+PREFIX_LEN = 6
+_TOKEN = re.compile(r'\w+')
+_FOLD = str.maketrans('ışğüöçâîû', 'isguocaiu')
+
+
+def tokenize(text: str) -> list:
+    """
+    Metni BM25 terimlerine ayırır.
+    """
+    text = text.replace('I', 'ı').replace('İ', 'i').lower().translate(_FOLD)
+    # Sayı veya alt çizgi içeren terimler (kodlar, ID'ler) kısaltılmaz
+    return [token[:PREFIX_LEN] if token.isalpha() else token for token in _TOKEN.findall(text)]
+
+
+def reciprocal_rank_fusion(rankings, k=60, limit=None) -> list:
+    """
+    Birden fazla sıralamayı (ID listeleri, en alakalı önce) birleştirir: her ID için
+    sum(1 / (k + sıra)). Eşit puanlarda ilk sıralamadaki sıra korunur.
+    """
+    scores = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, start=1):
+            scores[item] = scores.get(item, 0.0) + 1.0 / (k + rank)
+    fused = sorted(scores, key=lambda item: -scores[item])
+    return fused if limit is None else fused[:limit]
+
+
+class LexicalIndex:
+    """
+    Parça ID'leri üzerinde BM25 (Okapi) indeksi. build() ile oluşturulur, save()/load()
+    ile FAISS indeksinin yanında saklanır.
+    """
+
+    def __init__(self, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.version = None
+        self.doc_ids = np.array([], dtype='int64')
+        self.doc_lengths = np.array([], dtype='float32')
+        self.vocabulary = {}
+        self.postings_offsets = np.zeros(1, dtype='int64')
+        self.postings_docs = np.array([], dtype='int32')
+        self.postings_tfs = np.array([], dtype='float32')
+        self.idf = np.array([], dtype='float32')
+        self._avg_length = 0.0
+
+    def __len__(self):
+        return len(self.doc_ids)
+
+    @classmethod
+    def build(cls, items, version=None, k1=1.2, b=0.75):
+        """
+        items: (parça id, metin) çiftleri, artan ID sırasıyla
+        version: indeksin hangi bilgi tabanı sürümüne ait olduğu (load() karşılaştırır)
+        """
+        index = cls(k1=k1, b=b)
+        index.version = version
+        vocabulary = {}
+        doc_ids, doc_lengths = [], []
+        term_ids, doc_positions, tfs = [], [], []
+        for position, (chunk_id, text) in enumerate(items):
+            counts = Counter(tokenize(text))
+            doc_ids.append(chunk_id)
+            doc_lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                term_ids.append(vocabulary.setdefault(term, len(vocabulary)))
+                doc_positions.append(position)
+                tfs.append(tf)
+
+        term_ids = np.asarray(term_ids, dtype='int64')
+        order = np.argsort(term_ids, kind='stable')
+        index.vocabulary = vocabulary
+        index.doc_ids = np.asarray(doc_ids, dtype='int64')
+        index.doc_lengths = np.asarray(doc_lengths, dtype='float32')
+        index.postings_docs = np.asarray(doc_positions, dtype='int32')[order]
+        index.postings_tfs = np.asarray(tfs, dtype='float32')[order]
+        document_frequency = np.bincount(term_ids, minlength=len(vocabulary))
+        index.postings_offsets = np.concatenate([[0], np.cumsum(document_frequency)]).astype('int64')
+        index._compute_idf(document_frequency)
+        return index
+
+    def _compute_idf(self, document_frequency):
+        n = len(self.doc_ids)
+        self.idf = np.log(1 + (n - document_frequency + 0.5) / (document_frequency + 0.5)).astype('float32')
+        self._avg_length = float(self.doc_lengths.mean()) if n else 0.0
+
+    def search(self, query: str, k=5) -> list:
+        """
+        En yüksek BM25 puanlı k parçayı (id, puan) olarak döndürür; terimi hiç geçmeyen
+        parçalar dönmez.
+        """
+        if not len(self.doc_ids):
+            return []
+        term_ids = {self.vocabulary[t] for t in tokenize(query) if t in self.vocabulary}
+        if not term_ids:
+            return []
+        scores = np.zeros(len(self.doc_ids), dtype='float32')
+        norm = self.k1 * (1 - self.b + self.b * self.doc_lengths / max(self._avg_length, 1e-9))
+        for term_id in term_ids:
+            start, end = self.postings_offsets[term_id], self.postings_offsets[term_id + 1]
+            docs = self.postings_docs[start:end]
+            tfs = self.postings_tfs[start:end]
+            scores[docs] += self.idf[term_id] * tfs * (self.k1 + 1) / (tfs + norm[docs])
+        matched = np.flatnonzero(scores)
+        if len(matched) > k:
+            matched = matched[np.argpartition(-scores[matched], k - 1)[:k]]
+        # Eşit puanlarda düşük ID önce gelir
+        matched = matched[np.lexsort((matched, -scores[matched]))]
+        return [(int(self.doc_ids[i]), float(scores[i])) for i in matched]
+
+    def save(self, path: str):
+        """
+        İndeksi geçici bir dosyaya yazıp atomik olarak yerine taşır.
+        """
+        meta = {'format': FORMAT_VERSION, 'version': self.version, 'k1': self.k1, 'b': self.b,
+                'terms': sorted(self.vocabulary, key=self.vocabulary.get)}
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, meta=np.frombuffer(json.dumps(meta, ensure_ascii=False).encode('utf-8'), dtype='uint8'),
+                     doc_ids=self.doc_ids, doc_lengths=self.doc_lengths,
+                     postings_offsets=self.postings_offsets, postings_docs=self.postings_docs,
+                     postings_tfs=self.postings_tfs)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, version=None):
+        """
+        Kayıtlı indeksi açar. Dosya yoksa, bozuksa veya sürümü farklıysa None döner.
+        """
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as data:
+                meta = json.loads(data['meta'].tobytes().decode('utf-8'))
+                if meta.get('format') != FORMAT_VERSION or meta.get('version') != version:
+                    return None
+                index = cls(k1=meta['k1'], b=meta['b'])
+                index.version = version
+                index.vocabulary = {term: i for i, term in enumerate(meta['terms'])}
+                index.doc_ids = data['doc_ids']
+                index.doc_lengths = data['doc_lengths']
+                index.postings_offsets = data['postings_offsets']
+                index.postings_docs = data['postings_docs']
+                index.postings_tfs = data['postings_tfs']
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"⚠️ Sözcüksel indeks okunamadı: {e}")
+            return None
+        index._compute_idf(np.diff(index.postings_offsets))
+        return index
+
+    def describe(self) -> dict:
+        return {'documents': len(self.doc_ids), 'terms': len(self.vocabulary),
+                'postings': len(self.postings_docs), 'version': self.version}
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Live Reload - company_data klasöründeki değişiklikleri izler ve sistemi yeniden
+başlatmadan yeni veriye geçirir.
+
+Klasör belirli aralıklarla taranır (dosya adı, boyut, değişiklik zamanı); inotify gibi
+platforma özel bir bağımlılık gerekmez. Bir değişiklik görüldüğünde, dosyaların yazılması
+bitsin diye imza bir tarama daha aynı kalana kadar beklenir, ardından on_change çağrılır.
+
+Yeniden yükleme main.py'de yapılır: yeni veri, model ve önbellekleri paylaşan ayrı bir
+UniversalAISystem'e yüklenir ve hazır olunca tek bir atama ile devreye alınır. Eski sistemi
+kullanmakta olan sorgular onunla tamamlanır.
+"""
+import os
+import time
+import logging
+import threading
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+def _ignored(filename: str) -> bool:
+    # Gizli dosyalar, Office kilit dosyaları (~$sales.xlsx) ve yarım kopyalar
+    return filename.startswith(('.', '~$')) or filename.endswith(('.tmp', '.part', '.crdownload'))
+
+
+def directory_signature(directory: str) -> dict:
+    """
+    Klasördeki dosyaların {ad: (boyut, değişiklik zamanı ns)} eşlemesi; klasör yoksa boş.
+    """
+    signature = {}
+    try:
+        entries = os.scandir(directory)
+    except OSError:
+        return signature
+    with entries:
+        for entry in entries:
+            if _ignored(entry.name):
+                continue
+            try:
+                if entry.is_file():
+                    stat = entry.stat()
+                    signature[entry.name] = (stat.st_size, stat.st_mtime_ns)
+            except OSError:
+                continue
+    return signature
+
+
+def describe_changes(old: dict, new: dict) -> dict:
+    return {
+        'added': sorted(name for name in new if name not in old),
+        'changed': sorted(name for name in new if name in old and new[name] != old[name]),
+        'removed': sorted(name for name in old if name not in new),
+    }
+
+
+@contextmanager
+def file_lock(path: str):
+    """
+    Süreçler arası özel kilit (Gunicorn işçileri aynı indeks dosyalarını aynı anda
+    yeniden yazmasın diye). fcntl olmayan platformlarda kilitlenmez.
+    """
+    try:
+        import fcntl
+    except ImportError:
+        fcntl = None
+    with open(path, 'a') as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class DataWatcher:
+    """
+    Klasörü interval saniyede bir tarar; değişiklik kalıcı hale gelince on_change(değişiklikler)
+    çağrılır. on_change True dönerse (veya hata verirse) yeni imza yüklenmiş kabul edilir;
+    böylece başarısız bir yükleme, dosyalar tekrar değişene kadar tekrarlanmaz.
+    """
+
+    def __init__(self, directory: str, on_change, interval=10.0):
+        self.directory = directory
+        self.on_change = on_change
+        self.interval = interval
+        self.signature = directory_signature(directory)
+        self.reloads = 0
+        self.failures = 0
+        self.last_reload = None
+        self.last_error = None
+        self.last_changes = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='data-watcher', daemon=True)
+            self._thread.start()
+            logger.info(f"👀 '{self.directory}' değişiklikler için izleniyor ({self.interval:g}s aralıkla)")
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        pending = None
+        while not self._stop.wait(self.interval):
+            current = directory_signature(self.directory)
+            if current == self.signature:
+                pending = None
+                continue
+            if current != pending:
+                # Dosya hâlâ yazılıyor olabilir; bir sonraki taramada da aynıysa yüklenir
+                pending = current
+                continue
+            pending = None
+            self.check(current)
+
+    def check(self, current=None) -> bool:
+        """
+        Değişiklik varsa on_change'i hemen çağırır (izleme thread'i ve testler için).
+        """
+        current = directory_signature(self.directory) if current is None else current
+        if current == self.signature:
+            return False
+        changes = describe_changes(self.signature, current)
+        logger.info(f"🔁 Veri klasörü değişti: {len(changes['added'])} yeni, {len(changes['changed'])} değişen, "
+                    f"{len(changes['removed'])} silinen dosya")
+        try:
+            ok = self.on_change(changes)
+            self.last_error = None if ok else "Yeni veriler yüklenemedi; önceki veriler kullanılmaya devam ediyor"
+        except Exception as e:
+            ok = False
+            self.last_error = str(e)
+            logger.error(f"❌ Canlı yeniden yükleme hatası: {e}")
+        self.signature = current
+        self.last_changes = changes
+        self.last_reload = time.strftime('%Y-%m-%dT%H:%M:%S')
+        if ok:
+            self.reloads += 1
+        else:
+            self.failures += 1
+        return ok
+
+    def describe(self) -> dict:
+        return {'directory': self.directory, 'interval': self.interval, 'reloads': self.reloads,
+                'failures': self.failures, 'last_reload': self.last_reload, 'last_changes': self.last_changes,
+                'last_error': self.last_error}
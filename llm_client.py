@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+LLM Client - Cevap üretimi için kullanılan dil modeli istemcisi.
+
+Tek bir keep-alive oturumu (bağlantı havuzu) üzerinden çalışır; bağlantı ve okuma
+zaman aşımları ayrı ayrı ayarlanır, 429/5xx ve ağ hatalarında sınırlı sayıda,
+rastgele beklemeli (full jitter) tekrar dener ve her istek bir süre bütçesini (deadline)
+aşmaz. Arka uç değiştirilebilir: 'gemini' (veya aynı API'yi konuşan stub_server.py)
+ve ağ kullanmayan 'echo'.
+"""
+import os
+import logging
+import json
+import time
+import random
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import LLM_SECONDS, LLM_ERRORS_TOTAL, LLM_RETRIES_TOTAL
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "https://generativelanguage.googleapis.com/v1beta"
+DEFAULT_MODEL = "gemini-2.0-flash"
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class LLMError(Exception):
+    """
+    Cevap üretilemediğinde fırlatılır.
+    status: HTTP durum kodu (ağ hatalarında None)
+    """
+
+    def __init__(self, message: str, status=None, attempts: int = 1):
+        super().__init__(message)
+        self.status = status
+        self.attempts = attempts
+
+
+class _RetryableError(Exception):
+    def __init__(self, message: str, status=None, retry_after=None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class GeminiBackend:
+    """
+    Gemini generateContent API'si (ve stub_server.py) için istek/yanıt dönüşümü.
+    """
+    name = 'gemini'
+
+    def __init__(self, base_url: str = DEFAULT_BASE_URL, model: str = DEFAULT_MODEL, api_key: str = None):
+        self.base_url = base_url.rstrip('/')
+        self.model = model
+        self.api_key = api_key
+
+    def url(self) -> str:
+        return f"{self.base_url}/models/{self.model}:generateContent"
+
+    def stream_url(self) -> str:
+        return f"{self.base_url}/models/{self.model}:streamGenerateContent?alt=sse"
+
+    def check(self):
+        """
+        Gemini API'si anahtarsız çağrılamaz; anahtar yoksa istek gönderilmeden LLMError fırlatılır.
+        Başka bir adres (ör. stub_server.py) kullanılıyorsa anahtar zorunlu değildir.
+        """
+        if not self.api_key and self.base_url == DEFAULT_BASE_URL:
+            raise LLMError("GEMINI_API_KEY tanımlı değil")
+
+    def headers(self) -> dict:
+        headers = {'Content-Type': 'application/json'}
+        if self.api_key:
+            # Anahtar URL yerine başlıkta gönderilir; böylece loglara düşmez
+            headers['x-goog-api-key'] = self.api_key
+        return headers
+
+    def payload(self, prompt: str) -> dict:
+        return {"contents": [{"role": "user", "parts": [{"text": prompt}]}]}
+
+    def parse(self, result: dict):
+        """
+        Yanıttan üretilen metni çıkarır; aday yoksa None döner.
+        """
+        if 'error' in result:
+            raise LLMError(f"API hatası: {result['error'].get('message', 'Bilinmeyen hata')}")
+        candidates = result.get('candidates') or []
+        if candidates and candidates[0].get('content', {}).get('parts'):
+            return candidates[0]['content']['parts'][0].get('text')
+        return None
+
+
+class EchoBackend:
+    """
+    Ağ kullanmayan arka uç: istemin uzunluğunu bildiren sabit biçimli bir cevap döndürür.
+    Yük testlerinde ve çevrimdışı geliştirmede kullanılır.
+    """
+    name = 'echo'
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+
+    def generate(self, prompt: str) -> str:
+        if self.latency:
+            time.sleep(self.latency)
+        return f"[echo] {len(prompt)} karakterlik isteme cevap."
+
+    def stream(self, prompt: str):
+        for i, word in enumerate(self.generate(prompt).split(' ')):
+            yield word if i == 0 else ' ' + word
+
+
+class LLMClient:
+    """
+    Havuzlanmış oturum, zaman aşımları, tekrar deneme ve süre bütçesi ile LLM çağrıları.
+    Aynı istemci birden fazla thread'den kullanılabilir.
+    """
+
+    def __init__(self, backend=None, connect_timeout: float = 3.05, read_timeout: float = 30.0,
+                 max_retries: int = 2, backoff_base: float = 0.5, backoff_max: float = 8.0,
+                 deadline: float = 45.0, pool_size: int = 16):
+        """
+        backend: GeminiBackend veya EchoBackend (verilmezse anahtarı GEMINI_API_KEY'den okunan GeminiBackend)
+        connect_timeout / read_timeout: tek bir deneme için saniye cinsinden zaman aşımları
+        max_retries: ilk denemeden sonra yapılacak en fazla tekrar sayısı
+        backoff_base / backoff_max: tekrarlar arası beklemenin tabanı ve üst sınırı (full jitter)
+        deadline: bir generate() çağrısının tüm denemeler dahil en fazla süresi
+        pool_size: havuzda tutulacak en fazla açık bağlantı sayısı
+        """
+        self.backend = backend or GeminiBackend(api_key=os.getenv('GEMINI_API_KEY'))
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.deadline = deadline
+
+        self.session = requests.Session()
+        # Tekrar denemeler burada yönetildiği için urllib3'ün kendi tekrarları kapalıdır
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    @classmethod
+    def from_env(cls):
+        """
+        İstemciyi ortam değişkenlerinden oluşturur:
+        LLM_BACKEND (gemini|echo), LLM_BASE_URL, LLM_MODEL, GEMINI_API_KEY,
+        LLM_CONNECT_TIMEOUT, LLM_READ_TIMEOUT, LLM_MAX_RETRIES, LLM_DEADLINE, LLM_POOL_SIZE
+        Gemini API'si için GEMINI_API_KEY zorunludur; tanımlı değilse her LLM çağrısı LLMError
+        fırlatır (tablolardan hesaplanan cevaplar çalışmaya devam eder). 'echo' yalnızca
+        LLM_BACKEND=echo ile açıkça seçildiğinde kullanılır.
+        """
+        backend_name = os.getenv('LLM_BACKEND', 'gemini').lower()
+        base_url = os.getenv('LLM_BASE_URL', DEFAULT_BASE_URL)
+        api_key = os.getenv('GEMINI_API_KEY')
+        if backend_name == 'gemini' and not api_key and base_url.rstrip('/') == DEFAULT_BASE_URL:
+            logger.error("❌ GEMINI_API_KEY tanımlı değil; LLM gerektiren sorgular hata döndürecek.")
+        if backend_name == 'echo':
+            backend = EchoBackend(latency=float(os.getenv('LLM_ECHO_LATENCY', '0')))
+        elif backend_name == 'gemini':
+            backend = GeminiBackend(
+                base_url=base_url,
+                model=os.getenv('LLM_MODEL', DEFAULT_MODEL),
+                api_key=api_key
+            )
+        else:
+            raise ValueError(f"Bilinmeyen LLM arka ucu: '{backend_name}'")
+        return cls(
+            backend=backend,
+            connect_timeout=float(os.getenv('LLM_CONNECT_TIMEOUT', '3.05')),
+            read_timeout=float(os.getenv('LLM_READ_TIMEOUT', '30')),
+            max_retries=int(os.getenv('LLM_MAX_RETRIES', '2')),
+            deadline=float(os.getenv('LLM_DEADLINE', '45')),
+            pool_size=int(os.getenv('LLM_POOL_SIZE', '16'))
+        )
+
+    def describe(self) -> dict:
+        info = {'backend': self.backend.name, 'deadline': self.deadline, 'max_retries': self.max_retries}
+        if isinstance(self.backend, GeminiBackend):
+            info.update({'base_url': self.backend.base_url, 'model': self.backend.model})
+        return info
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    @staticmethod
+    def _check_status(response):
+        """
+        Hatalı yanıtları tekrar denenebilir (_RetryableError) veya kalıcı (LLMError) hataya çevirir.
+        """
+        if response.status_code < 400:
+            return
+        if response.status_code in RETRY_STATUSES:
+            response.close()
+            retry_after = response.headers.get('Retry-After')
+            try:
+                retry_after = float(retry_after) if retry_after is not None else None
+            except ValueError:
+                retry_after = None
+            raise _RetryableError(f"HTTP {response.status_code}", response.status_code, retry_after)
+        try:
+            message = response.json().get('error', {}).get('message', response.reason)
+        except ValueError:
+            message = response.reason
+        response.close()
+        raise LLMError(f"HTTP {response.status_code}: {message}", response.status_code)
+
+    def _request(self, url: str, prompt: str, timeout: float, stream: bool = False):
+        try:
+            response = self.session.post(
+                url, headers=self.backend.headers(), json=self.backend.payload(prompt),
+                timeout=(min(self.connect_timeout, timeout), timeout), stream=stream
+            )
+        except (requests.ConnectionError, requests.Timeout) as e:
+            raise _RetryableError(f"Bağlantı hatası: {e}")
+        self._check_status(response)
+        return response
+
+    def _post(self, prompt: str, timeout: float):
+        response = self._request(self.backend.url(), prompt, timeout)
+        try:
+            return self.backend.parse(response.json())
+        except ValueError as e:
+            raise LLMError(f"Geçersiz yanıt: {e}", response.status_code)
+
+    def _with_retries(self, call, end_time: float):
+        """
+        call(timeout) çağrısını süre bütçesi içinde, tekrar denenebilir hatalarda bekleyerek tekrarlar.
+        """
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            remaining = end_time - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                return call(min(self.read_timeout, remaining))
+            except _RetryableError as e:
+                last_error = e
+                if attempt == self.max_retries:
+                    break
+                wait = e.retry_after if e.retry_after is not None else self._backoff(attempt)
+                if time.monotonic() + wait >= end_time:
+                    break
+                LLM_RETRIES_TOTAL.inc()
+                logger.warning(f"⚠️ LLM isteği tekrar denenecek ({attempt + 1}/{self.max_retries}): {e}")
+                time.sleep(wait)
+            except LLMError as e:
+                e.attempts = attempt + 1
+                raise
+
+        if last_error is None:
+            raise LLMError("Süre bütçesi doldu", attempts=0)
+        raise LLMError(str(last_error), last_error.status, attempts=attempt + 1)
+
+    def _end_time(self, deadline):
+        return time.monotonic() + (deadline if deadline is not None else self.deadline)
+
+    def generate(self, prompt: str, deadline: float = None):
+        """
+        İstem için cevap üretir. Aday cevap yoksa None döner; tüm denemeler başarısız
+        olursa veya süre bütçesi biterse LLMError fırlatır.
+        deadline: bu çağrı için süre bütçesi (verilmezse istemcinin varsayılanı)
+        """
+        if isinstance(self.backend, EchoBackend):
+            return self.backend.generate(prompt)
+        end_time = self._end_time(deadline)
+        with LLM_SECONDS.time(mode='generate'):
+            try:
+                self.backend.check()
+                return self._with_retries(lambda timeout: self._post(prompt, timeout), end_time)
+            except LLMError:
+                LLM_ERRORS_TOTAL.inc(mode='generate')
+                raise
+
+    def stream_generate(self, prompt: str, deadline: float = None):
+        """
+        Cevabı modelin akış (streamGenerateContent, SSE) uç noktasından parça parça üretir.
+        Bağlantı kurulana kadar generate() ile aynı tekrar deneme kuralları geçerlidir; ilk
+        parça gönderildikten sonra oluşan hatalar tekrar denenmez, LLMError olarak fırlatılır.
+        """
+        if isinstance(self.backend, EchoBackend):
+            yield from self.backend.stream(prompt)
+            return
+        end_time = self._end_time(deadline)
+        # Süre, bağlantı kurulmasından son parçaya kadar ölçülür
+        with LLM_SECONDS.time(mode='stream'):
+            try:
+                yield from self._stream(prompt, end_time)
+            except LLMError:
+                LLM_ERRORS_TOTAL.inc(mode='stream')
+                raise
+
+    def _stream(self, prompt: str, end_time: float):
+        self.backend.check()
+        response = self._with_retries(
+            lambda timeout: self._request(self.backend.stream_url(), prompt, timeout, stream=True), end_time
+        )
+        response.encoding = 'utf-8'
+        try:
+            for line in response.iter_lines(chunk_size=None, decode_unicode=True):
+                if time.monotonic() > end_time:
+                    raise LLMError("Süre bütçesi doldu (akış sırasında)")
+                if not line or not line.startswith('data:'):
+                    continue
+                try:
+                    text = self.backend.parse(json.loads(line[5:].strip()))
+                except ValueError as e:
+                    raise LLMError(f"Geçersiz akış verisi: {e}")
+                if text:
+                    yield text
+        except (requests.ConnectionError, requests.Timeout) as e:
+            raise LLMError(f"Akış kesildi: {e}")
+        finally:
+            response.close()
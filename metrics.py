@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Metrics - İstek aşamalarının süre histogramları, sayaçlar ve log ayarı.
+
+Metrikler süreç içinde tutulur ve /api/metrics'te Prometheus metin biçiminde (0.0.4)
+sunulur; prometheus_client bağımlılığı gerekmez. Gunicorn'da her işçi kendi değerlerini
+tutar, bu yüzden kazıyıcı (scraper) her işçiyi ayrı bir hedef olarak görür.
+
+Bir aşamayı ölçmek için:
+
+    with QUERY_EMBEDDING_SECONDS.time():
+        embedding = model.encode([query])
+
+Loglar standart logging modülüyle yazılır; seviye LOG_LEVEL (DEBUG, INFO, WARNING, ...),
+biçim LOG_FORMAT ('text' veya satır başına bir JSON nesnesi için 'json') ile seçilir.
+Sorgu başına yazılan mesajlar DEBUG seviyesindedir; varsayılan INFO seviyesinde
+biçimlendirilmezler bile.
+"""
+import os
+import sys
+import json
+import time
+import bisect
+import logging
+import threading
+from contextlib import contextmanager
+
+# Saniye cinsinden histogram sınırları: embedding/FAISS (ms) ile LLM (saniyeler) aralığını kapsar
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}'
+
+
+def _format_value(value) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children = {}
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def _key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"'{self.name}' etiketleri {self.labelnames} olmalı, verilen: {tuple(labels)}")
+        return tuple((name, str(labels[name])) for name in self.labelnames)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            children = list(self._children.items())
+        for key, child in sorted(children):
+            lines.extend(self._render_child(key, child))
+        return lines
+
+
+class Counter(_Metric):
+    """
+    Sadece artan sayaç. inc(amount, **etiketler)
+    """
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._children[key] = self._children.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._children.get(self._key(labels), 0)
+
+    def _render_child(self, key, value):
+        return [f"{self.name}{_format_labels(key)} {_format_value(value)}"]
+
+
+class Histogram(_Metric):
+    """
+    Süre dağılımı (kova sayaçları + toplam + adet). observe(saniye, **etiketler) veya
+    with histogram.time(**etiketler): ...
+    """
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS, registry=None):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        position = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            child = self._children.get(key)
+            if child is None:
+                # [kova sayaçları (sonuncusu +Inf), toplam, adet]
+                child = self._children[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            child[0][position] += 1
+            child[1] += value
+            child[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def snapshot(self, **labels) -> dict:
+        with self._lock:
+            child = self._children.get(self._key(labels))
+            if child is None:
+                return {'count': 0, 'sum': 0.0}
+            return {'count': child[2], 'sum': child[1]}
+
+    def _render_child(self, key, child):
+        counts, total, count = child
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+            cumulative += bucket_count
+            lines.append(f"{self.name}_bucket{_format_labels(key + (('le', _format_value(bound)),))} {cumulative}")
+        lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(total)}")
+        lines.append(f"{self.name}_count{_format_labels(key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Kayıtlı metriklerin toplamı. render() Prometheus metin biçimini döndürür.
+    """
+
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if any(existing.name == metric.name for existing in self._metrics):
+                raise ValueError(f"'{metric.name}' metriği zaten kayıtlı")
+            self._metrics.append(metric)
+
+    def render(self, samples=()) -> str:
+        """
+        samples: anlık değeri o an okunan ek metrikler; (ad, tür, açıklama, [(etiketler, değer), ...])
+        dörtlüleri (ör. önbellek sayaçları, indeks boyutu). etiketler bir dict'tir.
+        """
+        with self._lock:
+            metrics = list(self._metrics)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        for name, kind, documentation, values in samples:
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in values:
+                lines.append(f"{name}{_format_labels(sorted(labels.items()))} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+# Sorgu yolunun aşamaları
+REQUEST_SECONDS = Histogram('corpai_request_seconds', 'HTTP isteğinin toplam süresi', ['endpoint'])
+QUERY_EMBEDDING_SECONDS = Histogram('corpai_query_embedding_seconds', 'Sorgu vektörlerinin hesaplanması (önbellek ıskası)')
+FAISS_SEARCH_SECONDS = Histogram('corpai_faiss_search_seconds', 'FAISS indeks araması')
+LEXICAL_SEARCH_SECONDS = Histogram('corpai_lexical_search_seconds', 'BM25 sözcüksel arama')
+ENTITY_EXTRACTION_SECONDS = Histogram('corpai_entity_extraction_seconds', 'Niyet ve varlık (mağaza, departman) çıkarımı')
+CONTEXT_ASSEMBLY_SECONDS = Histogram('corpai_context_assembly_seconds', 'LLM bağlamının hazırlanması (tekilleştirme + MMR)')
+LLM_SECONDS = Histogram('corpai_llm_seconds', 'LLM isteğinin tekrar denemeler dahil toplam süresi', ['mode'])
+
+# Sayaçlar
+REQUESTS_TOTAL = Counter('corpai_requests_total', 'İşlenen HTTP istekleri', ['endpoint', 'status'])
+LLM_ERRORS_TOTAL = Counter('corpai_llm_errors_total', 'Başarısız LLM çağrıları', ['mode'])
+LLM_RETRIES_TOTAL = Counter('corpai_llm_retries_total', 'Tekrar denenen LLM istekleri')
+DATA_RELOADS_TOTAL = Counter('corpai_data_reloads_total', 'company_data değişikliğiyle yapılan yeniden yüklemeler', ['result'])
+
+
+# --- Log ayarı -----------------------------------------------------------------
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record, '%Y-%m-%dT%H:%M:%S'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def setup_logging(level=None, fmt=None):
+    """
+    Kök logger'ı bir kez ayarlar (stdout'a). level / fmt verilmezse LOG_LEVEL (varsayılan
+    INFO) ve LOG_FORMAT (varsayılan 'text') ortam değişkenleri kullanılır.
+    """
+    level = (level or os.getenv('LOG_LEVEL', 'INFO')).upper()
+    fmt = (fmt or os.getenv('LOG_FORMAT', 'text')).lower()
+    root = logging.getLogger()
+    if not any(getattr(handler, '_corpai', False) for handler in root.handlers):
+        handler = logging.StreamHandler(sys.stdout)
+        handler._corpai = True
+        if fmt == 'json':
+            handler.setFormatter(JsonFormatter())
+        else:
+            handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s [%(name)s] %(message)s'))
+        root.addHandler(handler)
+    root.setLevel(getattr(logging, level, logging.INFO))
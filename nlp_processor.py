@@ -1,11 +1,101 @@
 #!/usr/bin/env python3
 """
 SmartNLPProcessor - Doğal dil işleme ve niyet tahmini sınıfı.
+
+Eş anlamlı tabloları kelime -> kanonik anahtar ters eşlemesine, niyet pattern'leri (öğrenilenler
+dahil) kelime alt kümesi -> niyet skorları tablosuna derlenir (IntentMatcher). Tahmin maliyeti
+öğrenilmiş pattern sayısından bağımsızdır; derleme sadece pattern'ler değiştiğinde yapılır.
 """
+import logging
 import re
 import pickle
+from collections import Counter, defaultdict
+from itertools import combinations
 from difflib import SequenceMatcher
-from thefuzz import fuzz
+
+from store_matcher import StoreNameMatcher
+
+logger = logging.getLogger(__name__)
+
+DEPARTMENT_KEYWORDS = ('it', 'satış', 'muhasebe', 'ik')
+ACTION_KEYWORDS = ('listele', 'kaç', 'hangi', 'göster')
+
+# Niyet başına saklanan en fazla öğrenilmiş pattern; aşılınca en eskiler silinir
+MAX_LEARNED_PATTERNS = 1000
+
+
+class IntentMatcher:
+    """
+    Niyet pattern'lerinin derlenmiş hali. Bir pattern'in skoru, sorguda bulunan kelimelerinin
+    pattern uzunluğuna oranıdır (calculate_intent_score ile aynı). Derlemede her pattern'in
+    kelimelerinin her alt kümesi için, o alt kümenin tamamı sorguda bulunduğunda niyetin
+    alabileceği en yüksek skor tabloya yazılır. Sorguda sadece mevcut kelimelerin alt kümelerine
+    bakılır; böylece tahmin maliyeti pattern sayısıyla değil niyet sayısıyla büyür.
+    Pattern'ler kısa olduğu için (öğrenilenler en fazla 3 kelime) alt küme sayısı küçüktür.
+    """
+
+    def __init__(self, intent_patterns: dict):
+        """
+        intent_patterns: {niyet: [[kelime, ...], ...]}; eşit skorlarda sözlük sırasında önce gelen kazanır
+        """
+        self.intents = list(intent_patterns)
+        self.patterns = 0
+        self.max_words = 0
+        self._table = defaultdict(dict)  # frozenset(kelimeler) -> {niyet no: en yüksek skor}
+        for intent_no, patterns in enumerate(intent_patterns.values()):
+            seen = set()
+            for pattern in patterns:
+                counts = Counter(pattern)
+                key = frozenset(counts.items())
+                if not pattern or key in seen:
+                    continue
+                seen.add(key)
+                self.patterns += 1
+                self.max_words = max(self.max_words, len(counts))
+                words = list(counts)
+                for size in range(1, len(words) + 1):
+                    for subset in combinations(words, size):
+                        score = sum(counts[word] for word in subset) / len(pattern)
+                        best = self._table[frozenset(subset)]
+                        if score > best.get(intent_no, 0):
+                            best[intent_no] = score
+        self._vocabulary = {word for subset in self._table if len(subset) == 1 for word in subset}
+
+    def __len__(self):
+        return self.patterns
+
+    def _best_by_intent(self, present: set) -> dict:
+        """
+        {niyet no: en yüksek pattern skoru}; sadece en az bir kelimesi eşleşen niyetler.
+        """
+        words = [word for word in present if word in self._vocabulary]
+        best = {}
+        for size in range(1, min(len(words), self.max_words) + 1):
+            for subset in combinations(words, size):
+                scores = self._table.get(frozenset(subset))
+                if scores is None:
+                    continue
+                for intent_no, score in scores.items():
+                    if score > best.get(intent_no, 0):
+                        best[intent_no] = score
+        return best
+
+    def scores(self, present: set) -> dict:
+        best = self._best_by_intent(present)
+        return {intent: best.get(intent_no, 0) for intent_no, intent in enumerate(self.intents)}
+
+    def best(self, present: set):
+        """
+        En yüksek skorlu (niyet, skor); hiçbir kelime eşleşmezse (ilk niyet, 0), niyet yoksa None.
+        """
+        if not self.intents:
+            return None
+        best = self._best_by_intent(present)
+        if not best:
+            return self.intents[0], 0
+        intent_no = min(best, key=lambda no: (-best[no], no))
+        return self.intents[intent_no], best[intent_no]
+
 
 class SmartNLPProcessor:
     def __init__(self):
@@ -55,7 +145,82 @@ class SmartNLPProcessor:
         # Learned patterns (kullanıcı etkileşimlerinden öğrenecek)
         self.learned_patterns = {}
         self.store_names = {}  # Mağaza adlarını saklamak için
+        self._store_matcher = None
+        self._intent_matcher = None
+        self._pattern_matchers = {}  # id(pattern sözlüğü) -> (sözlük, IntentMatcher)
+        self._compile_synonyms()
         self.load_learned_patterns()
+
+    def _compile_synonyms(self):
+        """
+        Eş anlamlı tablolarını ters eşlemelere derler: kelime -> kanonik anahtarlar ve
+        kelime -> (departmanlar, eylemler). synonyms değiştirilirse tekrar çağrılmalıdır.
+        """
+        self._synonym_groups = {key: frozenset([key, *values]) for key, values in self.synonyms.items()}
+        synonym_keys = defaultdict(list)
+        for key, group in self._synonym_groups.items():
+            for word in group:
+                synonym_keys[word].append(key)
+        self._synonym_keys = dict(synonym_keys)
+
+        def matches(word, keywords):
+            return tuple(key for key in keywords if word == key or word in self.synonyms.get(key, []))
+
+        self._entity_keys = {}
+        for word in set(self._synonym_keys) | set(DEPARTMENT_KEYWORDS) | set(ACTION_KEYWORDS):
+            departments, actions = matches(word, DEPARTMENT_KEYWORDS), matches(word, ACTION_KEYWORDS)
+            if departments or actions:
+                self._entity_keys[word] = (departments, actions)
+
+    def _matcher(self, intent_patterns=None) -> IntentMatcher:
+        """
+        Yerleşik ve öğrenilmiş pattern'lerin derlenmiş hali; pattern'ler değişince yeniden kurulur.
+        Öğrenilmiş pattern'i olan bir niyette yerleşik pattern'lerin yerini onlar alır.
+        intent_patterns verilirse o sözlüğün derlenmiş hali döner: birleşik pattern'lerle aynı
+        listeleri içeren bir sözlük için yukarıdaki eşleştirici, diğerleri için sözlük nesnesi
+        başına bir kez derlenen eşleştirici kullanılır.
+        """
+        matcher = self._intent_matcher
+        if matcher is None:
+            merged = {**self.intent_patterns, **self.learned_patterns}
+            matcher = self._intent_matcher = IntentMatcher(merged)
+            self._merged_patterns = merged
+        if intent_patterns is None or self._same_patterns(intent_patterns, self._merged_patterns):
+            return matcher
+
+        cached = self._pattern_matchers.get(id(intent_patterns))
+        if cached is not None and cached[0] is intent_patterns:
+            return cached[1]
+        if len(self._pattern_matchers) >= 8:
+            self._pattern_matchers.clear()
+        matcher = IntentMatcher(intent_patterns)
+        self._pattern_matchers[id(intent_patterns)] = (intent_patterns, matcher)
+        return matcher
+
+    @staticmethod
+    def _same_patterns(patterns: dict, other: dict) -> bool:
+        # Listeler kopyalanmadan birleştirildiği için kimlik karşılaştırması yeterlidir
+        # (sıra da aynı olmalı: eşit skorlarda önce gelen niyet kazanır)
+        return patterns is other or (
+            list(patterns) == list(other) and all(patterns[intent] is value for intent, value in other.items()))
+
+    def _reset_intent_matchers(self):
+        """
+        Pattern'ler değiştiğinde derlenmiş eşleştiriciler atılır; ilk kullanımda yeniden kurulur.
+        """
+        self._intent_matcher = None
+        self._pattern_matchers = {}
+
+    @staticmethod
+    def _trim_learned(learned: dict) -> dict:
+        """
+        Tekrarlanan ve boş pattern'leri atar, niyet başına en yeni MAX_LEARNED_PATTERNS'ı tutar.
+        """
+        trimmed = {}
+        for intent, patterns in learned.items():
+            unique = list(dict.fromkeys(tuple(pattern) for pattern in patterns if pattern))
+            trimmed[intent] = [list(pattern) for pattern in unique[-MAX_LEARNED_PATTERNS:]]
+        return trimmed
     
     def save_learned_patterns(self):
         """Öğrenilen patternleri kaydet"""
@@ -63,21 +228,28 @@ class SmartNLPProcessor:
             with open('learned_patterns.pkl', 'wb') as f:
                 pickle.dump(self.learned_patterns, f)
         except Exception as e:
-            print(f"Öğrenilen pattern'ler kaydedilemedi: {e}")
+            logger.warning(f"Öğrenilen pattern'ler kaydedilemedi: {e}")
     
     def load_learned_patterns(self):
         """Öğrenilen patternleri yükle"""
         try:
             with open('learned_patterns.pkl', 'rb') as f:
-                self.learned_patterns = pickle.load(f)
+                learned = pickle.load(f)
+            self.learned_patterns = self._trim_learned(learned)
+            before = sum(len(patterns) for patterns in learned.values())
+            after = sum(len(patterns) for patterns in self.learned_patterns.values())
+            if after < before:
+                logger.info(f"🧹 Öğrenilen pattern'ler {before} -> {after} (tekrarlar ve fazlası atıldı)")
         except FileNotFoundError:
             self.learned_patterns = {}
         except Exception as e:
-            print(f"Öğrenilen pattern'ler yüklenemedi: {e}")
+            logger.warning(f"Öğrenilen pattern'ler yüklenemedi: {e}")
             self.learned_patterns = {}
+        self._reset_intent_matchers()
     
     def add_store_names(self, store_names: list):
         """Mağaza adlarını ekle"""
+        self._store_matcher = None
         for name in store_names:
             self.store_names[name] = name
             # Basit varyasyonları ekle (örneğin, "Bodrum-nsp" için "Bodrum")
@@ -94,13 +266,11 @@ class SmartNLPProcessor:
     
     def expand_synonyms(self, words):
         """Kelimeleri eş anlamlılarıyla genişlet"""
-        expanded = []
+        expanded = set(words)
         for word in words:
-            expanded.append(word)
-            for key, synonyms in self.synonyms.items():
-                if word in synonyms or word == key:
-                    expanded.extend([key] + synonyms)
-        return list(set(expanded))
+            for key in self._synonym_keys.get(word, ()):
+                expanded |= self._synonym_groups[key]
+        return list(expanded)
     
     def extract_entities(self, text, data_columns):
         """Varlık çıkarımı (NER)"""
@@ -111,23 +281,16 @@ class SmartNLPProcessor:
         
         expanded_words = self.expand_synonyms(words)
         
-        dept_keywords = ['it', 'satış', 'muhasebe', 'ik']
-        for word in expanded_words:
-            for dept in dept_keywords:
-                if word in self.synonyms.get(dept, []) or word == dept:
-                    entities['departments'].append(dept)
-        
-        action_keywords = ['listele', 'kaç', 'hangi', 'göster']
         for word in expanded_words:
-            for action in action_keywords:
-                if word in self.synonyms.get(action, []) or word == action:
-                    entities['actions'].append(action)
+            keys = self._entity_keys.get(word)
+            if keys is not None:
+                entities['departments'].extend(keys[0])
+                entities['actions'].extend(keys[1])
         
         # Mağaza adlarını fuzzy eşleştirme ile çıkar
-        for word in text.split():
-            for store_name in self.store_names.keys():
-                if fuzz.partial_ratio(word.lower(), store_name.lower()) > 80:
-                    entities['stores'].append(self.store_names[store_name])
+        if self._store_matcher is None:
+            self._store_matcher = StoreNameMatcher(self.store_names.items())
+        entities['stores'].extend(self._store_matcher.match_each(text.split()))
         
         original_words = text.split()
         for word in original_words:
@@ -136,31 +299,21 @@ class SmartNLPProcessor:
         
         return entities
     
-    def calculate_intent_score(self, entities, intent_patterns):
-        """Intent skorunu hesapla"""
-        scores = {}
-        for intent, patterns in intent_patterns.items():
-            max_score = 0
-            for pattern in patterns:
-                score = 0
-                present_words = [word for word in pattern if word in entities['actions'] or word in entities['objects'] or word in entities['departments'] or word in entities['stores']]
-                if len(present_words) > 0:
-                    score = len(present_words) / len(pattern)
-                if score > max_score:
-                    max_score = score
-            scores[intent] = max_score
-        return scores
+    def calculate_intent_score(self, entities, intent_patterns=None):
+        """Intent skorunu hesapla (intent_patterns verilmezse yerleşik ve öğrenilmiş pattern'ler)"""
+        return self._matcher(intent_patterns).scores(self._present_words(entities))
+
+    @staticmethod
+    def _present_words(entities) -> set:
+        return {*entities['actions'], *entities['objects'], *entities['departments'], *entities['stores']}
 
     def predict_intent(self, text, data_columns):
         """Intent tahmini"""
         entities = self.extract_entities(text, data_columns)
-        all_patterns = {**self.intent_patterns, **self.learned_patterns}
-        scores = self.calculate_intent_score(entities, all_patterns)
+        best_intent = self._matcher().best(self._present_words(entities))
         
-        if not scores:
+        if best_intent is None:
              return {'intent': 'unknown', 'confidence': 0, 'entities': entities}
-
-        best_intent = max(scores.items(), key=lambda x: x[1])
         
         return {
             'intent': best_intent[0] if best_intent[1] > 0.3 else 'unknown',
@@ -171,10 +324,18 @@ class SmartNLPProcessor:
     def learn_from_feedback(self, user_query, correct_intent):
         """Kullanıcı geri bildiriminden öğren"""
         normalized_query = self.normalize_text(user_query)
-        words = normalized_query.split()
+        pattern = normalized_query.split()[:3]  # İlk 3 kelime
+        if not pattern:
+            return
         
         if correct_intent not in self.learned_patterns:
             self.learned_patterns[correct_intent] = []
         
-        self.learned_patterns[correct_intent].append(words[:3])  # İlk 3 kelime
+        patterns = self.learned_patterns[correct_intent]
+        if pattern in patterns:
+            # Tekrar eden geri bildirim pattern'i en yeniler arasına taşır
+            patterns.remove(pattern)
+        patterns.append(pattern)
+        del patterns[:-MAX_LEARNED_PATTERNS]
+        self._reset_intent_matchers()
         self.save_learned_patterns()
\ No newline at end of file
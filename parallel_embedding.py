@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Parallel Embedding - Tam yeniden oluşturmada metin parçalarını bir süreç havuzunda kodlar.
+
+Her işçi süreç modelin kendi kopyasını yükler ve sabit sayıda işlemci içi (intra-op)
+thread kullanır; Linux'ta işçiler ayrık çekirdek gruplarına sabitlenir, böylece torch/ONNX
+thread'leri birbirinin çekirdeğini paylaşmaz. Parçalar gruplar halinde gönderilir,
+sonuçlar gönderim sırasıyla toplanır; ilerleme ve hız (parça/s) yazdırılır.
+"""
+import os
+import logging
+import time
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Kütüphanelerin thread havuzları içe aktarılırken boyutlandığı için torch'tan önce ayarlanır
+THREAD_ENV_VARS = ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS')
+
+_worker_model = None
+
+
+def _init_worker(model_name, backend, embed_options, threads, counter):
+    global _worker_model
+    with counter.get_lock():
+        worker_index = counter.value
+        counter.value += 1
+    for name in THREAD_ENV_VARS:
+        os.environ[name] = str(threads)
+    if hasattr(os, 'sched_getaffinity'):
+        cores = sorted(os.sched_getaffinity(0))
+        start = (worker_index * threads) % len(cores)
+        pinned = set(cores[start:start + threads])
+        if len(pinned) == threads:
+            os.sched_setaffinity(0, pinned)
+    from embedding_backend import load_embedding_model
+    _worker_model = load_embedding_model(model_name, backend, **{**embed_options, 'threads': threads})
+
+
+def _encode(texts):
+    return np.asarray(_worker_model.encode(texts), dtype='float32')
+
+
+class ParallelEncoder:
+    """
+    with ParallelEncoder(...) as encoder:
+        futures = [encoder.submit(batch) for batch in batches]
+        vectors = np.concatenate([f.result() for f in futures])
+    """
+
+    def __init__(self, model_name, backend='torch', embed_options=None, workers=None, threads_per_worker=None,
+                 report_every=10.0):
+        """
+        workers: işçi süreç sayısı (None: çekirdek sayısı / threads_per_worker)
+        threads_per_worker: işçi başına intra-op thread (None: çekirdekler işçilere bölünür)
+        report_every: ilerlemenin en fazla kaç saniyede bir yazdırılacağı
+        """
+        cpu_count = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count() or 1
+        if workers is None:
+            workers = max(1, cpu_count // (threads_per_worker or 1))
+        self.workers = workers
+        self.threads_per_worker = threads_per_worker or max(1, cpu_count // workers)
+        self.report_every = report_every
+        self.submitted = 0
+        self.completed = 0
+        self._lock = threading.Lock()
+        self._last_report = 0.0
+        self._start = None
+        context = multiprocessing.get_context('spawn')
+        options = {key: value for key, value in (embed_options or {}).items() if key != 'threads'}
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=context, initializer=_init_worker,
+            initargs=(model_name, backend, options, self.threads_per_worker, context.Value('i', 0))
+        )
+        logger.info(f"⚙️ Paralel vektörleştirme: {workers} süreç x {self.threads_per_worker} thread")
+
+    def submit(self, texts: list):
+        """
+        Bir grup metni kuyruğa alır; Future döner (sonuç: (len(texts), d) float32).
+        """
+        if self._start is None:
+            self._start = time.perf_counter()
+        with self._lock:
+            self.submitted += len(texts)
+        future = self._executor.submit(_encode, list(texts))
+        size = len(texts)
+        future.add_done_callback(lambda f: self._on_done(f, size))
+        return future
+
+    def _on_done(self, future, size):
+        if future.cancelled() or future.exception() is not None:
+            return
+        with self._lock:
+            self.completed += size
+            now = time.perf_counter()
+            if now - self._last_report < self.report_every and self.completed < self.submitted:
+                return
+            self._last_report = now
+            completed, submitted = self.completed, self.submitted
+        elapsed = now - self._start
+        logger.info(f"   ⏳ {completed}/{submitted} parça vektörleştirildi ({completed / max(elapsed, 1e-9):.1f} parça/s)")
+
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        if self._start is not None and self.completed:
+            elapsed = time.perf_counter() - self._start
+            logger.info(f"✅ Paralel vektörleştirme: {self.completed} parça, {elapsed:.1f}s "
+                        f"({self.completed / max(elapsed, 1e-9):.1f} parça/s)")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Profiling - Tek bir sorgunun zamanının nereye gittiğini ölçen, isteğe bağlı profil aracı.
+
+İki mod vardır:
+    'sample'   Ayrı bir thread, sorguyu işleyen thread'in çağrı yığınını belirli aralıklarla
+               okur (sys._current_frames). Sonuç, flamegraph.pl / speedscope / inferno'nun
+               okuduğu "folded stacks" biçiminde (.folded) kaydedilir. Native kodda (FAISS,
+               torch) geçen süre, o kodu çağıran Python satırına yazılır.
+    'cprofile' cProfile ile tüm fonksiyon çağrıları sayılır; .prof (pstats) dosyası kaydedilir
+               (snakeviz, flameprof ile açılabilir). Çağrı sayıları kesindir, ek yükü daha fazladır.
+
+Profil sadece istendiğinde başlatılır; kapalıyken sorgu yoluna hiçbir kanca eklenmez.
+Aynı anda tek bir profil çalışır (cProfile süreç genelinde tek olabilir).
+"""
+import os
+import sys
+import time
+import hmac
+import pstats
+import cProfile
+import threading
+from collections import Counter
+
+PROFILE_MODES = ('sample', 'cprofile')
+
+_profile_lock = threading.Lock()
+
+
+class ProfilerBusy(RuntimeError):
+    """Başka bir istek zaten profilleniyor."""
+
+
+def check_token(expected, provided) -> bool:
+    """
+    Yönetici anahtarını sabit sürede karşılaştırır; anahtar tanımlı değilse profil kapalıdır.
+    """
+    return bool(expected) and bool(provided) and hmac.compare_digest(str(expected), str(provided))
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    # Satır yerine fonksiyonun ilk satırı kullanılır ki aynı fonksiyonun örnekleri birleşsin
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """
+    Bir thread'in çağrı yığınını interval saniyede bir örnekler; aynı yığınlar sayılır.
+    """
+
+    def __init__(self, thread_id: int, interval=0.001):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(stack))] += 1
+            self.samples += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def write_folded(self, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def top_functions(self, limit=15) -> list:
+        """
+        Yığının en üstünde (o an çalışan) en çok görülen fonksiyonlar: (fonksiyon, örnek, oran).
+        """
+        leaf_counts = Counter()
+        for stack, count in self.stacks.items():
+            leaf_counts[stack.rsplit(';', 1)[-1]] += count
+        total = max(self.samples, 1)
+        return [{'function': name, 'samples': count, 'share': round(count / total, 4)}
+                for name, count in leaf_counts.most_common(limit)]
+
+
+def _cprofile_top(profile, limit=15) -> list:
+    stats = pstats.Stats(profile)
+    rows = []
+    for (filename, line, name), (_, calls, tottime, cumtime, _) in stats.stats.items():
+        rows.append({'function': f"{name} ({os.path.basename(filename)}:{line})", 'calls': calls,
+                     'self_seconds': round(tottime, 6), 'cumulative_seconds': round(cumtime, 6)})
+    rows.sort(key=lambda row: -row['self_seconds'])
+    return rows[:limit]
+
+
+def profile_call(fn, *args, mode='sample', out_dir='profiles', label='query', interval=0.001, **kwargs):
+    """
+    fn(*args, **kwargs)'ı profilleyerek çalıştırır.
+    Dönen değer: (fn'in sonucu, rapor). Rapor; kaydedilen dosyanın adını, süreyi ve en çok
+    zaman alan fonksiyonları içerir. Başka bir profil sürüyorsa ProfilerBusy fırlatılır.
+    """
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"Desteklenmeyen profil modu: {mode}. Seçenekler: {', '.join(PROFILE_MODES)}")
+    if not _profile_lock.acquire(blocking=False):
+        raise ProfilerBusy("Başka bir sorgu profilleniyor")
+    try:
+        os.makedirs(out_dir, exist_ok=True)
+        stamp = time.strftime('%Y%m%d-%H%M%S') + f"-{int(time.time() * 1000) % 1000:03d}"
+        start = time.perf_counter()
+        if mode == 'sample':
+            sampler = StackSampler(threading.get_ident(), interval)
+            # Saf Python kodunda örnekleyici GIL'i ancak thread geçiş aralığında (5ms) alabilir;
+            # profil süresince aralık, örnekleme aralığının altına indirilir
+            switch_interval = sys.getswitchinterval()
+            sys.setswitchinterval(min(switch_interval, interval / 4))
+            sampler.start()
+            try:
+                result = fn(*args, **kwargs)
+            finally:
+                sampler.stop()
+                sys.setswitchinterval(switch_interval)
+            file_name = f"{label}-{stamp}.folded"
+            sampler.write_folded(os.path.join(out_dir, file_name))
+            report = {'samples': sampler.samples, 'interval_ms': interval * 1000, 'top': sampler.top_functions()}
+        else:
+            profile = cProfile.Profile()
+            profile.enable()
+            try:
+                result = fn(*args, **kwargs)
+            finally:
+                profile.disable()
+            file_name = f"{label}-{stamp}.prof"
+            profile.dump_stats(os.path.join(out_dir, file_name))
+            report = {'top': _cprofile_top(profile)}
+        report = {'mode': mode, 'file': file_name, 'seconds': round(time.perf_counter() - start, 4), **report}
+        return result, report
+    finally:
+        _profile_lock.release()
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Query Engine - Tablolardan kesin olarak cevaplanabilen soruları (satır sayısı, en büyük
+değer, mağaza cirosu, çalışan sayısı, maaş özeti, departmanlar, dosya sayıları...)
+vektör araması ve LLM olmadan, doğrudan pandas/NumPy işlemleriyle cevaplar.
+
+Niyet SmartNLPProcessor.predict_intent ile tahmin edilir; her kural ayrıca sorguda kendi
+anahtar kelimelerini arar, böylece emin olunmayan sorular LLM'e bırakılır (None döner).
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+EMPLOYEE_WORDS = {'çalışan', 'çalışanlar', 'çalışanı', 'çalışanları', 'personel', 'personeller',
+                  'kişi', 'employee', 'employees', 'staff'}
+SALARY_WORDS = ('maaş', 'salary', 'ücret')
+MAX_WORDS = ('en büyük', 'en yüksek', 'maksimum', 'max')
+YEAR_PATTERN = re.compile(r'\b(19|20)\d{2}\b')
+# Tabloların sonundaki toplam satırları veri satırı sayılmaz
+TOTAL_ROW_NAMES = {'genel toplam', 'toplam', 'total', 'grand total'}
+
+CHART_COLORS = ['#4CAF50', '#2196F3', '#FFC107', '#F44336', '#9C27B0', '#00BCD4', '#FF9800', '#795548']
+
+
+def turkish_lower(text: str) -> str:
+    return text.replace('I', 'ı').replace('İ', 'i').lower()
+
+
+def is_total_label(value) -> bool:
+    return isinstance(value, str) and turkish_lower(value).strip() in TOTAL_ROW_NAMES
+
+
+def _word_pattern(text: str):
+    """
+    Metni sadece kelime sınırlarında eşleyen desen ("meydan", "meydana" içinde bulunmaz).
+    """
+    return re.compile(rf'(?<!\w){re.escape(text)}(?!\w)')
+
+
+def _format_number(value) -> str:
+    if isinstance(value, (int, np.integer)) or (isinstance(value, float) and value.is_integer()):
+        return f"{int(value):,}"
+    return f"{value:,.2f}"
+
+
+class StructuredQueryEngine:
+    """
+    Tanınan niyetleri tablo işlemlerine çevirir. answer() cevap üretemezse None döner.
+    """
+
+    def __init__(self, structured_data: dict, data_insights: dict, aggregates):
+        self.structured_data = structured_data
+        self.data_insights = data_insights
+        self.aggregates = aggregates
+        self._store_names = {}
+        self._store_patterns = []
+        self.refresh()
+
+    def refresh(self):
+        """
+        Veri yeniden yüklendiğinde mağaza adı sözlüğünü yeniden oluşturur.
+        """
+        self._store_names = {}
+        for filename, insights in self.data_insights.items():
+            for store_name in insights.get('store_rows', {}):
+                if is_total_label(store_name):
+                    continue
+                variations = {store_name, store_name.split('-')[0].strip()}
+                for variation in variations:
+                    if variation:
+                        self._store_names.setdefault(turkish_lower(variation), []).append((filename, store_name))
+        self._store_patterns = [(_word_pattern(variation), entries) for variation, entries in self._store_names.items()]
+
+    # --- Yardımcılar ----------------------------------------------------
+
+    def _tables(self):
+        for filename, data in self.structured_data.items():
+            if isinstance(data, pd.DataFrame):
+                yield filename, data
+
+    def _employee_table(self):
+        """
+        Departman sütunu olan ilk tablo (çalışan listesi) ve o sütunun adı.
+        """
+        for filename, data in self._tables():
+            dept_column = self.data_insights.get(filename, {}).get('dept_column')
+            if dept_column:
+                return filename, data, dept_column
+        return None, None, None
+
+    @staticmethod
+    def _find_column(data: pd.DataFrame, keywords):
+        for col in data.columns:
+            if any(keyword in turkish_lower(str(col)) for keyword in keywords):
+                return col
+        return None
+
+    def _mentioned_stores(self, text: str) -> list:
+        found = []
+        for pattern, entries in self._store_patterns:
+            if pattern.search(text):
+                for entry in entries:
+                    if entry not in found:
+                        found.append(entry)
+        return found
+
+    @staticmethod
+    def _column_words(col) -> list:
+        """
+        Sütun adının sorguda aranacak kelimeleri: 3+ harfli kelimeler ve yıllar.
+        """
+        return [word for word in re.findall(r'\w+', turkish_lower(str(col)))
+                if (len(word) >= 3 and word.isalpha()) or YEAR_PATTERN.fullmatch(word)]
+
+    @staticmethod
+    def _total_rows(data: pd.DataFrame) -> pd.Series:
+        mask = pd.Series(False, index=data.index)
+        for col in data.select_dtypes(include=['object']).columns:
+            mask |= data[col].map(is_total_label)
+        return mask
+
+    @staticmethod
+    def _department_names(dept: str, synonyms: dict) -> set:
+        names = {dept, *synonyms.get(dept, [])}
+        return {name.replace('_', ' ') for name in names}
+
+    def mentions_store(self, query: str) -> bool:
+        """
+        Sorguda bir mağazanın adı (veya kısa adı) birebir geçiyor mu?
+        """
+        return bool(self._mentioned_stores(turkish_lower(query)))
+
+    def _requested_departments(self, text: str, entities: dict, synonyms: dict) -> list:
+        """
+        predict_intent'in departman varlıklarından sorguda gerçekten adı geçenler.
+        Eş anlamlı genişletme "çalışan" -> "personel" -> "ik" gibi zincirler ürettiği için
+        çalışan kelimeleri departman adı sayılmaz.
+        """
+        requested = []
+        # "IT" Türkçe küçük harfe "ıt" olarak çevrildiği için İngilizce küçük harfli metne de bakılır
+        texts = (text, text.replace('ı', 'i'))
+        for dept in dict.fromkeys(entities['departments']):
+            names = self._department_names(dept, synonyms) - EMPLOYEE_WORDS
+            if any(re.search(rf'\b{re.escape(name)}\b', t) for name in names for t in texts):
+                requested.append(dept)
+        return requested
+
+    def _department_filter(self, data: pd.DataFrame, dept_column, text, departments, synonyms):
+        """
+        Departman varlıklarını (it, muhasebe...) tablodaki değerlere eşler; varlık yoksa
+        sorguda adı birebir geçen departmanı (ör. "bilgi işlem") arar.
+        """
+        values = data[dept_column].astype(str)
+        lowered = values.map(turkish_lower)
+        for dept in departments:
+            mask = lowered.isin(self._department_names(dept, synonyms))
+            if mask.any():
+                return mask, values[mask].iloc[0]
+        if not departments:
+            # Uzun adlar önce denenir ("ürün yönetimi", "yönetim"den önce)
+            for name in sorted(set(lowered), key=len, reverse=True):
+                if name and re.search(rf'\b{re.escape(name)}\b', text):
+                    mask = lowered == name
+                    return mask, values[mask].iloc[0]
+        return None, None
+
+    # --- Kurallar -------------------------------------------------------
+
+    def _row_count(self, text, words):
+        if 'satır' not in text or not ({'kaç', 'toplam'} & words):
+            return None
+        tables = list(self._tables())
+        if not tables:
+            return None
+        total = sum(len(data) for _, data in tables)
+        lines = [f"- {filename}: {len(data):,} satır, {data.shape[1]} sütun" for filename, data in tables]
+        return {'response': f"Toplam {total:,} satır veri var:\n" + "\n".join(lines), 'chart': None}
+
+    def _max_value(self, text, words):
+        """
+        Sorguda adı geçen sayısal sütunun en büyük değeri. Sütun belirtilmemişse ("en büyük
+        değer") cevap LLM'e bırakılır; toplam satırları (Genel Toplam) hesaba katılmaz.
+        """
+        if not any(word in text for word in MAX_WORDS):
+            return None
+        # Sorguyla en çok kelimesi örtüşen sütunlar aday olur (ek almış kelimeler de sayılır: "cirosu")
+        candidates, best_hits = [], 0
+        for filename, data in self._tables():
+            for col in self.data_insights.get(filename, {}).get('numeric_columns', []):
+                hits = sum(bool(re.search(rf'(?<!\w){re.escape(word)}', text)) for word in self._column_words(col))
+                if hits > best_hits:
+                    candidates, best_hits = [], hits
+                if hits and hits == best_hits:
+                    candidates.append((filename, data, col))
+        best = None
+        for filename, data, col in candidates:
+            values = pd.to_numeric(data[col], errors='coerce')[~self._total_rows(data)].dropna()
+            if not values.empty and (best is None or values.max() > best[3]):
+                best = (filename, data, col, values.max(), values.idxmax())
+        if best is None:
+            return None
+        filename, data, col, value, row = best
+        store_column = self.data_insights.get(filename, {}).get('store_column')
+        where = f"{data.at[row, store_column]}, " if store_column else ""
+        return {'response': f"En yüksek '{col}' değeri {_format_number(float(value))} ({where}{filename}).",
+                'chart': None}
+
+    def _file_counts(self, text, words):
+        if 'dosya' not in text or 'kaç' not in words:
+            return None
+        counts = {}
+        for insights in self.data_insights.values():
+            counts[insights['type']] = counts.get(insights['type'], 0) + 1
+        for file_type in counts:
+            if file_type in text:
+                return {'response': f"Sistemde {counts[file_type]} adet {file_type} dosyası var.", 'chart': None}
+        details = ", ".join(f"{count} {file_type}" for file_type, count in counts.items())
+        return {'response': f"Sistemde toplam {sum(counts.values())} dosya var ({details}).", 'chart': None}
+
+    def _date_columns(self, text, words):
+        if 'tarih' not in text or not ({'hangi', 'hangileri', 'hangisi'} & words):
+            return None
+        files = [(filename, insights['date_columns']) for filename, insights in self.data_insights.items()
+                 if insights.get('date_columns')]
+        if not files:
+            return {'response': "Tarih sütunu olan dosya bulunamadı.", 'chart': None}
+        lines = [f"- {filename}: {', '.join(columns)}" for filename, columns in files]
+        return {'response': "Tarih sütunu olan dosyalar:\n" + "\n".join(lines), 'chart': None}
+
+    def _store_values(self, text, words):
+        stores = self._mentioned_stores(text)
+        if not stores:
+            return None
+        years = {match.group(0) for match in YEAR_PATTERN.finditer(text)}
+        wants_growth = 'büyüme' in text or 'growth' in text
+        if not (years or wants_growth or {'ciro', 'satış', 'satışı', 'sales', 'veri', 'verisi', 'verileri'} & words):
+            return None
+        parts = []
+        for filename, store_name in stores:
+            row = self.data_insights[filename]['store_rows'][store_name]
+            columns = [col for col in row
+                       if (years and any(year in str(col) for year in years))
+                       or (wants_growth and 'büyüme' in turkish_lower(str(col)))]
+            columns = columns or list(row)
+            values = "\n".join(f"{col}: {_format_number(row[col]) if isinstance(row[col], (int, float, np.number)) else row[col]}"
+                               for col in columns)
+            parts.append(f"**{store_name}** ({filename}):\n{values}")
+        return {'response': "\n\n".join(parts), 'chart': None}
+
+    def _salary(self, text, words, departments, synonyms):
+        if not any(word in text for word in SALARY_WORDS):
+            return None
+        filename, data, dept_column = self._employee_table()
+        if data is None:
+            return None
+        salary_column = self._find_column(data, SALARY_WORDS)
+        if salary_column is None:
+            return None
+        salaries = pd.to_numeric(data[salary_column], errors='coerce')
+        mask, dept_name = self._department_filter(data, dept_column, text, departments, synonyms)
+        if departments and mask is None:
+            # Sorulan departman tabloda bulunamadı; karar LLM'e bırakılır
+            return None
+        scope = "tüm çalışanlar"
+        if mask is not None:
+            salaries = salaries[mask]
+            scope = f"{dept_name} departmanı"
+        salaries = salaries.dropna()
+        if salaries.empty:
+            return None
+        lines = [
+            f"{filename} - {scope} için maaş özeti ({len(salaries)} kişi):",
+            f"Ortalama: {_format_number(float(salaries.mean()))}",
+            f"En düşük: {_format_number(float(salaries.min()))}",
+            f"En yüksek: {_format_number(float(salaries.max()))}",
+            f"Toplam: {_format_number(float(salaries.sum()))}",
+        ]
+        chart = None
+        if mask is None:
+            by_dept = pd.to_numeric(data[salary_column], errors='coerce').groupby(data[dept_column]).mean().dropna()
+            lines.append("Departman ortalamaları:")
+            lines.extend(f"- {dept}: {_format_number(float(avg))}" for dept, avg in by_dept.items())
+            if 'grafik' in text or 'göster' in text:
+                chart = {
+                    'type': 'bar',
+                    'title': 'Departmanlara Göre Ortalama Maaş',
+                    'data': {
+                        'labels': [str(dept) for dept in by_dept.index],
+                        'data': [float(avg) for avg in by_dept.values],
+                        'backgroundColor': CHART_COLORS[:len(by_dept)],
+                        'borderWidth': 1
+                    }
+                }
+        return {'response': "\n".join(lines), 'chart': chart}
+
+    def _employee_count(self, text, words, departments, synonyms):
+        if not (EMPLOYEE_WORDS & words) or not ({'kaç', 'sayısı', 'sayı'} & words):
+            return None
+        filename, data, dept_column = self._employee_table()
+        if data is None:
+            return None
+        mask, dept_name = self._department_filter(data, dept_column, text, departments, synonyms)
+        if mask is not None:
+            return {'response': f"{dept_name} departmanında {int(mask.sum())} çalışan var.", 'chart': None}
+        if departments:
+            # Sorulan departman tabloda bulunamadı; karar LLM'e bırakılır
+            return None
+        counts = self.aggregates.department_counts
+        lines = [f"{dept}: {count} çalışan" for dept, count in counts.items()]
+        return {'response': f"Toplam {len(data)} çalışan var.\n" + "\n".join(lines), 'chart': None}
+
+    def _departments(self, text, words):
+        if 'departman' not in text or not ({'listele', 'neler', 'hangi', 'hangileri'} & words):
+            return None
+        counts = self.aggregates.department_counts
+        if not counts:
+            return None
+        lines = [f"- {dept} ({count} çalışan)" for dept, count in counts.items()]
+        return {'response': f"{len(counts)} departman var:\n" + "\n".join(lines), 'chart': None}
+
+    def _employee_list(self, text, words):
+        if not (EMPLOYEE_WORDS & words) or not ({'listele', 'tüm', 'hepsi', 'göster', 'kimler'} & words):
+            return None
+        filename, data, dept_column = self._employee_table()
+        if data is None:
+            return None
+        name_column = self._find_column(data, ('ad', 'isim', 'name'))
+        if name_column is None:
+            return None
+        position_column = self._find_column(data, ('pozisyon', 'unvan', 'position'))
+        columns = [col for col in (name_column, dept_column, position_column) if col]
+        rows = data[columns].astype(str).to_numpy().tolist()
+        lines = [f"{i + 1}. " + " - ".join(row) for i, row in enumerate(rows)]
+        return {'response': f"{filename} içinde {len(rows)} çalışan var:\n" + "\n".join(lines), 'chart': None}
+
+    def answer(self, query: str, prediction: dict, synonyms: dict):
+        """
+        Sorguyu tablolardan cevaplamayı dener.
+        prediction: SmartNLPProcessor.predict_intent sonucu
+        synonyms: SmartNLPProcessor.synonyms (departman eşlemesi için)
+        Dönen değer: {'response', 'chart'} veya None (LLM'e bırakılır)
+        """
+        text = turkish_lower(query)
+        words = set(re.sub(r'[^\w\s]', ' ', text).split())
+        intent = prediction['intent']
+        departments = self._requested_departments(text, prediction['entities'], synonyms)
+
+        # Sıra önemlidir: daha özel kurallar önce denenir
+        if intent == 'salary_analysis' or any(word in text for word in SALARY_WORDS):
+            result = self._salary(text, words, departments, synonyms)
+            if result:
+                return result
+        if intent in ('count_employees', 'list_all_employees') or EMPLOYEE_WORDS & words:
+            result = self._employee_count(text, words, departments, synonyms)
+            if result:
+                return result
+        for rule in (self._row_count, self._max_value, self._file_counts, self._date_columns,
+                     self._store_values, self._departments, self._employee_list):
+            result = rule(text, words)
+            if result:
+                return result
+        return None
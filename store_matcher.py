@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Store Matcher - Mağaza adlarını karakter n-gram ters indeksi ile bulanık eşleştirir.
+"""
+from collections import defaultdict
+from thefuzz import fuzz
+
+
+class StoreNameMatcher:
+    """
+    Sorgu kelimelerini mağaza adlarıyla fuzz.partial_ratio kullanarak eşleştirir; ancak her
+    kelimeyi tüm mağazalarla karşılaştırmak yerine önce ortak karakter ikilisi (bigram)
+    olan adayları bulur ve sadece onları puanlar.
+
+    Skor eşiği 80 ve üzerindeyken partial_ratio'yu geçen her eşleşmede iki metnin en az bir
+    ortak karakter ikilisi bulunur; bu yüzden aday filtresi hiçbir eşleşmeyi kaçırmaz.
+    """
+
+    def __init__(self, entries, threshold=80):
+        """
+        entries: (karşılaştırılacak metin, döndürülecek değer) çiftleri, sırası korunur
+        """
+        self.threshold = threshold
+        self._texts = []
+        self._values = []
+        self._bigrams = defaultdict(set)
+        self._chars = defaultdict(set)
+        self._single_chars = defaultdict(set)
+        for idx, (text, value) in enumerate(entries):
+            text = text.lower()
+            self._texts.append(text)
+            self._values.append(value)
+            if len(text) == 1:
+                self._single_chars[text].add(idx)
+            for ch in set(text):
+                self._chars[ch].add(idx)
+            for gram in self._grams(text):
+                self._bigrams[gram].add(idx)
+
+    @staticmethod
+    def _grams(text: str) -> set:
+        return {text[i:i + 2] for i in range(len(text) - 1)}
+
+    def __len__(self):
+        return len(self._texts)
+
+    def _candidates(self, word: str) -> set:
+        if len(word) == 1:
+            # Tek karakterlik kelime, o karakteri içeren her adla tam eşleşir
+            return set(self._chars.get(word, ()))
+        candidates = set()
+        for gram in self._grams(word):
+            candidates |= self._bigrams.get(gram, set())
+        for ch in set(word):
+            candidates |= self._single_chars.get(ch, set())
+        return candidates
+
+    def match_word(self, word: str) -> list[int]:
+        """
+        Kelimeyle eşik üstü eşleşen kayıtların sıra numaralarını (artan sırada) döndürür.
+        """
+        word = word.lower()
+        if not word:
+            return []
+        return sorted(
+            idx for idx in self._candidates(word)
+            if fuzz.partial_ratio(word, self._texts[idx]) > self.threshold
+        )
+
+    def match_any(self, words) -> list:
+        """
+        Kelimelerden herhangi biriyle eşleşen kayıtların değerlerini kayıt sırasıyla döndürür.
+        """
+        matched = set()
+        for word in words:
+            matched.update(self.match_word(word))
+        return [self._values[idx] for idx in sorted(matched)]
+
+    def match_each(self, words) -> list:
+        """
+        Her kelime için eşleşen kayıtların değerlerini, kelime sırasıyla art arda döndürür.
+        """
+        results = []
+        for word in words:
+            results.extend(self._values[idx] for idx in self.match_word(word))
+        return results
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Stub Server - Gemini generateContent API'sini taklit eden yerel HTTP sunucusu.
+
+Tüm hattın (Flask -> arama -> LLM) dış servise çıkmadan yük testine tabi tutulabilmesi
+için kullanılır. Gecikme, gecikme sapması ve hata oranı ayarlanabilir; hatalı
+yanıtlar 503 döner, böylece istemcinin tekrar deneme davranışı da denenebilir.
+streamGenerateContent?alt=sse isteklerinde cevap, kelime kelime SSE olayları olarak
+(chunked transfer encoding ile) gönderilir.
+
+Kullanım:
+    python stub_server.py --port 8765 --latency-ms 300 --jitter-ms 100 --error-rate 0.05 --token-ms 20
+    LLM_BASE_URL=http://127.0.0.1:8765/v1beta gunicorn main:app
+"""
+import re
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+GENERATE_PATH = re.compile(r'^/v1beta/models/([^/:]+):(generateContent|streamGenerateContent)$')
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    # Keep-alive bağlantıların denenebilmesi için HTTP/1.1
+    protocol_version = 'HTTP/1.1'
+    # Başlık ve gövde ayrı yazıldığı için Nagle kapatılır (aksi halde her yanıta ~40ms eklenir)
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status: int, body: dict, headers: dict = None):
+        data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):X}\r\n".encode('ascii') + data + b"\r\n")
+
+    def _send_stream(self, text: str):
+        """
+        Cevabı kelime kelime, Gemini'nin alt=sse biçimindeki olaylar halinde gönderir.
+        """
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        words = text.split(' ')
+        for i, word in enumerate(words):
+            if i and self.server.token_delay:
+                time.sleep(self.server.token_delay)
+            event = {'candidates': [{'content': {'role': 'model', 'parts': [{'text': word if i == 0 else ' ' + word}]}}]}
+            if i == len(words) - 1:
+                event['candidates'][0]['finishReason'] = 'STOP'
+            self._write_chunk(f"data: {json.dumps(event, ensure_ascii=False)}\r\n\r\n".encode('utf-8'))
+        self._write_chunk(b"")
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        raw = self.rfile.read(length) if length else b''
+        match = GENERATE_PATH.match(self.path.split('?', 1)[0])
+        if not match:
+            self._send_json(404, {'error': {'code': 404, 'message': f"Bilinmeyen yol: {self.path}"}})
+            return
+        try:
+            payload = json.loads(raw or b'{}')
+            prompt = payload['contents'][0]['parts'][0]['text']
+        except (ValueError, KeyError, IndexError, TypeError):
+            self._send_json(400, {'error': {'code': 400, 'message': 'Geçersiz istek gövdesi'}})
+            return
+
+        server = self.server
+        delay = max(0.0, server.latency + random.uniform(-server.jitter, server.jitter))
+        if delay:
+            time.sleep(delay)
+        with server.lock:
+            server.request_count += 1
+        if random.random() < server.error_rate:
+            self._send_json(503, {'error': {'code': 503, 'message': 'Stub: geçici hata'}})
+            return
+
+        text = f"Stub cevap ({match.group(1)}): {len(prompt)} karakterlik istem alındı."
+        if match.group(2) == 'streamGenerateContent':
+            self._send_stream(text)
+            return
+        self._send_json(200, {
+            'candidates': [{'content': {'role': 'model', 'parts': [{'text': text}]}, 'finishReason': 'STOP'}]
+        })
+
+
+def start_stub_server(host: str = '127.0.0.1', port: int = 0, latency_ms: float = 0.0,
+                      jitter_ms: float = 0.0, error_rate: float = 0.0, verbose: bool = False,
+                      token_ms: float = 0.0):
+    """
+    Sunucuyu arka plandaki bir thread'de başlatır.
+    port=0 verilirse boş bir port seçilir; gerçek adres server.server_address'tedir.
+    Dönen değer: (server, base_url) - durdurmak için server.shutdown()
+    """
+    server = ThreadingHTTPServer((host, port), StubHandler)
+    server.daemon_threads = True
+    server.latency = latency_ms / 1000.0
+    server.jitter = jitter_ms / 1000.0
+    server.error_rate = error_rate
+    server.token_delay = token_ms / 1000.0
+    server.verbose = verbose
+    server.request_count = 0
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, name='llm-stub', daemon=True).start()
+    bound_host, bound_port = server.server_address[:2]
+    return server, f"http://{bound_host}:{bound_port}/v1beta"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gemini uyumlu yerel stub LLM sunucusu")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0, help="503 dönecek isteklerin oranı (0-1)")
+    parser.add_argument('--token-ms', type=float, default=0.0, help="Akış modunda kelimeler arası gecikme")
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(args.host, args.port, args.latency_ms, args.jitter_ms,
+                                         args.error_rate, args.verbose, args.token_ms)
+    print(f"🧪 Stub LLM sunucusu çalışıyor: {base_url}")
+    print(f"   LLM_BASE_URL={base_url} ile kullanın (Ctrl+C ile durdurun)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+        print(f"\n🛑 Durduruldu ({server.request_count} istek işlendi)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Table Serializer - DataFrame satırlarını tek geçişte metin parçalarına ve mağaza
+satırlarına dönüştürür (iterrows kullanmadan).
+"""
+import pandas as pd
+
+
+def find_store_column(data: pd.DataFrame):
+    """
+    Tablodaki mağaza sütununu (varsa) bulur.
+    """
+    for col in data.columns:
+        if 'mağaza' in col.lower() or 'store' in col.lower():
+            return col
+    return None
+
+
+def _row_values(data: pd.DataFrame) -> list:
+    """
+    Satırları, DataFrame.iterrows() ile aynı Python değerlerini taşıyan listeler olarak döndürür.
+    """
+    values = data.to_numpy()
+    if values.dtype.kind not in 'biufcO':
+        # datetime gibi türlerde iterrows Timestamp nesneleri döndürür
+        values = data.astype(object).to_numpy()
+    return values.tolist()
+
+
+def _row_template(columns) -> str:
+    return ", ".join(f"{str(col).replace('{', '{{').replace('}', '}}')}: {{}}" for col in columns)
+
+
+def serialize_table(data: pd.DataFrame) -> dict:
+    """
+    Tabloyu tek geçişte serileştirir.
+    Dönen sözlük:
+        row_texts: her satır için "sütun: değer, ..." metni
+        store_column: mağaza sütununun adı (yoksa None)
+        store_texts: mağaza adı geçerli her satır için "Mağaza: ..., Veriler: {...}" metni
+        store_rows: mağaza adı -> mağaza sütunu dışındaki değerler (aynı ad tekrar ederse son satır)
+    """
+    rows = _row_values(data)
+    template = _row_template(data.columns)
+    row_texts = [template.format(*row) for row in rows]
+
+    store_column = find_store_column(data)
+    store_texts = []
+    store_rows = {}
+    if store_column is not None:
+        columns = list(data.columns)
+        store_pos = columns.index(store_column)
+        other = [(pos, col) for pos, col in enumerate(columns) if col != store_column]
+        for row in rows:
+            store_name = str(row[store_pos]).strip()
+            if store_name and store_name.lower() != 'nan':
+                row_data = {col: row[pos] for pos, col in other}
+                store_texts.append(f"Mağaza: {store_name}, Veriler: {row_data}")
+                store_rows[store_name] = row_data
+
+    return {
+        'row_texts': row_texts,
+        'store_column': store_column,
+        'store_texts': store_texts,
+        'store_rows': store_rows
+    }